@@ -0,0 +1,87 @@
+"""
+Общие фикстуры тестов: небольшой аккаунт на имитации API Директа
+"""
+
+import numpy as np
+import pytest
+
+from yandex_direct_fake import FakeDirectBackend, FakeDirectServer, generate_account
+from yandex_direct_manager import YandexDirectManager
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_retry import RetryPolicy
+from yandex_direct_stats import StatsFrame
+
+
+@pytest.fixture
+def account():
+    """Небольшой аккаунт: 3 кампании, 6 групп, 30 ключевых слов, 40 дней статистики"""
+    return generate_account(campaigns=3, adgroups_per_campaign=2, keywords_per_adgroup=5, days=40)
+
+
+@pytest.fixture
+def backend(account):
+    return FakeDirectBackend(account)
+
+
+@pytest.fixture
+def server(backend):
+    with FakeDirectServer(backend) as server:
+        yield server
+
+
+@pytest.fixture
+def daily_stats():
+    """
+    Дневная статистика кампаний за 21 день с 2024-05-01
+    
+    Показы кампании 1 растут, 2 - падают, у 3 всплеск в последний день,
+    4 - стабильна, у 5 статистика только по четным дням.
+    """
+    days = np.arange(21)
+    impressions = {
+        1: 100 + 10 * days,
+        2: 300 - 10 * days,
+        3: np.where(days == 20, 1000, 100),
+        4: np.full(21, 100),
+        5: np.where(days % 2 == 0, 100, 0)
+    }
+    rows = [
+        (str(np.datetime64("2024-05-01") + day), campaign_id, int(values[day]))
+        for campaign_id, values in impressions.items()
+        for day in days.tolist()
+        if values[day]
+    ]
+    dates, campaigns, shows = zip(*rows)
+    shows = np.asarray(shows, dtype=np.int64)
+    clicks = shows // 10
+    return StatsFrame({
+        "Date": np.asarray(dates),
+        "CampaignId": np.asarray(campaigns, dtype=np.int64),
+        "Impressions": shows,
+        "Clicks": clicks,
+        "Cost": clicks * 2.5,
+        "Conversions": clicks // 5
+    })
+
+
+@pytest.fixture
+def make_manager():
+    """Фабрика менеджеров без ограничения частоты, направленных на имитацию"""
+    managers = []
+    
+    def make(server, **kwargs):
+        kwargs.setdefault("rate_limiter", UnitsRateLimiter(0))
+        kwargs.setdefault("retry_policy", RetryPolicy(base_delay=0.01))
+        manager = YandexDirectManager("test-token", **kwargs)
+        manager.base_url = server.url
+        managers.append(manager)
+        return manager
+    
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+@pytest.fixture
+def manager(server, make_manager):
+    return make_manager(server)
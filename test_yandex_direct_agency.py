@@ -0,0 +1,93 @@
+"""
+Тесты агентского режима: задачи по нескольким клиентам
+"""
+
+import pytest
+
+from yandex_direct_agency import AgencyRunner, merge_results
+from yandex_direct_config import config
+from yandex_direct_fake import FakeDirectBackend, FakeDirectServer, generate_account
+
+
+def test_merge_results():
+    """Числа суммируются, списки склеиваются с client_login, словари объединяются по ключам"""
+    merged = merge_results({
+        "first": {"count": 2, "items": [{"id": 1}], "status": "ok"},
+        "second": {"count": 3, "items": [{"id": 2}, {"id": 3}], "status": "ok"}
+    })
+    
+    assert merged["count"] == 5
+    assert merged["items"] == [
+        {"id": 1, "client_login": "first"},
+        {"id": 2, "client_login": "second"},
+        {"id": 3, "client_login": "second"}
+    ]
+    assert merged["status"] == {"first": "ok", "second": "ok"}
+    assert merge_results({}) == {}
+
+
+def test_rate_limiter_must_come_from_factory():
+    with pytest.raises(ValueError):
+        AgencyRunner("test-token", ["first"], rate_limiter=object())
+
+
+@pytest.fixture
+def clients(make_manager):
+    """Два клиента на отдельных имитациях API и клиент, сервер которого всегда отвечает ошибкой"""
+    servers = {
+        "first": FakeDirectServer(FakeDirectBackend(generate_account(campaigns=2, adgroups_per_campaign=1, seed=1))),
+        "second": FakeDirectServer(FakeDirectBackend(generate_account(campaigns=3, adgroups_per_campaign=1, seed=2))),
+        "broken": FakeDirectServer(
+            FakeDirectBackend(generate_account(campaigns=1, adgroups_per_campaign=1, seed=3)),
+            error_rate=1.0,
+            error_codes=(53,)
+        )
+    }
+    for server in servers.values():
+        server.start()
+        
+    def manager_factory(login):
+        return make_manager(servers[login], client_login=login)
+    
+    yield servers, manager_factory
+    for server in servers.values():
+        server.stop()
+
+
+def test_run_isolates_clients(clients):
+    """У каждого клиента свой менеджер; ошибка одного клиента не мешает остальным"""
+    servers, manager_factory = clients
+    
+    with AgencyRunner("test-token", ["first", "second", "broken"], manager_factory=manager_factory) as runner:
+        result = runner.run(lambda manager: len(manager.get_campaigns()))
+        managers = {login: runner.get_manager(login) for login in servers}
+        
+    assert result["results"] == {"first": 2, "second": 3}
+    assert result["merged"] == 5
+    assert list(result["errors"]) == ["broken"]
+    assert managers["first"].headers["Client-Login"] == "first"
+    assert managers["first"].rate_limiter is not managers["second"].rate_limiter
+    assert servers["first"].stats["requests"] == 1
+
+
+def test_run_automation_and_scenario(clients, tmp_path, monkeypatch):
+    """Сценарии клиента сохраняются между запусками, хранилище статистики у каждого клиента свое"""
+    monkeypatch.setattr(config, "STATS_STORE_PATH", str(tmp_path / "stats.sqlite"))
+    servers, manager_factory = clients
+    
+    with AgencyRunner("test-token", ["first", "second"], manager_factory=manager_factory) as runner:
+        report = runner.run_automation("generate_report")
+        first = runner.run_scenario("analyze_campaigns_performance", parallel=False)
+        scenarios = runner.get_scenarios("first")
+        second = runner.run_scenario("analyze_campaigns_performance", parallel=False)
+        assert runner.get_scenarios("first") is scenarios
+        
+    merged = report["merged"]
+    assert [item["client_login"] for item in merged["campaigns"]] == ["first"] * 2 + ["second"] * 3
+    assert merged["total_stats"]["clicks"] == sum(
+        client_report["total_stats"]["clicks"] for client_report in report["results"].values()
+    )
+    assert len(first["results"]["first"]) == 2
+    assert len(first["results"]["second"]) == 3
+    assert second["results"].keys() == first["results"].keys()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["stats.first.sqlite", "stats.second.sqlite"]
@@ -0,0 +1,83 @@
+"""
+Тесты асинхронного менеджера на имитации API
+"""
+
+import asyncio
+
+from yandex_direct_async import AsyncYandexDirectManager, AsyncCampaignAutomation
+from yandex_direct_models import Ad, AdGroup, Campaign, Keyword
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_iterators_and_gather(manager, account):
+    """Асинхронные итераторы отдают все объекты, запросы выполняются параллельно"""
+    async def main():
+        async with AsyncYandexDirectManager(manager=manager, max_concurrency=4) as client:
+            keywords = [keyword async for keyword in client.iter_keywords(campaign_ids=list(account.campaigns), page_size=7)]
+            campaigns, ad_groups = await asyncio.gather(
+                client.get_campaigns(),
+                client.get_ad_groups(campaign_id=min(account.campaigns))
+            )
+            return keywords, campaigns, ad_groups
+        
+    keywords, campaigns, ad_groups = run(main())
+    
+    assert sorted(keyword.Id for keyword in keywords) == sorted(account.keywords)
+    assert len(campaigns) == 3
+    assert len(ad_groups) == 2
+
+
+def test_getters_return_models(manager, account):
+    """Асинхронные методы отдают модели, как и синхронный менеджер"""
+    campaign_id = min(account.campaigns)
+    
+    async def main():
+        async with AsyncYandexDirectManager(manager=manager) as client:
+            return await asyncio.gather(
+                client.get_campaign_by_id(campaign_id),
+                client.get_ads(campaign_id=campaign_id),
+                client.get_keywords(campaign_id=campaign_id),
+                client.get_ad_groups(campaign_id=campaign_id)
+            )
+            
+    campaign, ads, keywords, ad_groups = run(main())
+    
+    assert isinstance(campaign, Campaign) and campaign.Id == campaign_id
+    assert ads and all(isinstance(ad, Ad) for ad in ads)
+    assert len(keywords) == 10 and all(isinstance(keyword, Keyword) for keyword in keywords)
+    assert len(ad_groups) == 2 and all(isinstance(ad_group, AdGroup) for ad_group in ad_groups)
+
+
+def test_reports_mutations_and_changes(manager, backend, account):
+    async def main():
+        async with AsyncYandexDirectManager(manager=manager) as client:
+            timestamp = await client.get_server_timestamp()
+            frame = await client.get_statistics_frame(fields=["CampaignId", "Clicks"], date_range_type="LAST_30_DAYS")
+            results = await client.pause_campaigns(list(account.campaigns)[:2])
+            changes = await client.check_campaigns_changes(timestamp)
+            return frame, results, changes
+        
+    frame, results, changes = run(main())
+    
+    assert set(frame["CampaignId"].tolist()) == set(account.campaigns)
+    assert all(result["success"] for result in results)
+    assert backend.calls["campaigns.update"] == 1
+    assert len(changes["Campaigns"]) == 2
+
+
+def test_generate_report_uses_one_report(manager, backend, account):
+    """Статистика отчета по всем кампаниям запрашивается одним отчетом"""
+    async def main():
+        async with AsyncYandexDirectManager(manager=manager) as client:
+            return await AsyncCampaignAutomation(client).generate_report()
+        
+    report = run(main())
+    
+    expected = manager.get_campaign_totals(date_range_type="LAST_30_DAYS")
+    assert backend.calls["reports.get"] == 2
+    assert len(report["campaigns"]) == 3
+    for campaign in report["campaigns"]:
+        assert campaign["stats"]["clicks"] == expected[campaign["id"]]["Clicks"]
@@ -0,0 +1,87 @@
+"""
+Тесты офлайн-проверки стратегий на истории аккаунта
+"""
+
+import numpy as np
+import pytest
+
+from yandex_direct_backtest import BacktestHarness, BidResponseModel, BidSimulator
+from yandex_direct_fake import generate_account
+from yandex_direct_stats import StatsFrame
+
+
+PARAMS = {
+    "min_ctr": 0.5,
+    "bid_increase_percent": 10,
+    "min_bid": 30,
+    "max_bid": 5000
+}
+
+
+@pytest.fixture
+def history():
+    """4 кампании, 20 дней: 14 дней разогрева и 6 дней проигрывания"""
+    return generate_account(campaigns=4, adgroups_per_campaign=1, keywords_per_adgroup=5, days=20, seed=7)
+
+
+def test_model_scales_by_bid_ratio():
+    day = StatsFrame({
+        "Impressions": np.array([100, 100, 100]),
+        "Clicks": np.array([10, 10, 10]),
+        "Cost": np.array([20.0, 20.0, 20.0]),
+        "Conversions": np.array([1, 1, 1])
+    })
+    model = BidResponseModel(click_elasticity=1.0, impression_elasticity=0.0)
+    
+    expected = model.apply(day, np.array([1.0, 2.0, 2.0]), np.array([True, True, False]))
+    
+    assert expected["Impressions"].tolist() == [100, 100, 0]
+    assert expected["Clicks"].tolist() == [10, 20, 0]
+    assert expected["Cost"].tolist() == [20, 80, 0]
+
+
+def test_unchanged_bids_reproduce_history(history):
+    """Без остановок и изменений ставок прогноз совпадает с фактической историей"""
+    result = BidSimulator(history).run({
+        **PARAMS,
+        "min_ctr": 0,
+        "bid_increase_percent": 0,
+        "bid_decrease_percent": 0
+    })
+    
+    assert result["days"] == 6
+    assert result["actions"]["paused"] == 0
+    assert result["projected"] == pytest.approx(result["baseline"])
+    assert result["final_bids"] == {keyword_id: keyword["Bid"] for keyword_id, keyword in history.keywords.items()}
+
+
+def test_analysis_period_changes_decisions(history):
+    """Период анализа CTR передается в автоматизацию и меняет ее решения"""
+    simulator = BidSimulator(history)
+    
+    short = simulator.run({**PARAMS, "analysis_period": 1})
+    long = simulator.run({**PARAMS, "analysis_period": 14})
+    
+    assert short["actions"]["paused"] > long["actions"]["paused"]
+    assert short["baseline"] == long["baseline"]
+
+
+def test_not_enough_history(history):
+    with pytest.raises(ValueError):
+        BidSimulator(history, warmup_days=20).run(PARAMS)
+
+
+def test_harness_grid_and_rank(history):
+    """Прогоны в пуле процессов совпадают с последовательными; ранжирование по конверсиям"""
+    param_sets = BacktestHarness.parameter_grid(PARAMS, min_ctr=[0.5, 2], analysis_period=[3])
+    
+    assert [(params["min_ctr"], params["analysis_period"]) for params in param_sets] == [(0.5, 3), (2, 3)]
+    
+    parallel = BacktestHarness(history, max_workers=2).run(param_sets)
+    sequential = BacktestHarness(history, max_workers=1).run(param_sets)
+    assert parallel == sequential
+    
+    ranked = BacktestHarness.rank(parallel)
+    conversions = [result["projected"]["conversions"] for result in ranked]
+    assert conversions == sorted(conversions, reverse=True)
+    assert BacktestHarness.rank(parallel, max_cpa=-1) == []
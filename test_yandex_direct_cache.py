@@ -0,0 +1,81 @@
+"""
+Тесты кэша ответов
+"""
+
+import time
+
+from yandex_direct_cache import ResponseCache
+
+
+def test_key_ignores_order_of_ids_and_keys():
+    cache = ResponseCache()
+    
+    first = cache.make_key("ns", "campaigns", {"SelectionCriteria": {"Ids": [3, 1, 2]}, "FieldNames": ["Id", "Name"]})
+    second = cache.make_key("ns", "campaigns", {"FieldNames": ["Name", "Id"], "SelectionCriteria": {"Ids": [1, 2, 3]}})
+    
+    assert first == second
+    assert first != cache.make_key("other", "campaigns", {"SelectionCriteria": {"Ids": [1, 2, 3]}, "FieldNames": ["Id", "Name"]})
+
+
+def test_invalidate_dependent_services():
+    """Изменение ставок сбрасывает записи keywords, другие сервисы не затрагиваются"""
+    cache = ResponseCache()
+    cache.set("k", "keywords", [1])
+    cache.set("c", "campaigns", [2])
+    
+    assert cache.invalidate(["keywordbids"]) == 1
+    assert cache.get("k") is None
+    assert cache.get("c") == [2]
+
+
+def test_services_without_ttl_are_not_stored():
+    cache = ResponseCache()
+    cache.set("x", "dictionaries", {"a": 1})
+    
+    assert cache.get("x") is None
+    assert cache.get_stats()["stores"] == 0
+
+
+def test_expired_entries_and_persistence(tmp_path):
+    """Записи на диске переживают перезапуск, устаревшие удаляются"""
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path, ttls={"campaigns": 0.1})
+    cache.set("short", "campaigns", [1])
+    cache.set("long", "reports", [2])
+    cache.close()
+    
+    cache = ResponseCache(path, ttls={"campaigns": 0.1})
+    assert cache.get("long") == [2]
+    time.sleep(0.15)
+    assert cache.purge_expired() == 1
+    stats = cache.get_stats()
+    assert stats["entries"] == 1
+    assert stats["hit_rate"] == 1.0
+    cache.close()
+
+
+def test_cache_ttl(server, backend, make_manager):
+    """Ответ берется из кэша до истечения времени жизни"""
+    manager = make_manager(server, cache=ResponseCache(ttls={"campaigns": 0.3}))
+    
+    first = manager.get_campaigns()
+    second = manager.get_campaigns()
+    assert [c.Id for c in first] == [c.Id for c in second]
+    assert backend.calls["campaigns.get"] == 1
+    
+    time.sleep(0.35)
+    manager.get_campaigns()
+    assert backend.calls["campaigns.get"] == 2
+
+
+def test_cache_invalidated_by_update(server, backend, account, make_manager):
+    """Изменение объектов сервиса сбрасывает его записи в кэше"""
+    manager = make_manager(server, cache=ResponseCache())
+    campaign_id = min(account.campaigns)
+    
+    manager.get_campaigns()
+    assert manager.update_campaign(campaign_id, Name="Новое название")
+    campaigns = {c.Id: c for c in manager.get_campaigns()}
+    
+    assert backend.calls["campaigns.get"] == 2
+    assert campaigns[campaign_id].Name == "Новое название"
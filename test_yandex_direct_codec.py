@@ -0,0 +1,141 @@
+"""
+Тесты отложенного разбора страниц ответов get
+"""
+
+import json
+
+import pytest
+
+from yandex_direct_codec import CODECS, JSONCodec, LazyItems, decode_page, get_codec, orjson
+
+
+@pytest.fixture(params=["json", pytest.param("orjson", marks=pytest.mark.skipif(orjson is None, reason="orjson не установлен"))])
+def codec(request):
+    return get_codec(request.param)
+
+
+def test_items_are_decoded_lazily(codec):
+    items = [{"Id": i, "Name": f"Кампания {i}"} for i in range(5)]
+    page = decode_page(json.dumps({"result": {"Campaigns": items}}).encode(), "Campaigns", codec)
+    
+    assert isinstance(page["result"]["Campaigns"], LazyItems)
+    assert page["result"]["Campaigns"].to_list() == items
+    assert "LimitedBy" not in page["result"]
+
+
+def test_empty_list(codec):
+    page = decode_page(b'{"result": {"Keywords": []}}', "Keywords", codec)
+    
+    assert list(page["result"]["Keywords"]) == []
+
+
+@pytest.mark.parametrize("body", [
+    b'{"result":{"LimitedBy":2,"Keywords":[{"Id":1},{"Id":2}]}}',
+    b'{"result":{"Keywords":[{"Id":1},{"Id":2}],"LimitedBy":2}}',
+    b' {\n  "result" : {\n    "Keywords" : [ {"Id": 1} ,\n {"Id": 2}\n ] ,\n "LimitedBy" : 2\n }\n}\n'
+])
+def test_limited_by_and_whitespace(codec, body):
+    """LimitedBy до или после списка, пробелы и переводы строк"""
+    page = decode_page(body, "Keywords", codec)
+    
+    assert page["result"]["LimitedBy"] == 2
+    assert [item["Id"] for item in page["result"]["Keywords"]] == [1, 2]
+
+
+def test_brackets_inside_strings(codec):
+    """Скобки и запятые внутри строк не считаются концом списка"""
+    items = [{"Id": 1, "Keyword": "купить ] недорого, [срочно]"}, {"Id": 2, "Keyword": "]}"}]
+    body = json.dumps({"result": {"Keywords": items}}, ensure_ascii=False).encode()
+    
+    assert decode_page(body, "Keywords", codec)["result"]["Keywords"].to_list() == items
+
+
+def test_other_responses_are_decoded_fully(codec):
+    """Ошибки и ответы с другим ключом разбираются целиком"""
+    error = {"error": {"error_code": 53, "error_string": "Ошибка авторизации"}}
+    assert decode_page(json.dumps(error).encode(), "Keywords", codec) == error
+    
+    other = {"result": {"Campaigns": [{"Id": 1}]}}
+    page = decode_page(json.dumps(other).encode(), "Keywords", codec)
+    assert page == other
+    assert isinstance(page["result"]["Campaigns"], list)
+
+
+@pytest.mark.parametrize("body", [
+    b'{"result":{"Keywords":[{"Id":1},]}}',
+    b'{"result":{"Keywords":[,{"Id":1}]}}',
+    b'{"result":{"Keywords":[{"Id":1}}]}}'
+])
+def test_malformed_lists(codec, body):
+    with pytest.raises(ValueError):
+        decode_page(body, "Keywords", codec)["result"]["Keywords"].to_list()
+
+
+def test_scalar_items(codec):
+    page = decode_page(b'{"result":{"Ids":[1, "2", null]}}', "Ids", codec)
+    
+    assert page["result"]["Ids"].to_list() == [1, "2", None]
+
+
+def test_malformed_separator(codec):
+    """Ошибка в разделителе обнаруживается при переборе"""
+    page = decode_page(b'{"result":{"Keywords":[{"Id":1} {"Id":2}]}}', "Keywords", codec)
+    items = iter(page["result"]["Keywords"])
+    
+    assert next(items) == {"Id": 1}
+    with pytest.raises(ValueError):
+        next(items)
+
+
+class SpyCodec(JSONCodec):
+    """Кодек, запоминающий разбираемые фрагменты"""
+    
+    def __init__(self):
+        self.chunks = []
+        
+    def loads(self, data):
+        self.chunks.append(data)
+        return super().loads(data)
+
+
+def test_items_are_decoded_from_byte_slices():
+    """Каждый объект разбирается выбранным кодеком из среза байтов ответа"""
+    codec = SpyCodec()
+    body = '{"result":{"Keywords":[{"Id":1,"Keyword":"\\"ковер\\" [b]"}, {"Id":2,"Bids":[1,[2]]}]}}'.encode()
+    
+    items = iter(decode_page(body, "Keywords", codec)["result"]["Keywords"])
+    
+    assert next(items) == {"Id": 1, "Keyword": '"ковер" [b]'}
+    assert codec.chunks == ['{"Id":1,"Keyword":"\\"ковер\\" [b]"}'.encode()]
+    assert next(items) == {"Id": 2, "Bids": [1, [2]]}
+    assert all(isinstance(chunk, bytes) for chunk in codec.chunks)
+
+
+def test_fields_projection(codec):
+    """Остаются только запрошенные поля FieldNames - и при отложенном, и при полном разборе"""
+    items = [{"Id": 1, "Name": "Первая", "Extra": {"A": 1}}, {"Id": 2, "Extra": None}]
+    expected = [{"Id": 1, "Name": "Первая"}, {"Id": 2}]
+    lazy = json.dumps({"result": {"Campaigns": items}}).encode()
+    # Лишнее поле перед списком - ответ разбирается целиком
+    full = json.dumps({"result": {"Other": 1, "Campaigns": items}}).encode()
+    
+    assert decode_page(lazy, "Campaigns", codec, fields=["Id", "Name"])["result"]["Campaigns"].to_list() == expected
+    assert decode_page(full, "Campaigns", codec, fields=["Id", "Name"])["result"] == {"Other": 1, "Campaigns": expected}
+
+
+def test_unknown_codec():
+    assert set(CODECS) >= {"json", "orjson"}
+    with pytest.raises(ValueError):
+        get_codec("ujson")
+
+
+def test_manager_lazy_pages(server, make_manager, account):
+    """Менеджер с отложенным разбором отдает те же объекты, что и с полным"""
+    lazy = make_manager(server, lazy_pages=True)
+    eager = make_manager(server)
+    campaign_ids = list(account.campaigns)
+    
+    keywords = list(lazy.iter_keywords(campaign_ids=campaign_ids, page_size=7))
+    
+    assert keywords == list(eager.iter_keywords(campaign_ids=campaign_ids, page_size=7))
+    assert sorted(keyword.Id for keyword in keywords) == sorted(account.keywords)
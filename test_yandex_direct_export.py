@@ -0,0 +1,61 @@
+"""
+Тесты потокового экспорта объектов аккаунта
+"""
+
+import csv
+import gzip
+import os
+
+import pytest
+
+from yandex_direct_export import AccountExporter, export_items
+
+
+def test_export_round_trip(manager, account, tmp_path):
+    """Ключевые слова со статистикой записываются в CSV.GZ частями и читаются обратно"""
+    path = str(tmp_path / "keywords.csv.gz")
+    
+    count = AccountExporter(manager, chunk_size=7).export("keywords", path)
+    
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert count == len(rows) == 30
+    assert sorted(int(row["Id"]) for row in rows) == sorted(account.keywords)
+    
+    stats = manager.get_keyword_statistics_frame().group_by("CriterionId").to_dict("CriterionId")
+    for row in rows:
+        expected = stats.get(int(row["Id"]), {}).get("Clicks", 0)
+        assert int(row["Clicks"]) == expected
+
+
+def test_export_headers_and_fill(tmp_path):
+    """Заголовки задаются отдельно, пустые поля заполняются значениями fill"""
+    path = str(tmp_path / "items.csv")
+    items = [{"Id": 1, "Budget": {"Amount": 10}}, {"Id": 2}]
+    
+    count = export_items(items, path, ["Id", "Budget.Amount"], headers=["ID", "Бюджет"], fill={"Budget.Amount": "N/A"})
+    
+    with open(path, encoding="utf-8", newline="") as file:
+        rows = list(csv.reader(file))
+    assert count == 2
+    assert rows == [["ID", "Бюджет"], ["1", "10"], ["2", "N/A"]]
+
+
+def test_export_without_objects_creates_no_file(tmp_path):
+    """Пустой экспорт не создает файл"""
+    path = str(tmp_path / "empty.csv")
+    
+    assert export_items([], path, ["Id"]) == 0
+    assert not os.path.exists(path)
+
+
+def test_export_parquet_round_trip(manager, account, tmp_path):
+    """Parquet: одна группа строк на часть"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "keywords.parquet")
+    
+    AccountExporter(manager, chunk_size=10).export("keywords", path, columns=["Id", "Keyword"])
+    
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    assert sorted(parquet.read().column("Id").to_pylist()) == sorted(account.keywords)
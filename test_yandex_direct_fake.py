@@ -0,0 +1,66 @@
+"""
+Тесты имитации API Директа: сервер отвечает так же, как настоящий API
+"""
+
+import pytest
+
+from yandex_direct_fake import FakeAccount, FakeDirectBackend, FakeDirectServer
+from yandex_direct_manager import YandexDirectAPIError
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_retry import RetryPolicy
+
+
+def test_report_polls_offline_report(backend, account, make_manager):
+    """Ответы 201 и 202 повторяются через retryIn, пока отчет не готов"""
+    with FakeDirectServer(backend, report_pending=2) as server:
+        manager = make_manager(server)
+        dates = account.dates()
+        
+        columns = manager.get_statistics_columns(
+            fields=["CampaignId", "Clicks"],
+            date_from=dates[0],
+            date_to=dates[-1]
+        )
+        
+        assert server.stats["report_polls"] == 2
+        assert backend.calls["reports.get"] == 1
+        assert sorted(columns["CampaignId"]) == sorted(account.campaigns)
+
+
+def test_report_on_account_without_stats(make_manager):
+    """Отчет по аккаунту без статистики пустой, а не ошибка сервера"""
+    with FakeDirectServer(FakeDirectBackend(FakeAccount())) as server:
+        manager = make_manager(server)
+        
+        columns = manager.get_statistics_columns(fields=["CampaignId", "Clicks"])
+        
+        assert len(columns["CampaignId"]) == 0
+
+
+def test_server_answers_500_on_internal_error(server, backend, make_manager, monkeypatch):
+    """Ошибка в самой имитации возвращается ответом 500, соединение не обрывается"""
+    manager = make_manager(server, retry_policy=RetryPolicy(max_attempts=1, base_delay=0.01))
+    
+    def broken_report(params):
+        raise RuntimeError("сбой имитации")
+    monkeypatch.setattr(backend, "report", broken_report)
+    
+    with pytest.raises(YandexDirectAPIError) as error:
+        manager.get_statistics_columns(fields=["CampaignId", "Clicks"])
+    assert error.value.http_status == 500
+    assert error.value.error_code == 1000
+
+
+def test_throttling_is_retried(backend, make_manager):
+    """Ошибки 56 от сервера повторяются политикой повторов"""
+    with FakeDirectServer(backend, throttle_rate=0.5, seed=1) as server:
+        manager = make_manager(
+            server,
+            rate_limiter=UnitsRateLimiter(0, throttle_delay=0.001),
+            retry_policy=RetryPolicy(max_attempts=10, base_delay=0.001)
+        )
+        
+        for _ in range(5):
+            assert len(manager.get_campaigns()) == 3
+            
+        assert server.stats["throttled"] > 0
@@ -0,0 +1,128 @@
+"""
+Тесты индексированного графа объектов AccountGraph
+"""
+
+import pytest
+
+from yandex_direct_graph import AccountGraph
+from yandex_direct_mirror import AccountMirror
+
+
+def make_graph():
+    graph = AccountGraph()
+    graph.add_many("campaigns", [
+        {"Id": 1, "Name": "Первая", "Status": "ACCEPTED", "Type": "TEXT_CAMPAIGN"},
+        {"Id": 2, "Name": "Вторая", "Status": "DRAFT", "Type": "TEXT_CAMPAIGN"}
+    ])
+    # Дочерние объекты можно добавлять раньше родителей
+    graph.add_many("keywords", [
+        {"Id": 100 + i, "CampaignId": 1 + i % 2, "AdGroupId": 10 + i % 4, "Status": "ACCEPTED" if i % 3 else "DRAFT"}
+        for i in range(12)
+    ])
+    graph.add_many("adgroups", [
+        {"Id": 10 + i, "CampaignId": 1 + i % 2, "Status": "ACCEPTED", "Type": "TEXT_AD_GROUP"}
+        for i in range(4)
+    ])
+    graph.add_many("ads", [
+        {"Id": 1000 + i, "CampaignId": 1 + i % 2, "AdGroupId": 10 + i % 4, "Status": "ACCEPTED"}
+        for i in range(8)
+    ])
+    return graph
+
+
+def test_select_by_parent_and_status():
+    graph = make_graph()
+    
+    selected = graph.select("keywords", campaign_id=1, Status="ACCEPTED")
+    
+    assert [k["Id"] for k in selected] == [102, 104, 108, 110]
+    assert [g["Id"] for g in graph.select("adgroups", campaign_id=2)] == [11, 13]
+    assert graph.select("campaigns", campaign_id=2, Status="ACCEPTED") == []
+
+
+def test_select_by_ids_keeps_order():
+    """Результат в порядке списка ID, отсутствующие ID пропускаются"""
+    graph = make_graph()
+    
+    selected = graph.select("keywords", ids=[111, 999, 100, 105])
+    
+    assert [k["Id"] for k in selected] == [111, 100, 105]
+
+
+def test_select_unknown_field():
+    with pytest.raises(ValueError):
+        make_graph().select("keywords", Keyword="купить")
+
+
+def test_remove_campaign_cascades():
+    """Удаление кампании удаляет ее группы, объявления, ключевые слова и записи индексов"""
+    graph = make_graph()
+    
+    removed = graph.remove("campaigns", 1)
+    
+    assert removed["Name"] == "Первая"
+    assert graph.counts() == {"campaigns": 1, "adgroups": 2, "ads": 4, "keywords": 6}
+    assert all(item["CampaignId"] == 2 for service in ("adgroups", "ads", "keywords") for item in graph.entities[service].values())
+    assert graph.children("keywords", campaign_id=1) == []
+    assert graph.children("keywords", ad_group_id=10) == []
+    assert graph.select("campaigns", Status="ACCEPTED") == []
+    assert "ACCEPTED" not in graph.values("campaigns", "Status")
+    assert graph.remove("campaigns", 1) is None
+
+
+def test_remove_ad_group_cascades():
+    graph = make_graph()
+    
+    graph.remove("adgroups", 10)
+    
+    assert graph.get("adgroups", 10) is None
+    assert [k["Id"] for k in graph.children("keywords", campaign_id=1)] == [102, 106, 110]
+    assert graph.parent("keywords", 102)["Id"] == 12
+
+
+def test_add_replaces_and_reindexes():
+    """Замена объекта переносит его в индексах нового родителя и статуса"""
+    graph = make_graph()
+    
+    graph.add("keywords", {"Id": 100, "CampaignId": 2, "AdGroupId": 11, "Status": "SUSPENDED"})
+    
+    assert 100 not in [k["Id"] for k in graph.children("keywords", ad_group_id=10)]
+    assert graph.children("keywords", ad_group_id=11)[-1]["Id"] == 100
+    assert [k["Id"] for k in graph.select("keywords", Status="SUSPENDED")] == [100]
+    assert 100 not in [k["Id"] for k in graph.select("keywords", Status="DRAFT")]
+    assert len(graph) == 2 + 4 + 8 + 12
+
+
+def test_rollup_to_campaigns_and_groups():
+    """Метрики ключевых слов суммируются по родителям, неизвестные ID пропускаются"""
+    graph = make_graph()
+    values = {100: {"Clicks": 1, "Cost": 0.5}, 104: {"Clicks": 2, "Cost": 1.0}, 101: {"Clicks": 4}, 999: {"Clicks": 100}}
+    
+    assert graph.rollup("keywords", values) == {1: {"Clicks": 3, "Cost": 1.5}, 2: {"Clicks": 4}}
+    assert graph.rollup("keywords", values, level="adgroups") == {10: {"Clicks": 3, "Cost": 1.5}, 11: {"Clicks": 4}}
+
+
+def test_from_manager_loads_children_in_batches(manager, backend, account):
+    """Дочерние объекты загружаются одним запросом на пачку кампаний, а не на каждую кампанию"""
+    graph = AccountGraph.from_manager(manager)
+    
+    assert graph.counts() == {service: len(account.objects[service]) for service in AccountGraph.SERVICES}
+    assert len(graph.children("keywords", campaign_id=min(account.campaigns))) == 10
+    assert backend.calls["adgroups.get"] == backend.calls["ads.get"] == backend.calls["keywords.get"] == 1
+    
+    subset = AccountGraph.from_manager(manager, campaign_ids=[min(account.campaigns)])
+    assert subset.counts()["keywords"] == 10
+
+
+def test_from_mirror_makes_no_requests(manager, backend):
+    mirror = AccountMirror(manager)
+    mirror.full_load()
+    calls = dict(backend.calls)
+    
+    graph = AccountGraph.from_mirror(mirror)
+    
+    assert graph.counts() == mirror.counts()
+    assert dict(backend.calls) == calls
+    keyword = next(iter(graph.keywords.values()))
+    assert graph.parent("keywords", keyword.Id).Id == keyword.AdGroupId
+    mirror.close()
@@ -0,0 +1,63 @@
+"""
+Тесты YandexDirectManager на имитации API
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ==================== ПУЛ СОЕДИНЕНИЙ ====================
+
+def test_pool_reuses_connection(manager):
+    """Последовательные запросы идут через одно соединение"""
+    for _ in range(5):
+        manager.get_campaigns()
+        
+    stats = manager.get_pool_stats()
+    assert stats["requests"] == 5
+    assert stats["misses"] == 1
+    assert stats["hits"] == 4
+
+
+def test_pool_counts_concurrent_requests(manager):
+    """Промахи пула считаются по запросам, открывшим сокет, а не по соседним потокам"""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: manager.get_campaigns(), range(40)))
+        
+    stats = manager.get_pool_stats()
+    assert stats["requests"] == 40
+    assert stats["hits"] + stats["misses"] == 40
+    assert stats["misses"] == manager.adapter.opened_sockets()
+
+
+# ==================== ПОСТРАНИЧНАЯ ЗАГРУЗКА ====================
+
+def test_paging_follows_limited_by(manager, backend, account):
+    """Страницы запрашиваются, пока в ответе есть LimitedBy"""
+    keywords = list(manager.iter_keywords(campaign_ids=list(account.campaigns), page_size=7))
+    
+    assert sorted(keyword.Id for keyword in keywords) == sorted(account.keywords)
+    # 30 ключевых слов по 7 на странице - 5 страниц одной пачки кампаний
+    assert backend.calls["keywords.get"] == 5
+
+
+def test_paging_batches_campaign_filters(manager, backend, account):
+    """Списки кампаний разбиваются на пачки по MAX_CAMPAIGNS_PER_KEYWORDS_GET"""
+    manager.MAX_CAMPAIGNS_PER_KEYWORDS_GET = 2
+    
+    ad_groups = list(manager.iter_ad_groups(campaign_ids=list(account.campaigns)))
+    
+    assert len(ad_groups) == 6
+    assert backend.calls["adgroups.get"] == 2
+
+
+def test_paging_prefetch_and_early_stop(manager, backend, account):
+    """Предзагрузка дает те же объекты; прерванный перебор не запрашивает лишние страницы"""
+    prefetched = list(manager.iter_keywords(campaign_ids=list(account.campaigns), page_size=7, prefetch=True))
+    assert sorted(keyword.Id for keyword in prefetched) == sorted(account.keywords)
+    
+    calls = backend.calls["keywords.get"]
+    iterator = manager.iter_keywords(campaign_ids=list(account.campaigns), page_size=7)
+    first = [next(iterator) for _ in range(7)]
+    
+    assert len(first) == 7
+    assert backend.calls["keywords.get"] == calls + 1
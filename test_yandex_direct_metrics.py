@@ -0,0 +1,86 @@
+"""
+Тесты метрик запросов и трассировки сценариев
+"""
+
+import time
+
+import pytest
+
+import yandex_direct_manager
+from yandex_direct_metrics import Histogram, MetricsRegistry, traced
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value)
+        
+    assert histogram.cumulative() == [(1, 1), (2, 3), (4, 4), (float("inf"), 5)]
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    assert histogram.quantile(0.99) == 4
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_prometheus_export():
+    metrics = MetricsRegistry()
+    metrics.record_request("campaigns.get", {"connect": 0.002, "total": 0.02}, "200", request_bytes=100, units=10)
+    metrics.inc("yandex_direct_api_errors_total", code='5"3')
+    
+    text = metrics.to_prometheus()
+    
+    assert 'yandex_direct_units_spent_total{operation="campaigns.get"} 10' in text
+    assert 'yandex_direct_api_errors_total{code="5\\"3"} 1' in text
+    assert 'yandex_direct_request_duration_seconds_count{operation="campaigns.get",phase="connect"} 1' in text
+    assert 'phase="tls"' not in text
+    assert "# TYPE yandex_direct_request_size_bytes histogram" in text
+
+
+class Scenario:
+    def __init__(self, metrics):
+        self.metrics = metrics
+        
+    @traced()
+    def run(self):
+        with self.metrics.span("step", campaign_id=1):
+            self.metrics.record_request("keywords.get", {"total": 0.5}, "200")
+        self.metrics.record_request("campaigns.get", {"total": 0.25}, "200")
+
+
+def test_spans_collect_nested_requests():
+    """Запросы вложенного блока учитываются и в родительском"""
+    metrics = MetricsRegistry()
+    
+    Scenario(metrics).run()
+    
+    step, scenario = metrics.spans
+    assert step["name"] == "step" and step["attributes"] == {"campaign_id": 1}
+    assert step["parent_id"] == scenario["span_id"]
+    assert scenario["name"] == "Scenario.run"
+    assert (step["requests"], scenario["requests"]) == (1, 2)
+    assert scenario["request_time"] == pytest.approx(0.75)
+
+
+def test_manager_records_request_phases(server, make_manager, monkeypatch):
+    """Разрешение имени замеряется отдельно от подключения TCP"""
+    resolve = yandex_direct_manager._resolve
+    
+    def slow_resolve(*args, **kwargs):
+        time.sleep(0.05)
+        return resolve(*args, **kwargs)
+    
+    manager = make_manager(server, metrics=MetricsRegistry())
+    monkeypatch.setattr(yandex_direct_manager, "_resolve", slow_resolve)
+    
+    manager.get_campaigns()
+    manager.get_campaigns()
+    
+    phases = {
+        item["labels"]["phase"]: item
+        for item in manager.metrics.to_dict()["histograms"]["yandex_direct_request_duration_seconds"]
+    }
+    assert set(phases) == {"dns", "connect", "server", "download", "parse", "total"}
+    # Второй запрос идет через открытое соединение: DNS и TCP - только у первого
+    assert phases["dns"]["count"] == phases["connect"]["count"] == 1
+    assert phases["dns"]["sum"] >= 0.05
+    assert phases["connect"]["sum"] < 0.05
+    assert phases["total"]["count"] == 2
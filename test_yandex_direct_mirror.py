@@ -0,0 +1,50 @@
+"""
+Тесты локального зеркала аккаунта
+"""
+
+from yandex_direct_mirror import AccountMirror
+
+
+def test_mirror_refresh_applies_changes(manager, backend, account):
+    """refresh загружает только изменившиеся объекты и удаляет удаленные"""
+    mirror = AccountMirror(manager)
+    assert mirror.full_load()["keywords"] == 30
+    
+    campaign_id = min(account.campaigns)
+    keyword_id = min(account.keywords)
+    deleted_group = max(account.objects["adgroups"])
+    manager.update_campaign(campaign_id, Name="Переименована")
+    manager.update_keyword_bids([(keyword_id, 7770000)])
+    backend.handle("adgroups", "delete", {"SelectionCriteria": {"Ids": [deleted_group]}})
+    
+    calls = dict(backend.calls)
+    summary = mirror.refresh()
+    
+    assert summary["campaigns"] == 1
+    assert summary["deleted"] == 1
+    assert mirror.get("campaigns", campaign_id).Name == "Переименована"
+    assert mirror.get("keywords", keyword_id).Bid == 7770000
+    assert mirror.get("adgroups", deleted_group) is None
+    assert mirror.keywords(ad_group_id=deleted_group) == []
+    # Неизмененные кампании не перезагружаются целиком
+    assert backend.calls["campaigns.get"] == calls["campaigns.get"] + 1
+    
+    assert mirror.refresh()["campaigns"] == 0
+
+
+def test_mirror_persists_between_runs(manager, account, tmp_path):
+    """Зеркало в файле сохраняет объекты и метку времени; следующий запуск начинает с refresh"""
+    path = str(tmp_path / "mirror.sqlite")
+    mirror = AccountMirror(manager, path)
+    mirror.full_load()
+    timestamp = mirror.timestamp
+    mirror.close()
+    
+    reopened = AccountMirror(manager, path)
+    
+    assert timestamp
+    assert reopened.timestamp == timestamp
+    assert reopened.counts()["keywords"] == len(account.keywords)
+    assert [campaign.Id for campaign in reopened.campaigns()] == sorted(account.campaigns)
+    assert len(reopened.ad_groups(campaign_id=min(account.campaigns))) == 2
+    reopened.close()
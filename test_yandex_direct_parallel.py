@@ -0,0 +1,62 @@
+"""
+Тесты параллельного анализа кампаний
+"""
+
+import numpy as np
+
+from yandex_direct_parallel import ParallelAnalyzer, SharedColumns, build_analysis
+from yandex_direct_trends import empty_trends
+
+
+def test_parallel_matches_sequential(daily_stats):
+    """Пул процессов с разделяемой памятью дает тот же результат, что и анализ в текущем процессе"""
+    analyzer = ParallelAnalyzer(max_workers=2, shards_per_worker=2, min_parallel_campaigns=1)
+    
+    sequential = analyzer.analyze(daily_stats, parallel=False)
+    parallel = analyzer.analyze(daily_stats)
+    
+    assert list(parallel) == [1, 2, 3, 4, 5]
+    assert parallel == sequential
+
+
+def test_analysis_of_single_campaign(daily_stats):
+    """Анализ кампании в общем прогоне совпадает с build_analysis по ее строкам"""
+    result = ParallelAnalyzer(max_workers=1).analyze(daily_stats)
+    
+    single = build_analysis(
+        5,
+        daily_stats.select("CampaignId", [5]),
+        date_from="2024-05-01",
+        date_to="2024-05-21"
+    )
+    
+    assert result[5] == single
+    assert result[5]["metrics"]["total_impressions"] == 1100
+    assert len(result[5]["daily_breakdown"]) == 11
+    assert result[1]["trends"]["impressions_trend"] == "growing"
+    assert result[2]["trends"]["impressions_trend"] == "declining"
+
+
+def test_campaigns_without_stats_get_empty_analysis(daily_stats):
+    result = ParallelAnalyzer(max_workers=1).analyze(daily_stats, campaign_ids=[4, 99])
+    
+    assert list(result) == [4, 99]
+    assert result[99]["metrics"]["total_clicks"] == 0
+    assert result[99]["daily_breakdown"] == []
+    assert result[99]["trends"] == empty_trends()
+
+
+def test_shared_columns_round_trip():
+    columns = {
+        "CampaignId": np.array([1, 2, 3], dtype=np.int64),
+        "Cost": np.array([0.5, 1.5, 2.5])
+    }
+    
+    with SharedColumns(columns) as shared:
+        name, length, layout = shared.descriptor()
+        views = dict(zip((field for field, _ in layout), shared._views(shared.shm.buf)))
+        
+        assert length == 3
+        assert views["CampaignId"].tolist() == [1, 2, 3]
+        assert views["Cost"].tolist() == [0.5, 1.5, 2.5]
+        del views
@@ -0,0 +1,111 @@
+"""
+Тесты плана изменений и его применения
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from yandex_direct_manager import CampaignAutomation
+from yandex_direct_plan import MutationPlan
+
+
+def test_mutation_plan_apply_batches(manager, backend, account):
+    """Ставки уходят пачками, статус и бюджет кампании - одним элементом"""
+    manager.MAX_KEYWORDS_PER_UPDATE = 4
+    
+    plan = MutationPlan()
+    keyword_ids = sorted(account.keywords)[:10]
+    for keyword_id in keyword_ids:
+        plan.add_bid(keyword_id, 12340000, account.keywords[keyword_id]["Bid"])
+    campaign_id = min(account.campaigns)
+    plan.add_status(campaign_id, "STOPPED", "ACCEPTED")
+    plan.add_budget(campaign_id, 5000000, account.campaigns[campaign_id]["DailyBudget"])
+    
+    results = plan.apply(manager)
+    
+    assert len(results["bids"]) == 10
+    assert all(result["success"] for result in results["bids"] + results["campaigns"])
+    assert backend.calls["keywords.update"] == 3
+    assert backend.calls["campaigns.update"] == 1
+    assert all(account.keywords[keyword_id]["Bid"] == 12340000 for keyword_id in keyword_ids)
+    assert account.campaigns[campaign_id]["Status"] == "STOPPED"
+    assert account.campaigns[campaign_id]["DailyBudget"] == 5000000
+
+
+def test_mutation_plan_drops_noop_changes():
+    """Изменения, совпадающие с текущим значением, в план не попадают"""
+    plan = MutationPlan()
+    
+    assert not plan.add_bid(1, 100, 100)
+    assert plan.add_bid(2, 200, 100)
+    # Возврат к исходному значению отменяет изменение
+    assert not plan.add_bid(2, 100)
+    
+    assert plan.is_empty()
+    assert plan.summary()["skipped"] == 2
+
+
+def test_merge_keeps_original_values():
+    """При объединении планов исходным значением остается значение до первого изменения"""
+    first = MutationPlan()
+    first.add_bid(1, 200, 100, reason="первое")
+    second = MutationPlan()
+    second.add_bid(1, 300, 200, reason="второе")
+    second.add_status(5, "STOPPED", "ACCEPTED")
+    
+    first.merge(second)
+    
+    assert first.bid_changes[1] == {"old": 100, "new": 300, "reason": "второе"}
+    assert first.summary() == {"bids": 1, "statuses": 1, "budgets": 0, "skipped": 0}
+    assert first.to_dict()["statuses"] == [{"id": 5, "old": "ACCEPTED", "new": "STOPPED", "reason": ""}]
+
+
+def daily_ctr(account, days):
+    """Средний дневной CTR кампаний за последние days дней (дни без показов не учитываются)"""
+    today = date.today()
+    frame = account.stats_between(
+        (today - timedelta(days=days)).isoformat(),
+        (today - timedelta(days=1)).isoformat()
+    )
+    result = {}
+    for campaign_id, rows in frame.split("CampaignId").items():
+        daily = rows.group_by("Date")
+        shown = daily.column("Impressions") > 0
+        result[campaign_id] = float(np.mean(daily.column("Clicks")[shown] / daily.column("Impressions")[shown] * 100))
+    return result
+
+
+def test_pause_plan_uses_analysis_period(manager, backend, account):
+    """CTR считается за последние days дней, а не всегда за 7"""
+    automation = CampaignAutomation(manager)
+    short, long = daily_ctr(account, 3), daily_ctr(account, 30)
+    min_ctr = float(np.median(list(short.values()) + list(long.values())))
+    
+    for days, ctr in ((3, short), (30, long)):
+        plan = automation.plan_pause_low_performing_campaigns(min_ctr=min_ctr, days=days)
+        assert set(plan.status_changes) == {campaign_id for campaign_id, value in ctr.items() if value < min_ctr}
+        
+    assert backend.calls["reports.get"] == 2
+
+
+def test_bid_increase_only_for_top_keywords(manager, account):
+    """Ставки повышаются только словам с достаточным числом конверсий"""
+    campaign_id = min(account.campaigns)
+    dates = account.dates()
+    stats = account.stats_between(dates[-30], dates[-1])
+    conversions = stats.select("CampaignId", [campaign_id]).group_by("CriterionId", metrics=("Conversions",)).to_dict("CriterionId")
+    min_conversions = sorted(c["Conversions"] for c in conversions.values())[len(conversions) // 2]
+    expected = {keyword_id for keyword_id, c in conversions.items() if c["Conversions"] >= min_conversions}
+    
+    plan = CampaignAutomation(manager).plan_bid_increase_for_top_keywords(
+        campaign_id, increase_percent=10, min_conversions=min_conversions
+    )
+    
+    assert set(plan.bid_changes) == expected
+    assert 0 < len(expected) < len(conversions)
+    for keyword_id, change in plan.bid_changes.items():
+        assert change["old"] == account.keywords[keyword_id]["Bid"]
+        assert change["new"] == int(change["old"] * 1.1)
+        
+    assert CampaignAutomation(manager).plan_bid_increase_for_top_keywords(campaign_id, min_conversions=10 ** 6).is_empty()
@@ -0,0 +1,102 @@
+"""
+Тесты планировщика запросов по баллам
+"""
+
+import threading
+import time
+
+import pytest
+
+from yandex_direct_fake import FakeDirectBackend, FakeDirectServer
+from yandex_direct_ratelimit import UnitsRateLimiter
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("10/20828/64000", (10, 20828, 64000)),
+    ("", None),
+    (None, None),
+    ("10/abc/64000", None)
+])
+def test_parse_units_header(value, expected):
+    assert UnitsRateLimiter.parse_units_header(value) == expected
+
+
+def test_update_from_headers_tracks_costs():
+    """Остаток берется из заголовка, стоимость операции сглаживается"""
+    limiter = UnitsRateLimiter(0)
+    
+    limiter.update_from_headers("keywords.get", {"Units": "20/900/1000"})
+    limiter.update_from_headers("keywords.get", {"Units": "10/890/1000"})
+    
+    assert limiter.tokens == 890
+    assert limiter.capacity == 1000
+    assert limiter.estimate_cost("keywords.get") == pytest.approx(17.0)
+    assert limiter.estimate_cost("ads.get") == UnitsRateLimiter.DEFAULT_COST
+
+
+def test_requests_per_second():
+    limiter = UnitsRateLimiter(max_requests_per_second=20)
+    
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire("campaigns.get")
+        
+    assert time.monotonic() - started >= 4 / 20 * 0.9
+    assert limiter.get_stats()["requests"] == 5
+
+
+def test_waits_for_units_refill():
+    """При нехватке баллов запрос ждет пополнения, а не получает ошибку API"""
+    limiter = UnitsRateLimiter(0, period_seconds=1)
+    limiter.update_from_headers("campaigns.get", {"Units": "100/0/100"})
+    
+    waited = limiter.acquire("campaigns.get")
+    
+    # 100 баллов в секунду: 100 баллов восстанавливаются за ~1 секунду
+    assert 0.8 <= waited < 2
+
+
+def test_reserve_units_are_not_spent():
+    limiter = UnitsRateLimiter(0, reserve_units=50, period_seconds=1)
+    limiter.update_from_headers("campaigns.get", {"Units": "10/55/100"})
+    
+    assert limiter.acquire("campaigns.get") > 0.03
+
+
+def test_priority_order():
+    """Ожидающие запросы выполняются по приоритету, а не по времени постановки"""
+    limiter = UnitsRateLimiter(0)
+    limiter.throttle(delay=0.2)
+    order = []
+    
+    def request(name, priority):
+        limiter.acquire(name, priority)
+        order.append(name)
+        
+    threads = [
+        threading.Thread(target=request, args=("reports", UnitsRateLimiter.PRIORITY_LOW)),
+        threading.Thread(target=request, args=("campaigns.get", UnitsRateLimiter.PRIORITY_NORMAL)),
+        threading.Thread(target=request, args=("keywords.update", UnitsRateLimiter.PRIORITY_HIGH))
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+        
+    assert order == ["keywords.update", "campaigns.get", "reports"]
+    assert limiter.get_stats()["throttled"] == 1
+
+
+def test_manager_learns_units_from_server(account, make_manager):
+    """Менеджер передает планировщику заголовок Units ответов"""
+    with FakeDirectServer(FakeDirectBackend(account, units_limit=10000)) as server:
+        manager = make_manager(server)
+        
+        manager.get_campaigns()
+        manager.get_keywords(campaign_ids=list(account.campaigns))
+        
+    stats = manager.rate_limiter.get_stats()
+    assert stats["units_limit"] == 10000
+    assert stats["units_rest"] == 10000 - stats["units_spent"]
+    assert set(stats["operation_costs"]) == {"campaigns.get", "keywords.get"}
@@ -0,0 +1,85 @@
+"""
+Тесты потокового разбора отчетов и запросов к Reports API
+"""
+
+from array import array
+from datetime import date
+
+import pytest
+
+import yandex_direct_reports
+from yandex_direct_reports import TSVReportReader, build_report_definition
+
+
+REPORT = [
+    "Date\tCampaignId\tCampaignName\tClicks\tCost",
+    "2024-05-01\t1\tПервая\t10\t12.5",
+    "2024-05-01\t2\tВторая\t--\t--",
+    ""
+]
+
+
+def test_reader_parses_types():
+    """Числа приводятся к int и float, "--" - к нулю, пустые строки пропускаются"""
+    rows = list(TSVReportReader(REPORT).iter_dicts())
+    
+    assert rows == [
+        {"Date": "2024-05-01", "CampaignId": 1, "CampaignName": "Первая", "Clicks": 10, "Cost": 12.5},
+        {"Date": "2024-05-01", "CampaignId": 2, "CampaignName": "Вторая", "Clicks": 0, "Cost": 0.0}
+    ]
+
+
+def test_reader_columns():
+    columns = TSVReportReader(REPORT).read_columns()
+    
+    assert isinstance(columns["Clicks"], array)
+    assert list(columns["Clicks"]) == [10, 0]
+    assert columns["CampaignName"] == ["Первая", "Вторая"]
+
+
+def test_report_name_ignores_campaign_order():
+    first = build_report_definition(["CampaignId", "Clicks"], campaign_ids=[3, 1, 2])
+    second = build_report_definition(["CampaignId", "Clicks"], campaign_ids=[2, 3, 1, 1])
+    other = build_report_definition(["CampaignId", "Clicks"], campaign_ids=[1, 2])
+    
+    assert first["params"]["ReportName"] == second["params"]["ReportName"]
+    assert first["params"]["ReportName"] != other["params"]["ReportName"]
+
+
+class _Tomorrow(date):
+    @classmethod
+    def today(cls):
+        return date.fromordinal(date.today().toordinal() + 1)
+
+
+def test_relative_period_report_name_changes_daily(monkeypatch):
+    """Отчет за LAST_7_DAYS на следующий день получает новое имя, за CUSTOM_DATE - то же"""
+    fields = ["CampaignId", "Clicks"]
+    relative = build_report_definition(fields, date_range_type="LAST_7_DAYS")
+    custom = build_report_definition(fields, date_from="2024-05-01", date_to="2024-05-07")
+    
+    monkeypatch.setattr(yandex_direct_reports, "date", _Tomorrow)
+    
+    assert build_report_definition(fields, date_range_type="LAST_7_DAYS") != relative
+    assert build_report_definition(fields, date_from="2024-05-01", date_to="2024-05-07") == custom
+
+
+def test_report_tsv_parsing(manager, account):
+    """TSV отчета разбирается в типизированные значения"""
+    dates = account.dates()
+    date_from, date_to = dates[-10], dates[-1]
+    
+    rows = manager.get_statistics(
+        fields=["CampaignId", "Impressions", "Clicks", "Cost", "Conversions"],
+        date_from=date_from,
+        date_to=date_to
+    )
+    expected = account.stats_between(date_from, date_to).group_by("CampaignId").to_dict()
+    
+    assert sorted(row["CampaignId"] for row in rows) == sorted(expected)
+    for row in rows:
+        totals = expected[row["CampaignId"]]
+        assert isinstance(row["Impressions"], int)
+        assert row["Impressions"] == totals["Impressions"]
+        assert row["Clicks"] == totals["Clicks"]
+        assert row["Cost"] == pytest.approx(totals["Cost"], abs=0.01)
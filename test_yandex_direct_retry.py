@@ -0,0 +1,85 @@
+"""
+Тесты политики повторов
+"""
+
+import pytest
+import requests
+
+from yandex_direct_fake import FakeDirectServer
+from yandex_direct_manager import YandexDirectAPIError
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_retry import RetryPolicy, RetryBudget
+
+
+def api_error(code, status=200):
+    return YandexDirectAPIError({"error_code": code}, http_status=status)
+
+
+@pytest.mark.parametrize("error, idempotent, expected", [
+    (api_error(1000), False, True),
+    (api_error(52), True, True),
+    (api_error(1002), True, True),
+    (api_error(1002), False, False),
+    (api_error(53), True, False),
+    (requests.exceptions.ReadTimeout(), True, True),
+    (requests.exceptions.ReadTimeout(), False, False),
+    (requests.exceptions.ConnectTimeout(), False, True),
+    (ValueError(), True, False)
+])
+def test_is_retryable(error, idempotent, expected):
+    assert RetryPolicy().is_retryable(error, idempotent) is expected
+
+
+def test_delay_grows_exponentially_with_jitter():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    
+    assert [RetryPolicy(base_delay=1, max_delay=5, jitter=False).get_delay(n) for n in range(4)] == [1, 2, 4, 5]
+    for attempt in range(4):
+        full = min(5, 2 ** attempt)
+        assert full / 2 <= policy.get_delay(attempt) <= full
+
+
+def test_budget():
+    budget = RetryBudget(2)
+    
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    assert budget.remaining == 0
+
+
+def test_transient_errors_are_retried(backend, make_manager):
+    """Временные ошибки сервера повторяются, запросы в итоге выполняются"""
+    with FakeDirectServer(backend, error_rate=0.3, seed=3) as server:
+        manager = make_manager(server, retry_policy=RetryPolicy(max_attempts=10, base_delay=0.001))
+        
+        for _ in range(10):
+            assert len(manager.get_campaigns()) == 3
+            
+    assert manager.retry_stats["retries"] == server.stats["errors"] > 0
+
+
+def test_ambiguous_errors_are_not_retried_for_add(backend, make_manager):
+    """Неизвестный результат add не повторяется, чтобы не создать дубликат"""
+    with FakeDirectServer(backend, error_rate=1.0, error_codes=(1002,)) as server:
+        manager = make_manager(server, retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001))
+        
+        with pytest.raises(YandexDirectAPIError):
+            manager.create_campaign("Новая кампания")
+        assert server.stats["requests"] == 1
+
+
+def test_job_budget_limits_retries(backend, make_manager):
+    with FakeDirectServer(backend, error_rate=1.0) as server:
+        manager = make_manager(
+            server,
+            rate_limiter=UnitsRateLimiter(0),
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001)
+        )
+        
+        with manager.retry_budget_scope(4):
+            for _ in range(3):
+                with pytest.raises(YandexDirectAPIError):
+                    manager.get_campaigns()
+                    
+    assert manager.retry_stats["retries"] == 4
+    assert manager.retry_stats["budget_exhausted"] == 2
@@ -0,0 +1,99 @@
+"""
+Тесты столбцовой статистики StatsFrame
+"""
+
+from array import array
+
+import numpy as np
+import pytest
+
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS, DERIVED_METRICS
+
+
+def make_frame():
+    return StatsFrame.from_rows([
+        {"CampaignId": 2, "Impressions": 100, "Clicks": 10, "Cost": 50.0, "Conversions": 1},
+        {"CampaignId": 1, "Impressions": 200, "Clicks": 4, "Cost": 20.0, "Conversions": 0},
+        {"CampaignId": 2, "Impressions": 300, "Clicks": 30, "Cost": 150.0, "Conversions": 5},
+        {"CampaignId": 1, "Impressions": 0, "Clicks": 0, "Cost": 0.0, "Conversions": None}
+    ])
+
+
+def test_group_by_sums():
+    """Суммы по ключу, ключи отсортированы, целые метрики остаются целыми"""
+    grouped = make_frame().group_by("CampaignId")
+    
+    assert grouped["CampaignId"].tolist() == [1, 2]
+    assert grouped["Impressions"].tolist() == [200, 400]
+    assert grouped["Clicks"].dtype == np.int64
+    assert grouped["Cost"].tolist() == pytest.approx([20.0, 200.0])
+    assert grouped["Conversions"].tolist() == [0, 6]
+
+
+def test_group_by_derived_metrics():
+    """При полном наборе метрик добавляются CTR, CPC, CPA и конверсия"""
+    totals = make_frame().group_by("CampaignId").to_dict()
+    
+    assert all(metric in totals[2] for metric in DERIVED_METRICS)
+    assert totals[2]["ctr"] == pytest.approx(10.0)
+    assert totals[2]["cpc"] == pytest.approx(5.0)
+    assert totals[2]["cpa"] == pytest.approx(200.0 / 6)
+    # Без конверсий CPA не определен и равен нулю, а не inf
+    assert totals[1]["cpa"] == 0
+
+
+def test_group_by_mean_and_subset():
+    """how="mean" усредняет, неполный набор метрик - без производных"""
+    grouped = make_frame().group_by("CampaignId", metrics=["Clicks"], how="mean")
+    
+    assert grouped["Clicks"].tolist() == pytest.approx([2.0, 20.0])
+    assert set(grouped.columns) == {"CampaignId", "Clicks"}
+
+
+def test_group_by_empty_frame():
+    """Группировка пустого хранилища дает пустое хранилище с нужными полями"""
+    grouped = StatsFrame.empty(["CampaignId", *METRIC_COLUMNS]).group_by("CampaignId")
+    
+    assert len(grouped) == 0
+    assert "CampaignId" in grouped
+    assert grouped.to_dict() == {}
+
+
+def test_columns_must_have_equal_length():
+    with pytest.raises(ValueError):
+        StatsFrame({"CampaignId": np.asarray([1, 2]), "Clicks": np.asarray([1])})
+
+
+def test_from_columns_wraps_arrays_without_copy():
+    """Столбцы array.array из разбора отчета становятся массивами NumPy без копирования"""
+    clicks = array("q", [1, 2, 3])
+    frame = StatsFrame.from_columns({"CampaignId": [1, 1, 2], "Clicks": clicks, "Cost": array("d", [0.5, 1.0, 2.0])})
+    
+    assert frame["Clicks"].dtype == np.int64
+    assert frame["Cost"].dtype == np.float64
+    clicks[0] = 10
+    assert frame["Clicks"][0] == 10
+    # Отсутствующая метрика читается нулями
+    assert frame.column("Conversions").tolist() == [0, 0, 0]
+
+
+def test_split_select_and_totals():
+    frame = make_frame()
+    
+    parts = frame.split("CampaignId")
+    assert sorted(parts) == [1, 2]
+    assert parts[2]["Clicks"].tolist() == [10, 30]
+    
+    assert len(frame.select("CampaignId", [2])) == 2
+    totals = frame.totals()
+    assert totals["Clicks"] == 44
+    assert totals["ctr"] == pytest.approx(44 / 600 * 100)
+    assert make_frame().filter(np.zeros(4, dtype=bool)).split() == {}
+
+
+def test_with_derived_metrics_per_row():
+    """Построчные метрики; деление на ноль дает 0"""
+    frame = make_frame().with_derived_metrics()
+    
+    assert frame["cpc"].tolist() == pytest.approx([5.0, 5.0, 5.0, 0.0])
+    assert frame["conversion_rate"].tolist() == pytest.approx([10.0, 0.0, 50 / 3, 0.0])
@@ -0,0 +1,87 @@
+"""
+Тесты инкрементальной синхронизации статистики
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from yandex_direct_fake import STATS_FIELDS
+from yandex_direct_stats import StatsFrame
+from yandex_direct_sync import StatsStore, StatsSync
+
+
+def test_store_replaces_period_and_keeps_empty_days():
+    """Перезапись периода удаляет старые строки; день без показов тоже считается загруженным"""
+    store = StatsStore()
+    columns = {
+        "Date": ["2024-05-01", "2024-05-01", "2024-05-02"],
+        "CampaignId": [1, 2, 1],
+        "Impressions": [10, 20, 30],
+        "Clicks": [1, 2, 3],
+        "Cost": [1.0, 2.0, 3.0],
+        "Conversions": [0, 1, 0]
+    }
+    store.replace_period("2024-05-01", "2024-05-03", columns)
+    store.replace_period("2024-05-02", "2024-05-03", {field: values[:0] for field, values in columns.items()})
+    
+    assert sorted(store.synced_dates("2024-05-01", "2024-05-03")) == ["2024-05-01", "2024-05-02", "2024-05-03"]
+    frame = store.frame("2024-05-01", "2024-05-03")
+    assert frame["Date"].tolist() == ["2024-05-01", "2024-05-01"]
+    assert frame["Clicks"].tolist() == [1, 2]
+    store.close()
+
+
+def test_stats_sync_is_incremental(manager, backend):
+    """Повторная синхронизация загружает только уточняемые дни"""
+    sync = StatsSync(manager, StatsStore(), restatement_days=3, min_sync_interval=0)
+    
+    assert sync.sync(31) == 31
+    assert sync.sync(31) == 3
+    assert backend.calls["reports.get"] == 2
+    
+    sync.min_sync_interval = 900
+    assert sync.sync(31) == 0
+    assert backend.calls["reports.get"] == 2
+
+
+def test_stats_sync_picks_up_restatement(manager, backend, account):
+    """Статистика последних дней перезаписывается уточненной"""
+    sync = StatsSync(manager, StatsStore(), restatement_days=3, min_sync_interval=0)
+    sync.sync(31)
+    
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    campaign_id = min(account.campaigns)
+    keyword = next(k for k in account.keywords.values() if k["CampaignId"] == campaign_id)
+    before = sync.store.frame(yesterday, yesterday, [campaign_id]).column("Clicks").sum()
+    
+    restated = {field: np.asarray([0]) for field in STATS_FIELDS}
+    restated.update({
+        "Date": np.asarray([yesterday]),
+        "CampaignId": np.asarray([campaign_id]),
+        "AdGroupId": np.asarray([keyword["AdGroupId"]]),
+        "CriterionId": np.asarray([keyword["Id"]]),
+        "Impressions": np.asarray([500]),
+        "Clicks": np.asarray([50]),
+        "Cost": np.asarray([100.0])
+    })
+    backend.add_stats(StatsFrame(restated))
+    sync.sync(31)
+    
+    after = sync.store.frame(yesterday, yesterday, [campaign_id]).column("Clicks").sum()
+    assert after == before + 50
+
+
+def test_stats_store_chunks_campaign_filter(manager):
+    """Фильтр по кампаниям длиннее _SQL_CHUNK дает тот же результат"""
+    store = StatsStore()
+    sync = StatsSync(manager, store)
+    full = sync.get_frame(30)
+    
+    store._SQL_CHUNK = 2
+    date_from, date_to = sync.period(30)
+    filtered = store.frame(date_from, date_to, sorted(set(full["CampaignId"].tolist())))
+    
+    assert len(filtered) == len(full)
+    assert filtered["Date"].tolist() == full["Date"].tolist()
+    assert filtered["CampaignId"].tolist() == full["CampaignId"].tolist()
@@ -0,0 +1,68 @@
+"""
+Тесты трендов и аномалий дневной статистики
+"""
+
+import numpy as np
+import pytest
+
+from yandex_direct_trends import (
+    pivot_daily, rolling_mean, trend_slopes, zscores, detect_trends, latest_anomalies
+)
+
+
+def test_pivot_daily_fills_missing_days(daily_stats):
+    """Дни без строк заполняются нулями, период можно расширить за пределы статистики"""
+    campaign_ids, dates, matrix = pivot_daily(daily_stats, "Impressions", date_to="2024-05-23")
+    
+    assert campaign_ids.tolist() == [1, 2, 3, 4, 5]
+    assert str(dates[0]) == "2024-05-01" and len(dates) == 23
+    assert matrix[4, :4].tolist() == [100, 0, 100, 0]
+    assert matrix[:, -2:].sum() == 0
+
+
+def test_rolling_mean_and_slopes():
+    matrix = np.array([[1.0, 2.0, 3.0, 4.0], [5.0, 5.0, 5.0, 5.0], [0.0, 0.0, 0.0, 0.0]])
+    
+    assert rolling_mean(matrix, 2)[0].tolist() == [1.0, 1.5, 2.5, 3.5]
+    slopes, change = trend_slopes(matrix)
+    assert slopes.tolist() == pytest.approx([1.0, 0.0, 0.0])
+    assert change.tolist() == pytest.approx([120.0, 0.0, 0.0])
+
+
+def test_zscores_have_poisson_floor():
+    """Изменение после ряда одинаковых значений дает конечный z-score"""
+    matrix = np.array([[100.0] * 7 + [130.0]])
+    
+    scores, expected = zscores(matrix, 7)
+    
+    assert scores[0, :7].tolist() == [0.0] * 7
+    assert expected[0, 7] == 100.0
+    assert scores[0, 7] == pytest.approx(3.0)
+
+
+def test_detect_trends(daily_stats):
+    trends = detect_trends(daily_stats)
+    
+    assert trends[1]["impressions_trend"] == "growing"
+    assert trends[2]["impressions_trend"] == "declining"
+    assert trends[4]["impressions_trend"] == "stable"
+    assert trends[4]["moving_average"]["impressions"] == 100.0
+    assert trends[4]["anomalies"] == []
+    assert {(anomaly["date"], anomaly["metric"]) for anomaly in trends[3]["anomalies"]} == {
+        ("2024-05-21", "impressions"),
+        ("2024-05-21", "clicks"),
+        ("2024-05-21", "cost")
+    }
+    assert detect_trends(daily_stats.select("CampaignId", [])) == {}
+
+
+def test_latest_anomalies(daily_stats):
+    """Аномалии за период по всем кампаниям, самые сильные первыми"""
+    trends = detect_trends(daily_stats)
+    
+    anomalies = latest_anomalies(trends, "2024-05-21")
+    
+    assert {anomaly["campaign_id"] for anomaly in anomalies} == {3}
+    scores = [abs(anomaly["zscore"]) for anomaly in anomalies]
+    assert scores == sorted(scores, reverse=True)
+    assert latest_anomalies(trends, "2024-05-22") == []
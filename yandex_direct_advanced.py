@@ -4,10 +4,24 @@
 """
 
 import json
-import csv
+import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from yandex_direct_manager import YandexDirectManager, CampaignAutomation
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_retry import RetryPolicy
+from yandex_direct_cache import ResponseCache
+from yandex_direct_plan import MutationPlan
+from yandex_direct_sync import StatsStore, StatsSync
+from yandex_direct_parallel import ParallelAnalyzer, build_analysis
+from yandex_direct_trends import detect_trends, latest_anomalies
+from yandex_direct_ranking import rank_keywords
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS
+from yandex_direct_metrics import MetricsRegistry, traced
+from yandex_direct_codec import get_codec
+from yandex_direct_models import Keyword
+from yandex_direct_graph import AccountGraph
+from yandex_direct_export import AccountExporter
 from yandex_direct_config import config
 import logging
 
@@ -17,16 +31,70 @@ logger = logging.getLogger(__name__)
 class AdvancedYandexDirectScenarios:
     """Продвинутые сценарии использования API"""
     
-    def __init__(self):
-        """Инициализация"""
-        self.manager = YandexDirectManager(
+    def __init__(self,
+                 manager: Optional[YandexDirectManager] = None,
+                 stats_sync: Optional[StatsSync] = None):
+        """
+        Инициализация
+        
+        Args:
+            manager: Готовый менеджер (например, для клиента агентства);
+                по умолчанию создается по настройкам config
+            stats_sync: Синхронизация статистики (по умолчанию с
+                хранилищем STATS_STORE_PATH)
+        """
+        self.manager = manager or YandexDirectManager(
             access_token=config.YANDEX_DIRECT_TOKEN,
-            use_sandbox=config.USE_SANDBOX
+            use_sandbox=config.USE_SANDBOX,
+            pool_connections=config.POOL_CONNECTIONS,
+            pool_maxsize=config.POOL_MAXSIZE,
+            pool_block=config.POOL_BLOCK,
+            keep_alive=config.KEEP_ALIVE,
+            rate_limiter=UnitsRateLimiter(
+                max_requests_per_second=config.RATE_LIMIT_RPS,
+                reserve_units=config.RATE_LIMIT_RESERVE_UNITS
+            ),
+            max_throttle_wait=config.RATE_LIMIT_MAX_WAIT,
+            request_timeout=config.REQUEST_TIMEOUT,
+            retry_policy=RetryPolicy(
+                max_attempts=config.RETRY_ATTEMPTS,
+                base_delay=config.RETRY_DELAY,
+                max_delay=config.RETRY_MAX_DELAY
+            ),
+            cache=ResponseCache(
+                config.CACHE_PATH,
+                ttls=config.CACHE_TTLS
+            ) if config.CACHE_ENABLED else None,
+            metrics=MetricsRegistry() if config.METRICS_ENABLED else None,
+            codec=get_codec(config.JSON_CODEC),
+            lazy_pages=config.LAZY_PAGES
         )
-        self.automation = CampaignAutomation(self.manager)
+        # Хранилище, созданное здесь, закрывается в close()
+        self._owns_stats_store = stats_sync is None
+        self.stats_sync = stats_sync or StatsSync(
+            self.manager,
+            StatsStore(self._stats_store_path(self.manager.client_login)),
+            restatement_days=config.STATS_RESTATEMENT_DAYS,
+            min_sync_interval=config.STATS_SYNC_INTERVAL
+        )
+        self.automation = CampaignAutomation(self.manager, stats_sync=self.stats_sync)
+        
+    @staticmethod
+    def _stats_store_path(client_login: Optional[str]) -> str:
+        """Файл хранилища статистики: у каждого клиента агентства свой"""
+        if not client_login or config.STATS_STORE_PATH == ":memory:":
+            return config.STATS_STORE_PATH
+        root, ext = os.path.splitext(config.STATS_STORE_PATH)
+        return f"{root}.{client_login}{ext}"
     
+    def close(self):
+        """Закрывает созданное сценариями хранилище статистики (менеджер не закрывается)"""
+        if self._owns_stats_store:
+            self.stats_sync.store.close()
+            
     # ==================== СЦЕНАРИЙ 1: АНАЛИЗ ПРОИЗВОДИТЕЛЬНОСТИ ====================
     
+    @traced()
     def analyze_campaign_performance(self, campaign_id: int) -> Dict:
         """
         Анализирует производительность кампании за последние 30 дней
@@ -46,78 +114,27 @@ class AdvancedYandexDirectScenarios:
                 print(f"Кампания {campaign_id} не найдена")
                 return {}
             
-            # Получаем статистику за последние 30 дней
-            stats = self.manager.get_statistics(
-                date_range_type="LAST_30_DAYS",
-                campaign_ids=[campaign_id]
-            )
+            # Статистика за последние 30 дней из локального хранилища
+            frame = self.stats_sync.get_frame(30, [campaign_id])
+            date_from, date_to = self.stats_sync.period(30)
             
             # Анализируем данные
             analysis = {
                 "campaign_id": campaign_id,
-                "campaign_name": campaign.get("Name"),
+                "campaign_name": campaign.Name,
                 "analysis_date": datetime.now().isoformat(),
-                "period": "LAST_30_DAYS",
-                "metrics": {
-                    "total_impressions": 0,
-                    "total_clicks": 0,
-                    "total_cost": 0,
-                    "total_conversions": 0,
-                    "avg_ctr": 0,
-                    "avg_cpc": 0,
-                    "avg_cpa": 0,
-                    "conversion_rate": 0
-                },
-                "daily_breakdown": [],
-                "trends": {
-                    "impressions_trend": "stable",
-                    "clicks_trend": "stable",
-                    "cost_trend": "stable"
-                }
-            }
-            
-            # Суммируем метрики
-            for stat in stats:
-                analysis["metrics"]["total_impressions"] += stat.get("Impressions", 0)
-                analysis["metrics"]["total_clicks"] += stat.get("Clicks", 0)
-                analysis["metrics"]["total_cost"] += stat.get("Cost", 0)
-                analysis["metrics"]["total_conversions"] += stat.get("Conversions", 0)
-                
-                # Добавляем дневной разбор
-                analysis["daily_breakdown"].append({
-                    "date": stat.get("Date"),
-                    "impressions": stat.get("Impressions", 0),
-                    "clicks": stat.get("Clicks", 0),
-                    "cost": stat.get("Cost", 0),
-                    "conversions": stat.get("Conversions", 0)
-                })
-            
-            # Вычисляем средние метрики
-            if analysis["metrics"]["total_impressions"] > 0:
-                analysis["metrics"]["avg_ctr"] = (
-                    analysis["metrics"]["total_clicks"] / 
-                    analysis["metrics"]["total_impressions"] * 100
-                )
-            
-            if analysis["metrics"]["total_clicks"] > 0:
-                analysis["metrics"]["avg_cpc"] = (
-                    analysis["metrics"]["total_cost"] / 
-                    analysis["metrics"]["total_clicks"]
-                )
-            
-            if analysis["metrics"]["total_conversions"] > 0:
-                analysis["metrics"]["avg_cpa"] = (
-                    analysis["metrics"]["total_cost"] / 
-                    analysis["metrics"]["total_conversions"]
-                )
-                analysis["metrics"]["conversion_rate"] = (
-                    analysis["metrics"]["total_conversions"] / 
-                    analysis["metrics"]["total_clicks"] * 100
+                **build_analysis(
+                    campaign_id,
+                    frame,
+                    date_from=date_from,
+                    date_to=date_to,
+                    **config.TREND_OPTIONS
                 )
+            }
             
             # Выводим результаты
-            print(f"  Название: {campaign.get('Name')}")
-            print(f"  Статус: {campaign.get('Status')}")
+            print(f"  Название: {campaign.Name}")
+            print(f"  Статус: {campaign.Status}")
             print(f"\n  Метрики за 30 дней:")
             print(f"    Показы: {analysis['metrics']['total_impressions']}")
             print(f"    Клики: {analysis['metrics']['total_clicks']}")
@@ -128,14 +145,82 @@ class AdvancedYandexDirectScenarios:
             print(f"    CPA: {analysis['metrics']['avg_cpa']:.2f}")
             print(f"    Conversion Rate: {analysis['metrics']['conversion_rate']:.2f}%")
             
+            trends = analysis["trends"]
+            print(f"\n  Тренды: показы - {trends['impressions_trend']}, "
+                  f"клики - {trends['clicks_trend']}, затраты - {trends['cost_trend']}")
+            for anomaly in trends["anomalies"]:
+                print(f"    ⚠️  {anomaly['date']}: {anomaly['metric']} = {anomaly['value']:.0f} "
+                      f"(ожидалось {anomaly['expected']:.0f}, z = {anomaly['zscore']:.1f})")
+            
             return analysis
         
         except Exception as e:
             logger.error(f"Ошибка при анализе кампании: {e}")
             return {}
     
+    @traced()
+    def analyze_campaigns_performance(self,
+                                      campaign_ids: Optional[List[int]] = None,
+                                      parallel: bool = True) -> Dict[int, Dict]:
+        """
+        Анализирует производительность многих кампаний за последние 30 дней
+        
+        Кампании распределяются по пулу процессов (ParallelAnalyzer),
+        результат совпадает с analyze_campaign_performance для каждой кампании.
+        
+        Args:
+            campaign_ids: ID кампаний (по умолчанию все кампании аккаунта)
+            parallel: Использовать пул процессов
+            
+        Returns:
+            Словарь {ID кампании: анализ}
+        """
+        print(f"\n📊 Анализ производительности кампаний")
+        
+        try:
+            campaigns = {
+                campaign.Id: campaign
+                for campaign in self.manager.get_campaigns(campaign_ids=campaign_ids)
+            }
+            if not campaigns:
+                print("Кампании не найдены")
+                return {}
+            
+            frame = self.stats_sync.get_frame(30, list(campaigns))
+            date_from, date_to = self.stats_sync.period(30)
+            analyzer = ParallelAnalyzer(
+                max_workers=config.ANALYSIS_WORKERS or None,
+                trend_options=config.TREND_OPTIONS
+            )
+            analyses = analyzer.analyze(
+                frame,
+                list(campaigns),
+                parallel=parallel,
+                date_from=date_from,
+                date_to=date_to
+            )
+            
+            analysis_date = datetime.now().isoformat()
+            result = {
+                campaign_id: {
+                    "campaign_id": campaign_id,
+                    "campaign_name": campaigns[campaign_id].get("Name"),
+                    "analysis_date": analysis_date,
+                    **analysis
+                }
+                for campaign_id, analysis in analyses.items()
+            }
+            
+            print(f"  Проанализировано кампаний: {len(result)}")
+            return result
+        
+        except Exception as e:
+            logger.error(f"Ошибка при анализе кампаний: {e}")
+            return {}
+    
     # ==================== СЦЕНАРИЙ 2: ОПТИМИЗАЦИЯ СТАВОК ====================
     
+    @traced()
     def optimize_bids_by_performance(self, 
                                     campaign_id: int,
                                     top_percent: float = 20,
@@ -160,12 +245,7 @@ class AdvancedYandexDirectScenarios:
                 print("Ключевые слова не найдены")
                 return {"updated": 0, "increased": 0, "decreased": 0}
             
-            # Сортируем по производительности (по ставке)
-            sorted_keywords = sorted(keywords, key=lambda x: x.get("Bid", 0), reverse=True)
-            
-            total_keywords = len(sorted_keywords)
-            top_count = max(1, int(total_keywords * top_percent / 100))
-            bottom_count = max(1, int(total_keywords * bottom_percent / 100))
+            total_keywords = len(keywords)
             
             results = {
                 "campaign_id": campaign_id,
@@ -176,41 +256,24 @@ class AdvancedYandexDirectScenarios:
                 "changes": []
             }
             
-            # Увеличиваем ставки для лучших
-            for keyword in sorted_keywords[:top_count]:
-                keyword_id = keyword.get("Id")
-                current_bid = keyword.get("Bid", 0)
-                
-                if current_bid > 0:
-                    new_bid = int(current_bid * 1.15)  # Увеличиваем на 15%
-                    
-                    if self.manager.update_keyword_bid(keyword_id, new_bid):
-                        results["updated"] += 1
-                        results["increased"] += 1
-                        results["changes"].append({
-                            "keyword_id": keyword_id,
-                            "action": "increased",
-                            "old_bid": current_bid,
-                            "new_bid": new_bid
-                        })
-            
-            # Уменьшаем ставки для худших
-            for keyword in sorted_keywords[-bottom_count:]:
-                keyword_id = keyword.get("Id")
-                current_bid = keyword.get("Bid", 0)
+            # Ранжируем по статистике ключевых слов и отправляем изменения одним пакетом
+            keyword_stats = self.manager.get_keyword_statistics_frame([campaign_id])
+            plan = self.plan_bid_changes(keywords, keyword_stats, top_percent, bottom_percent)
+            
+            for update in plan.apply(self.manager)["bids"]:
+                if not update["success"]:
+                    continue
                 
-                if current_bid > 100:  # Минимальная ставка
-                    new_bid = max(100, int(current_bid * 0.85))  # Уменьшаем на 15%
-                    
-                    if self.manager.update_keyword_bid(keyword_id, new_bid):
-                        results["updated"] += 1
-                        results["decreased"] += 1
-                        results["changes"].append({
-                            "keyword_id": keyword_id,
-                            "action": "decreased",
-                            "old_bid": current_bid,
-                            "new_bid": new_bid
-                        })
+                change = plan.bid_changes[update["Id"]]
+                action = change["reason"]
+                results["updated"] += 1
+                results[action] += 1
+                results["changes"].append({
+                    "keyword_id": update["Id"],
+                    "action": action,
+                    "old_bid": change["old"],
+                    "new_bid": change["new"]
+                })
             
             print(f"  Всего ключевых слов: {total_keywords}")
             print(f"  Увеличено ставок: {results['increased']}")
@@ -223,50 +286,155 @@ class AdvancedYandexDirectScenarios:
             logger.error(f"Ошибка при оптимизации ставок: {e}")
             return {"updated": 0, "increased": 0, "decreased": 0}
     
+    def plan_bid_optimization(self,
+                              campaign_id: int,
+                              top_percent: float = 20,
+                              bottom_percent: float = 20) -> MutationPlan:
+        """
+        Составляет план оптимизации ставок кампании (без изменений в API)
+        
+        Args:
+            campaign_id: ID кампании
+            top_percent: Доля лучших ключевых слов
+            bottom_percent: Доля худших ключевых слов
+            
+        Returns:
+            План изменений ставок
+        """
+        keywords = self.manager.get_keywords(campaign_id=campaign_id)
+        keyword_stats = self.manager.get_keyword_statistics_frame([campaign_id])
+        return self.plan_bid_changes(keywords, keyword_stats, top_percent, bottom_percent)
+    
+    @staticmethod
+    def plan_bid_changes(keywords: List[Keyword],
+                         keyword_stats: StatsFrame,
+                         top_percent: float = 20,
+                         bottom_percent: float = 20,
+                         plan: Optional[MutationPlan] = None,
+                         increase_percent: float = 15,
+                         decrease_percent: float = 15,
+                         min_bid: int = 100,
+                         max_bid: Optional[int] = None) -> MutationPlan:
+        """
+        Рассчитывает изменения ставок без обращения к API
+        
+        Ключевые слова ранжируются по статистике (конверсии на рубль
+        затрат, см. yandex_direct_ranking); слова без кликов за период
+        не меняются.
+        
+        Args:
+            keywords: Ключевые слова кампании (модели Keyword с полями Id и Bid)
+            keyword_stats: Статистика CRITERIA_PERFORMANCE_REPORT
+                (get_keyword_statistics_frame)
+            top_percent: Доля лучших ключевых слов
+            bottom_percent: Доля худших ключевых слов
+            plan: План, в который добавляются изменения (по умолчанию новый)
+            increase_percent: Увеличение ставки лучших ключевых слов
+            decrease_percent: Уменьшение ставки худших ключевых слов
+            min_bid: Минимальная ставка
+            max_bid: Максимальная ставка (по умолчанию без ограничения)
+            
+        Returns:
+            План; причина изменения ставки - "increased" или "decreased"
+        """
+        if plan is None:
+            plan = MutationPlan()
+        
+        if not keywords:
+            return plan
+        
+        top_keywords, bottom_keywords = rank_keywords(
+            keywords, keyword_stats, top_percent, bottom_percent
+        )
+        
+        # Увеличиваем ставки для лучших
+        for keyword in top_keywords:
+            current_bid = keyword.Bid or 0
+            
+            if current_bid > 0:
+                new_bid = int(current_bid * (1 + increase_percent / 100))
+                if max_bid is not None:
+                    new_bid = min(new_bid, max_bid)
+                # Ставка уже на максимуме или выше - не трогаем
+                if new_bid > current_bid:
+                    plan.add_bid(keyword.Id, new_bid, current_bid, reason="increased")
+        
+        # Уменьшаем ставки для худших (не пересекаясь с лучшими)
+        for keyword in bottom_keywords:
+            current_bid = keyword.Bid or 0
+            
+            if current_bid > min_bid:
+                new_bid = max(min_bid, int(current_bid * (1 - decrease_percent / 100)))
+                if new_bid < current_bid:
+                    plan.add_bid(keyword.Id, new_bid, current_bid, reason="decreased")
+        
+        return plan
+    
     # ==================== СЦЕНАРИЙ 3: ЭКСПОРТ В CSV ====================
     
+    @traced()
     def export_campaigns_to_csv(self, filename: str = "campaigns_export.csv") -> bool:
         """
-        Экспортирует информацию о кампаниях в CSV
+        Экспортирует кампании со статистикой за 30 дней
+        
+        Args:
+            filename: Имя файла для экспорта (.csv или .csv.gz)
+            
+        Returns:
+            True если успешно, False иначе
+        """
+        headers = [
+            'ID', 'Название', 'Статус', 'Тип', 'Дневной бюджет',
+            'Часовой пояс', 'Дата начала', 'Дата окончания',
+            'Показы', 'Клики', 'Расход', 'Конверсии',
+            'CTR', 'CPC', 'CPA', 'Конверсия'
+        ]
+        fill = {'DailyBudget': 'N/A', 'StartDate': 'N/A', 'EndDate': 'N/A'}
+        return self.export_account(filename, "campaigns", headers=headers, fill=fill)
+    
+    @traced()
+    def export_account(self,
+                       filename: str,
+                       service: str = "keywords",
+                       columns: Optional[List[str]] = None,
+                       headers: Optional[List[str]] = None,
+                       with_stats: bool = True,
+                       fill: Optional[Dict] = None) -> bool:
+        """
+        Потоково экспортирует кампании, группы или ключевые слова со статистикой
+        
+        Объекты записываются частями по EXPORT_CHUNK_SIZE по мере загрузки
+        страниц, поэтому экспорт миллионов ключевых слов не держит их в памяти.
         
         Args:
-            filename: Имя файла для экспорта
+            filename: Имя файла (.csv, .csv.gz, .parquet, .arrow)
+            service: campaigns, adgroups или keywords
+            columns: Поля объектов (по умолчанию AccountExporter.DEFAULT_COLUMNS)
+            headers: Заголовки столбцов объектов и статистики
+            with_stats: Присоединить статистику за 30 дней
+            fill: Значения для отсутствующих полей по столбцам
             
         Returns:
             True если успешно, False иначе
         """
-        print(f"\n📥 Экспорт кампаний в {filename}")
+        print(f"\n📥 Экспорт {service} в {filename}")
         
         try:
-            campaigns = self.manager.get_campaigns()
+            exporter = AccountExporter(self.manager, chunk_size=config.EXPORT_CHUNK_SIZE)
+            count = exporter.export(
+                service,
+                filename,
+                columns=columns,
+                headers=headers,
+                with_stats=with_stats,
+                fill=fill
+            )
             
-            if not campaigns:
-                print("Кампании не найдены")
+            if count == 0:
+                print("Объекты не найдены")
                 return False
             
-            # Получаем статистику для каждой кампании
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = [
-                    'ID', 'Название', 'Статус', 'Тип', 'Дневной бюджет',
-                    'Часовой пояс', 'Дата начала', 'Дата окончания'
-                ]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                
-                for campaign in campaigns:
-                    writer.writerow({
-                        'ID': campaign.get('Id'),
-                        'Название': campaign.get('Name'),
-                        'Статус': campaign.get('Status'),
-                        'Тип': campaign.get('Type'),
-                        'Дневной бюджет': campaign.get('DailyBudget', 'N/A'),
-                        'Часовой пояс': campaign.get('Timezone'),
-                        'Дата начала': campaign.get('StartDate', 'N/A'),
-                        'Дата окончания': campaign.get('EndDate', 'N/A')
-                    })
-            
-            print(f"✓ Экспортировано кампаний: {len(campaigns)}")
+            print(f"✓ Экспортировано объектов: {count}")
             print(f"✓ Файл сохранен: {filename}")
             return True
         
@@ -276,6 +444,7 @@ class AdvancedYandexDirectScenarios:
     
     # ==================== СЦЕНАРИЙ 4: МОНИТОРИНГ БЮДЖЕТА ====================
     
+    @traced()
     def monitor_budget_spending(self) -> Dict:
         """
         Мониторит расходование бюджета по кампаниям
@@ -287,22 +456,15 @@ class AdvancedYandexDirectScenarios:
         
         try:
             campaigns = self.manager.get_campaigns()
-            stats = self.manager.get_statistics(date_range_type="TODAY")
+            frame = self.manager.get_statistics_frame(
+                date_range_type="TODAY",
+                fields=["CampaignId", "Cost", "Impressions", "Clicks"]
+            )
             
             # Группируем статистику по кампаниям
-            campaign_stats = {}
-            for stat in stats:
-                campaign_id = stat.get("CampaignId")
-                if campaign_id not in campaign_stats:
-                    campaign_stats[campaign_id] = {
-                        "cost": 0,
-                        "impressions": 0,
-                        "clicks": 0
-                    }
-                
-                campaign_stats[campaign_id]["cost"] += stat.get("Cost", 0)
-                campaign_stats[campaign_id]["impressions"] += stat.get("Impressions", 0)
-                campaign_stats[campaign_id]["clicks"] += stat.get("Clicks", 0)
+            campaign_stats = frame.group_by(
+                "CampaignId", metrics=("Cost", "Impressions", "Clicks")
+            ).to_dict("CampaignId")
             
             # Анализируем расходование
             budget_report = {
@@ -314,15 +476,15 @@ class AdvancedYandexDirectScenarios:
             }
             
             for campaign in campaigns:
-                campaign_id = campaign.get("Id")
+                campaign_id = campaign.Id
                 daily_budget = campaign.get("DailyBudget", 0)
-                spent_today = campaign_stats.get(campaign_id, {}).get("cost", 0)
+                spent_today = campaign_stats.get(campaign_id, {}).get("Cost", 0)
                 remaining = daily_budget - spent_today
                 spent_percent = (spent_today / daily_budget * 100) if daily_budget > 0 else 0
                 
                 budget_report["campaigns"].append({
                     "id": campaign_id,
-                    "name": campaign.get("Name"),
+                    "name": campaign.Name,
                     "daily_budget": daily_budget,
                     "spent_today": spent_today,
                     "remaining": remaining,
@@ -356,6 +518,7 @@ class AdvancedYandexDirectScenarios:
     
     # ==================== СЦЕНАРИЙ 5: СРАВНЕНИЕ КАМПАНИЙ ====================
     
+    @traced()
     def compare_campaigns(self, campaign_ids: List[int]) -> Dict:
         """
         Сравнивает производительность нескольких кампаний
@@ -375,30 +538,35 @@ class AdvancedYandexDirectScenarios:
                 "best_by_metric": {}
             }
             
-            # Получаем статистику для каждой кампании
+            # Получаем кампании и статистику по всем кампаниям двумя запросами
+            campaigns = {
+                c.Id: c
+                for c in self.manager.get_campaigns(campaign_ids=campaign_ids)
+            }
+            totals = self.manager.get_campaign_totals(
+                campaign_ids=campaign_ids,
+                date_range_type="LAST_7_DAYS"
+            )
+            
             for campaign_id in campaign_ids:
-                campaign = self.manager.get_campaign_by_id(campaign_id)
-                stats = self.manager.get_statistics(
-                    date_range_type="LAST_7_DAYS",
-                    campaign_ids=[campaign_id]
-                )
+                campaign = campaigns.get(campaign_id)
                 
                 if not campaign:
                     continue
                 
-                # Суммируем метрики
-                total_impressions = sum(s.get("Impressions", 0) for s in stats)
-                total_clicks = sum(s.get("Clicks", 0) for s in stats)
-                total_cost = sum(s.get("Cost", 0) for s in stats)
-                total_conversions = sum(s.get("Conversions", 0) for s in stats)
-                
-                ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
-                cpc = (total_cost / total_clicks) if total_clicks > 0 else 0
+                # Суммарные метрики
+                campaign_totals = totals.get(campaign_id, {})
+                total_impressions = campaign_totals.get("Impressions", 0)
+                total_clicks = campaign_totals.get("Clicks", 0)
+                total_cost = campaign_totals.get("Cost", 0)
+                total_conversions = campaign_totals.get("Conversions", 0)
+                ctr = campaign_totals.get("ctr", 0)
+                cpc = campaign_totals.get("cpc", 0)
                 
                 campaign_data = {
                     "id": campaign_id,
-                    "name": campaign.get("Name"),
-                    "status": campaign.get("Status"),
+                    "name": campaign.Name,
+                    "status": campaign.Status,
                     "impressions": total_impressions,
                     "clicks": total_clicks,
                     "ctr": ctr,
@@ -449,6 +617,7 @@ class AdvancedYandexDirectScenarios:
     
     # ==================== СЦЕНАРИЙ 6: АВТОМАТИЧЕСКОЕ РАСПИСАНИЕ ====================
     
+    @traced()
     def schedule_daily_optimization(self) -> Dict:
         """
         Выполняет ежедневную оптимизацию кампаний
@@ -458,43 +627,115 @@ class AdvancedYandexDirectScenarios:
         """
         print(f"\n🔄 Ежедневная оптимизация кампаний")
         
+        with self.manager.retry_budget_scope(config.RETRY_BUDGET):
+            return self._run_daily_optimization()
+    
+    def _run_daily_optimization(self) -> Dict:
+        """
+        Выполняет ежедневную оптимизацию в рамках бюджета повторов
+        
+        Данные загружаются для всего аккаунта сразу (кампании, статистика
+        за 30 дней одним отчетом, ключевые слова пачками кампаний, их
+        статистика одним отчетом CRITERIA_PERFORMANCE_REPORT), решения
+        принимаются локально, изменения отправляются пакетами. Количество
+        запросов не растет с числом кампаний.
+        """
         try:
             results = {
                 "timestamp": datetime.now().isoformat(),
-                "actions": []
+                "actions": [],
+                "alerts": []
             }
             
-            # Получаем все кампании
-            campaigns = self.manager.get_campaigns()
-            
+            # Получаем все кампании и их статистику за 30 дней
+            graph = AccountGraph(campaigns=self.manager.get_campaigns(fields=["Id", "Name", "Status"]))
+            campaigns = list(graph.campaigns.values())
+            if not campaigns:
+                print("Кампании не найдены")
+                return results
+            
+            frame = self.stats_sync.get_frame(30, list(graph.campaigns))
+            totals = frame.group_by().to_dict()
+            
+            # Аномалии последнего дня по всем кампаниям сразу
+            date_from, date_to = self.stats_sync.period(30)
+            trends = detect_trends(frame, date_from=date_from, date_to=date_to, **config.TREND_OPTIONS)
+            results["alerts"] = [
+                {"campaign_name": graph.campaigns[anomaly["campaign_id"]].Name, **anomaly}
+                for anomaly in latest_anomalies(trends, since=date_to)
+            ]
+            if results["alerts"]:
+                print(f"⚠️  Аномалий за {date_to}: {len(results['alerts'])}")
+            
+            # Решаем, что делать с каждой кампанией
+            plan = MutationPlan()
+            to_optimize = []
             for campaign in campaigns:
-                campaign_id = campaign.get("Id")
-                campaign_name = campaign.get("Name")
-                
-                # Анализируем производительность
-                analysis = self.analyze_campaign_performance(campaign_id)
-                
-                if not analysis:
-                    continue
+                campaign_id = campaign.Id
+                avg_ctr = totals.get(campaign_id, {}).get("ctr", 0)
                 
                 # Если CTR слишком низкий, приостанавливаем
-                if analysis["metrics"]["avg_ctr"] < 0.3:
-                    if self.manager.pause_campaign(campaign_id):
-                        results["actions"].append({
-                            "campaign_id": campaign_id,
-                            "campaign_name": campaign_name,
-                            "action": "paused",
-                            "reason": f"Low CTR: {analysis['metrics']['avg_ctr']:.2f}%"
-                        })
+                if avg_ctr < 0.3:
+                    plan.add_status(
+                        campaign_id,
+                        "STOPPED",
+                        current_status=campaign.Status,
+                        reason=f"Low CTR: {avg_ctr:.2f}%"
+                    )
                 
                 # Если CTR хороший, оптимизируем ставки
-                elif analysis["metrics"]["avg_ctr"] > 1.0:
-                    opt_results = self.optimize_bids_by_performance(campaign_id)
+                elif avg_ctr > 1.0:
+                    to_optimize.append(campaign_id)
+            
+            # Ключевые слова всех оптимизируемых кампаний
+            if to_optimize:
+                graph.add_many("keywords", self.manager.iter_keywords(campaign_ids=to_optimize))
+            
+            # Статистика ключевых слов всех оптимизируемых кампаний одним отчетом
+            keyword_stats = {}
+            if to_optimize:
+                keyword_stats = self.manager.get_keyword_statistics_frame(to_optimize).split("CampaignId")
+            no_stats = StatsFrame.empty(["CriterionId", *METRIC_COLUMNS])
+            
+            for campaign_id in to_optimize:
+                self.plan_bid_changes(
+                    graph.children("keywords", campaign_id=campaign_id),
+                    keyword_stats.get(campaign_id, no_stats),
+                    plan=plan
+                )
+            
+            # Отправляем изменения пакетами
+            applied = plan.apply(self.manager)
+            
+            paused = set()
+            for outcome in applied["campaigns"]:
+                if outcome["success"]:
+                    paused.add(outcome["Id"])
+                else:
+                    # Ошибка по одной кампании не прерывает весь запуск
+                    logger.error(f"Не удалось приостановить кампанию {outcome['Id']}: {outcome['errors']}")
+            
+            keywords_updated = dict.fromkeys(to_optimize, 0)
+            for update in applied["bids"]:
+                if update["success"]:
+                    keywords_updated[graph.keywords[update["Id"]].CampaignId] += 1
+            
+            for campaign in campaigns:
+                campaign_id = campaign.Id
+                
+                if campaign_id in paused:
                     results["actions"].append({
                         "campaign_id": campaign_id,
-                        "campaign_name": campaign_name,
+                        "campaign_name": campaign.Name,
+                        "action": "paused",
+                        "reason": plan.status_changes[campaign_id]["reason"]
+                    })
+                elif campaign_id in keywords_updated:
+                    results["actions"].append({
+                        "campaign_id": campaign_id,
+                        "campaign_name": campaign.Name,
                         "action": "optimized",
-                        "keywords_updated": opt_results.get("updated", 0)
+                        "keywords_updated": keywords_updated[campaign_id]
                     })
             
             print(f"\n✓ Выполнено действий: {len(results['actions'])}")
@@ -502,7 +743,7 @@ class AdvancedYandexDirectScenarios:
         
         except Exception as e:
             logger.error(f"Ошибка при ежедневной оптимизации: {e}")
-            return {"timestamp": datetime.now().isoformat(), "actions": []}
+            return {"timestamp": datetime.now().isoformat(), "actions": [], "alerts": []}
 
 
 def main():
@@ -531,6 +772,7 @@ def main():
         
         # Сценарий 3: Экспорт в CSV
         scenarios.export_campaigns_to_csv()
+        scenarios.export_account("keywords_export.csv.gz", "keywords")
         
         # Сценарий 4: Мониторинг бюджета
         scenarios.monitor_budget_spending()
@@ -550,6 +792,9 @@ def main():
     print("ВСЕ СЦЕНАРИИ ЗАВЕРШЕНЫ")
     print("="*60)
 
+    if scenarios.manager.metrics is not None and config.METRICS_EXPORT_PATH:
+        scenarios.manager.metrics.export(config.METRICS_EXPORT_PATH)
+
 
 if __name__ == "__main__":
     main()
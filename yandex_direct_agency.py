@@ -0,0 +1,266 @@
+"""
+Агентский режим Яндекс.Директ API
+Выполнение задач автоматизации по многим клиентам агентства параллельно
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Mapping
+from typing import Dict, Optional, Any, Callable, Iterable
+import threading
+import logging
+
+from yandex_direct_manager import YandexDirectManager, CampaignAutomation
+from yandex_direct_ratelimit import UnitsRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def merge_results(results: Dict[str, Any]) -> Any:
+    """
+    Объединяет результаты задачи по клиентам
+    
+    Числа суммируются, списки склеиваются (словари в списках получают
+    поле client_login), словари объединяются по ключам рекурсивно.
+    Значения других типов возвращаются словарем {логин: значение}.
+    
+    Args:
+        results: Словарь {логин клиента: результат}
+        
+    Returns:
+        Объединенный результат
+    """
+    values = list(results.values())
+    if not values:
+        return {}
+    
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return sum(values)
+    
+    if all(isinstance(value, list) for value in values):
+        merged = []
+        for login, items in results.items():
+            merged.extend(
+                {**item, "client_login": login} if isinstance(item, Mapping) else item
+                for item in items
+            )
+        return merged
+    
+    if all(isinstance(value, dict) for value in values):
+        keys = {}
+        for value in values:
+            keys.update(dict.fromkeys(value))
+        return {
+            key: merge_results({
+                login: value[key] for login, value in results.items() if key in value
+            })
+            for key in keys
+        }
+        
+    return dict(results)
+
+
+class AgencyRunner:
+    """
+    Параллельный запуск задач по клиентам агентства
+    
+    Для каждого клиента создается отдельный YandexDirectManager с
+    заголовком Client-Login: баллы API в Директе считаются по клиенту,
+    поэтому у каждого менеджера свой ограничитель UnitsRateLimiter и
+    свой пул соединений. Клиенты обрабатываются в пуле из max_workers
+    потоков, запросы внутри одного клиента идут последовательно. Ошибка
+    одного клиента не прерывает обработку остальных.
+    """
+    
+    def __init__(self,
+                 access_token: str,
+                 client_logins: Iterable[str],
+                 max_workers: int = 4,
+                 rate_limiter_factory: Optional[Callable[[], UnitsRateLimiter]] = None,
+                 manager_factory: Optional[Callable[[str], YandexDirectManager]] = None,
+                 **manager_kwargs):
+        """
+        Инициализация
+        
+        Args:
+            access_token: OAuth токен агентства
+            client_logins: Логины клиентов
+            max_workers: Количество клиентов, обрабатываемых одновременно
+            rate_limiter_factory: Создает ограничитель для каждого клиента
+                (по умолчанию UnitsRateLimiter с настройками по умолчанию)
+            manager_factory: Создает менеджер по логину клиента (вместо
+                access_token и manager_kwargs)
+            **manager_kwargs: Дополнительные параметры YandexDirectManager
+        """
+        if "rate_limiter" in manager_kwargs:
+            raise ValueError("Ограничитель задается через rate_limiter_factory: у каждого клиента свой")
+        
+        self.access_token = access_token
+        self.client_logins = list(dict.fromkeys(client_logins))
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter_factory = rate_limiter_factory or UnitsRateLimiter
+        self.manager_factory = manager_factory or self._create_manager
+        self.manager_kwargs = manager_kwargs
+        
+        self._managers: Dict[str, YandexDirectManager] = {}
+        # Сценарии по менеджерам клиентов (AdvancedYandexDirectScenarios)
+        self._scenarios: Dict[YandexDirectManager, Any] = {}
+        self._lock = threading.Lock()
+        
+    def _create_manager(self, client_login: str) -> YandexDirectManager:
+        """Создает менеджер клиента с собственным ограничителем и пулом"""
+        return YandexDirectManager(
+            access_token=self.access_token,
+            client_login=client_login,
+            rate_limiter=self.rate_limiter_factory(),
+            **self.manager_kwargs
+        )
+        
+    def get_manager(self, client_login: str) -> YandexDirectManager:
+        """
+        Возвращает менеджер клиента (создается при первом обращении)
+        
+        Менеджер сохраняется между запусками, чтобы ограничитель помнил
+        остаток баллов клиента, а соединения переиспользовались.
+        """
+        with self._lock:
+            manager = self._managers.get(client_login)
+            if manager is None:
+                manager = self.manager_factory(client_login)
+                self._managers[client_login] = manager
+            return manager
+        
+    def get_scenarios(self, client_login: str):
+        """
+        Возвращает сценарии AdvancedYandexDirectScenarios клиента
+        
+        Сценарии сохраняются между запусками, как и менеджер: хранилище
+        статистики клиента открывается один раз и закрывается в close().
+        """
+        return self._scenarios_for(self.get_manager(client_login))
+    
+    def _scenarios_for(self, manager: YandexDirectManager):
+        """Сценарии для менеджера клиента (создаются при первом обращении)"""
+        from yandex_direct_advanced import AdvancedYandexDirectScenarios
+        
+        with self._lock:
+            scenarios = self._scenarios.get(manager)
+            if scenarios is None:
+                scenarios = AdvancedYandexDirectScenarios(manager)
+                self._scenarios[manager] = scenarios
+            return scenarios
+        
+    def close(self):
+        """Закрывает менеджеры и хранилища статистики всех клиентов"""
+        with self._lock:
+            managers = list(self._managers.values())
+            scenarios = list(self._scenarios.values())
+            self._managers.clear()
+            self._scenarios.clear()
+        for client_scenarios in scenarios:
+            client_scenarios.close()
+        for manager in managers:
+            manager.close()
+            
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def run(self,
+            job: Callable[[YandexDirectManager], Any],
+            client_logins: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Выполняет задачу для каждого клиента
+        
+        Args:
+            job: Функция, получающая менеджер клиента
+            client_logins: Клиенты (по умолчанию все)
+            
+        Returns:
+            Словарь {"results": {логин: результат}, "errors": {логин: текст
+            ошибки}, "merged": объединенные результаты, "duration": секунды}
+        """
+        logins = list(client_logins) if client_logins is not None else self.client_logins
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        started = time.monotonic()
+        
+        def run_client(login: str) -> Any:
+            return job(self.get_manager(login))
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(logins) or 1)) as executor:
+            futures = {executor.submit(run_client, login): login for login in logins}
+            for future in as_completed(futures):
+                login = futures[future]
+                try:
+                    results[login] = future.result()
+                except Exception as e:
+                    logger.error(f"Ошибка при обработке клиента {login}: {e}")
+                    errors[login] = str(e)
+                    
+        # Порядок клиентов как в запросе, а не в порядке завершения
+        results = {login: results[login] for login in logins if login in results}
+        duration = time.monotonic() - started
+        logger.info(
+            f"Обработано клиентов: {len(results)}, с ошибками: {len(errors)}, "
+            f"за {duration:.1f} с"
+        )
+        
+        return {
+            "results": results,
+            "errors": errors,
+            "merged": merge_results(results),
+            "duration": duration
+        }
+        
+    def run_automation(self,
+                       method: str,
+                       *args,
+                       client_logins: Optional[Iterable[str]] = None,
+                       **kwargs) -> Dict[str, Any]:
+        """
+        Вызывает метод CampaignAutomation для каждого клиента
+        
+        Args:
+            method: Имя метода (например, "generate_report")
+            *args: Аргументы метода
+            client_logins: Клиенты (по умолчанию все)
+            **kwargs: Именованные аргументы метода
+            
+        Returns:
+            Результат run()
+        """
+        def job(manager: YandexDirectManager) -> Any:
+            return getattr(CampaignAutomation(manager), method)(*args, **kwargs)
+        
+        return self.run(job, client_logins)
+    
+    def run_scenario(self,
+                     method: str,
+                     *args,
+                     client_logins: Optional[Iterable[str]] = None,
+                     **kwargs) -> Dict[str, Any]:
+        """
+        Вызывает сценарий AdvancedYandexDirectScenarios для каждого клиента
+        
+        Args:
+            method: Имя сценария (например, "schedule_daily_optimization")
+            *args: Аргументы сценария
+            client_logins: Клиенты (по умолчанию все)
+            **kwargs: Именованные аргументы сценария
+            
+        Returns:
+            Результат run()
+        """
+        def job(manager: YandexDirectManager) -> Any:
+            return getattr(self._scenarios_for(manager), method)(*args, **kwargs)
+        
+        return self.run(job, client_logins)
+    
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Состояние ограничителей баллов по клиентам"""
+        with self._lock:
+            managers = dict(self._managers)
+        return {login: manager.rate_limiter.get_stats() for login, manager in managers.items()}
@@ -0,0 +1,343 @@
+"""
+Асинхронный клиент Яндекс.Директ API
+Параллельное выполнение запросов на asyncio с ограничением одновременности
+"""
+
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, AsyncIterator, Iterable, Iterator, Tuple, Union
+import logging
+
+from yandex_direct_manager import YandexDirectManager, CampaignAutomation
+from yandex_direct_models import Campaign, AdGroup, Ad, Keyword
+from yandex_direct_stats import StatsFrame
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncYandexDirectManager:
+    """
+    Асинхронный менеджер для работы с API Яндекс.Директ
+    
+    Повторяет методы YandexDirectManager, отправляющие запросы к API:
+    получение, перебор (iter_* - асинхронные итераторы) и изменение
+    объектов, отчеты и сервис changes. Запросы выполняются в пуле потоков
+    через общий пул соединений синхронного менеджера, количество
+    одновременных запросов ограничено семафором. Счетчики (get_pool_stats,
+    get_request_metrics и т.п.) и retry_budget_scope доступны у
+    синхронного менеджера (self.manager).
+    """
+    
+    def __init__(self,
+                 access_token: Optional[str] = None,
+                 use_sandbox: bool = False,
+                 max_concurrency: int = 10,
+                 manager: Optional[YandexDirectManager] = None,
+                 **manager_kwargs):
+        """
+        Инициализация асинхронного менеджера
+        
+        Args:
+            access_token: OAuth токен для доступа к API
+            use_sandbox: Использовать sandbox окружение для тестирования
+            max_concurrency: Максимум одновременных запросов
+            manager: Готовый синхронный менеджер (вместо access_token)
+            **manager_kwargs: Дополнительные параметры YandexDirectManager
+        """
+        if manager is None:
+            if access_token is None:
+                raise ValueError("Нужно указать access_token или manager")
+            manager_kwargs.setdefault("pool_maxsize", max_concurrency)
+            manager = YandexDirectManager(access_token, use_sandbox, **manager_kwargs)
+            
+        self.manager = manager
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="yandex-direct"
+        )
+        
+    async def _call(self, func, *args, **kwargs):
+        """Выполняет метод синхронного менеджера, не блокируя цикл событий"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(func, *args, **kwargs)
+            )
+            
+    async def _iterate(self, iterator: Iterator[Any], batch_size: int) -> AsyncIterator[Any]:
+        """
+        Перебирает синхронный генератор менеджера, не блокируя цикл событий
+        
+        Объекты забираются из генератора частями по batch_size (примерно
+        страница ответа) за один вызов в пуле потоков.
+        """
+        while True:
+            batch = await self._call(lambda: list(itertools.islice(iterator, batch_size)))
+            if not batch:
+                return
+            for item in batch:
+                yield item
+                
+    async def close(self):
+        """Останавливает пул потоков и закрывает соединения"""
+        # Ожидание запросов в пуле - в отдельном потоке, чтобы не блокировать цикл событий
+        await asyncio.to_thread(self._executor.shutdown, True)
+        self.manager.close()
+        
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        
+    # ==================== КАМПАНИИ ====================
+    
+    async def get_campaigns(self,
+                            fields: Optional[List[str]] = None,
+                            limit: int = 10000,
+                            campaign_ids: Optional[List[int]] = None) -> List[Campaign]:
+        """Получает список кампаний"""
+        return await self._call(self.manager.get_campaigns, fields, limit, campaign_ids)
+    
+    async def iter_campaigns(self,
+                             campaign_ids: Optional[List[int]] = None,
+                             fields: Optional[List[str]] = None,
+                             page_size: int = 10000) -> AsyncIterator[Campaign]:
+        """Постранично перебирает кампании"""
+        iterator = self.manager.iter_campaigns(campaign_ids, fields, page_size)
+        async for campaign in self._iterate(iterator, page_size):
+            yield campaign
+            
+    async def get_campaign_by_id(self, campaign_id: int) -> Optional[Campaign]:
+        """Получает информацию о конкретной кампании"""
+        return await self._call(self.manager.get_campaign_by_id, campaign_id)
+    
+    async def create_campaign(self,
+                              name: str,
+                              campaign_type: str = "TEXT_CAMPAIGN",
+                              daily_budget: Optional[int] = None,
+                              timezone: str = "Europe/Moscow") -> Optional[int]:
+        """Создает новую кампанию"""
+        return await self._call(
+            self.manager.create_campaign, name, campaign_type, daily_budget, timezone
+        )
+        
+    async def update_campaign(self, campaign_id: int, **kwargs) -> bool:
+        """Обновляет параметры кампании"""
+        return await self._call(self.manager.update_campaign, campaign_id, **kwargs)
+    
+    async def update_campaigns(self,
+                               campaigns: Iterable[Dict[str, Any]],
+                               chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Пакетно обновляет параметры кампаний"""
+        return await self._call(self.manager.update_campaigns, list(campaigns), chunk_size)
+    
+    async def pause_campaign(self, campaign_id: int) -> bool:
+        """Приостанавливает кампанию"""
+        return await self._call(self.manager.pause_campaign, campaign_id)
+    
+    async def pause_campaigns(self, campaign_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Приостанавливает несколько кампаний пачками"""
+        return await self._call(self.manager.pause_campaigns, list(campaign_ids))
+    
+    async def resume_campaign(self, campaign_id: int) -> bool:
+        """Возобновляет кампанию"""
+        return await self._call(self.manager.resume_campaign, campaign_id)
+    
+    # ==================== ОБЪЯВЛЕНИЯ ====================
+    
+    async def get_ads(self,
+                      campaign_id: Optional[int] = None,
+                      fields: Optional[List[str]] = None,
+                      limit: int = 10000) -> List[Ad]:
+        """Получает список объявлений"""
+        return await self._call(self.manager.get_ads, campaign_id, fields, limit)
+    
+    async def iter_ads(self,
+                       campaign_id: Optional[int] = None,
+                       fields: Optional[List[str]] = None,
+                       page_size: int = 10000,
+                       campaign_ids: Optional[List[int]] = None) -> AsyncIterator[Ad]:
+        """Постранично перебирает объявления"""
+        iterator = self.manager.iter_ads(campaign_id, fields, page_size, campaign_ids=campaign_ids)
+        async for ad in self._iterate(iterator, page_size):
+            yield ad
+            
+    async def update_ad_status(self, ad_id: int, status: str) -> bool:
+        """Обновляет статус объявления"""
+        return await self._call(self.manager.update_ad_status, ad_id, status)
+    
+    # ==================== СТАТИСТИКА ====================
+    
+    async def get_statistics(self,
+                             date_range_type: str = "LAST_7_DAYS",
+                             fields: Optional[List[str]] = None,
+                             campaign_ids: Optional[List[int]] = None,
+                             date_from: Optional[str] = None,
+                             date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Получает статистику по кампаниям"""
+        return await self._call(
+            self.manager.get_statistics, date_range_type, fields, campaign_ids, date_from, date_to
+        )
+        
+    async def get_statistics_columns(self,
+                                     date_range_type: str = "LAST_7_DAYS",
+                                     fields: Optional[List[str]] = None,
+                                     campaign_ids: Optional[List[int]] = None,
+                                     date_from: Optional[str] = None,
+                                     date_to: Optional[str] = None,
+                                     report_type: str = "CAMPAIGN_PERFORMANCE_REPORT") -> Dict[str, Any]:
+        """Получает отчет в столбцовом виде"""
+        return await self._call(
+            self.manager.get_statistics_columns,
+            date_range_type, fields, campaign_ids, date_from, date_to, report_type
+        )
+        
+    async def get_statistics_frame(self,
+                                   date_range_type: str = "LAST_7_DAYS",
+                                   fields: Optional[List[str]] = None,
+                                   campaign_ids: Optional[List[int]] = None,
+                                   date_from: Optional[str] = None,
+                                   date_to: Optional[str] = None,
+                                   report_type: str = "CAMPAIGN_PERFORMANCE_REPORT") -> StatsFrame:
+        """Получает отчет в виде StatsFrame"""
+        return await self._call(
+            self.manager.get_statistics_frame,
+            date_range_type, fields, campaign_ids, date_from, date_to, report_type
+        )
+        
+    async def get_keyword_statistics_frame(self,
+                                           campaign_ids: Optional[List[int]] = None,
+                                           date_range_type: str = "LAST_30_DAYS",
+                                           date_from: Optional[str] = None,
+                                           date_to: Optional[str] = None) -> StatsFrame:
+        """Получает статистику по ключевым словам"""
+        return await self._call(
+            self.manager.get_keyword_statistics_frame, campaign_ids, date_range_type, date_from, date_to
+        )
+        
+    async def get_campaign_totals(self,
+                                  campaign_ids: Optional[List[int]] = None,
+                                  date_range_type: str = "LAST_7_DAYS") -> Dict[int, Dict[str, Any]]:
+        """Получает суммарную статистику по каждой кампании одним отчетом"""
+        return await self._call(self.manager.get_campaign_totals, campaign_ids, date_range_type)
+    
+    # ==================== КЛЮЧЕВЫЕ СЛОВА ====================
+    
+    async def get_keywords(self,
+                           campaign_id: Optional[int] = None,
+                           fields: Optional[List[str]] = None,
+                           limit: int = 10000,
+                           campaign_ids: Optional[List[int]] = None) -> List[Keyword]:
+        """Получает список ключевых слов"""
+        return await self._call(self.manager.get_keywords, campaign_id, fields, limit, campaign_ids)
+    
+    async def iter_keywords(self,
+                            campaign_id: Optional[int] = None,
+                            fields: Optional[List[str]] = None,
+                            page_size: int = 10000,
+                            campaign_ids: Optional[List[int]] = None) -> AsyncIterator[Keyword]:
+        """Постранично перебирает ключевые слова"""
+        iterator = self.manager.iter_keywords(campaign_id, fields, page_size, campaign_ids=campaign_ids)
+        async for keyword in self._iterate(iterator, page_size):
+            yield keyword
+            
+    async def update_keyword_bid(self, keyword_id: int, bid: int) -> bool:
+        """Обновляет ставку для ключевого слова"""
+        return await self._call(self.manager.update_keyword_bid, keyword_id, bid)
+    
+    async def update_keyword_bids(self,
+                                  bids: Iterable[Union[Tuple[int, int], Dict[str, int]]],
+                                  chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Пакетно обновляет ставки ключевых слов"""
+        return await self._call(self.manager.update_keyword_bids, list(bids), chunk_size)
+    
+    # ==================== ГРУППЫ ОБЪЯВЛЕНИЙ ====================
+    
+    async def get_ad_groups(self,
+                            campaign_id: Optional[int] = None,
+                            fields: Optional[List[str]] = None,
+                            limit: int = 10000) -> List[AdGroup]:
+        """Получает список групп объявлений"""
+        return await self._call(self.manager.get_ad_groups, campaign_id, fields, limit)
+    
+    async def iter_ad_groups(self,
+                             campaign_id: Optional[int] = None,
+                             fields: Optional[List[str]] = None,
+                             page_size: int = 10000,
+                             campaign_ids: Optional[List[int]] = None) -> AsyncIterator[AdGroup]:
+        """Постранично перебирает группы объявлений"""
+        iterator = self.manager.iter_ad_groups(campaign_id, fields, page_size, campaign_ids=campaign_ids)
+        async for ad_group in self._iterate(iterator, page_size):
+            yield ad_group
+            
+    # ==================== ИЗМЕНЕНИЯ ====================
+    
+    async def get_server_timestamp(self) -> str:
+        """Получает текущее время сервера для последующих проверок изменений"""
+        return await self._call(self.manager.get_server_timestamp)
+    
+    async def check_campaigns_changes(self, timestamp: str) -> Dict[str, Any]:
+        """Получает кампании, изменившиеся после указанного времени"""
+        return await self._call(self.manager.check_campaigns_changes, timestamp)
+    
+    async def check_changes(self,
+                            timestamp: str,
+                            campaign_ids: Optional[List[int]] = None,
+                            ad_group_ids: Optional[List[int]] = None,
+                            ad_ids: Optional[List[int]] = None,
+                            field_names: Iterable[str] = ("CampaignIds", "AdGroupIds", "AdIds")) -> Dict[str, Any]:
+        """Получает ID объектов, изменившихся после указанного времени"""
+        return await self._call(
+            self.manager.check_changes, timestamp, campaign_ids, ad_group_ids, ad_ids, tuple(field_names)
+        )
+
+
+class AsyncCampaignAutomation:
+    """Асинхронные варианты сценариев CampaignAutomation"""
+    
+    def __init__(self, manager: AsyncYandexDirectManager):
+        """
+        Инициализация автоматизации
+        
+        Args:
+            manager: Экземпляр AsyncYandexDirectManager
+        """
+        self.manager = manager
+        
+    async def generate_report(self, campaign_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Генерирует отчет по кампаниям (статистика по всем кампаниям одним отчетом)
+        
+        Args:
+            campaign_ids: Список ID кампаний (если None, все кампании)
+            
+        Returns:
+            Отчет в формате CampaignAutomation.generate_report
+        """
+        report = CampaignAutomation.create_report()
+        
+        try:
+            campaigns = await self.manager.get_campaigns(campaign_ids=campaign_ids or None)
+            
+            totals = {}
+            if campaigns:
+                totals = await self.manager.get_campaign_totals(
+                    [c.Id for c in campaigns],
+                    "LAST_30_DAYS"
+                )
+                
+            for campaign in campaigns:
+                CampaignAutomation.add_campaign_to_report(
+                    report, campaign, totals.get(campaign.Id, {})
+                )
+                
+        except Exception as e:
+            logger.error(f"Ошибка при генерации отчета: {e}")
+            
+        return report
@@ -0,0 +1,336 @@
+"""
+Офлайн-проверка стратегий автоматизации Яндекс.Директ
+Симулятор изменений ставок на исторической статистике и параллельный перебор параметров
+"""
+
+import itertools
+import os
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Iterable
+import logging
+
+import numpy as np
+
+from yandex_direct_manager import YandexDirectManager, CampaignAutomation
+from yandex_direct_advanced import AdvancedYandexDirectScenarios
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS
+from yandex_direct_fake import FakeAccount, FakeDirectBackend, FakeDirectServer, STATS_FIELDS
+from yandex_direct_config import config
+
+logger = logging.getLogger(__name__)
+
+
+# Ставки API в микроединицах, а min_bid и max_bid в AUTOMATION_CONFIG - в копейках
+MICROS_PER_KOPECK = 10000
+
+
+class BidResponseModel:
+    """
+    Реакция статистики ключевого слова на изменение ставки
+    
+    Исторический день пересчитывается по отношению текущей ставки к
+    исторической r: показы умножаются на r^impression_elasticity, клики
+    и конверсии - на r^click_elasticity, цена клика растет вместе со
+    ставкой (затраты - r^(1 + click_elasticity)). Остановленная кампания
+    не получает показов.
+    """
+    
+    def __init__(self, click_elasticity: float = 0.6, impression_elasticity: float = 0.3):
+        """
+        Args:
+            click_elasticity: Эластичность кликов по ставке
+            impression_elasticity: Эластичность показов по ставке
+        """
+        self.click_elasticity = click_elasticity
+        self.impression_elasticity = impression_elasticity
+        
+    def apply(self, day: StatsFrame, bid_ratio: np.ndarray, active: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Ожидаемая статистика дня при текущих ставках
+        
+        Args:
+            day: Исторические строки дня
+            bid_ratio: Отношение текущей ставки к исторической по строкам
+            active: Маска строк активных кампаний
+            
+        Returns:
+            Словарь {метрика: ожидаемые значения float64}
+        """
+        impression_factor = np.where(active, bid_ratio ** self.impression_elasticity, 0.0)
+        click_factor = np.where(active, bid_ratio ** self.click_elasticity, 0.0)
+        
+        impressions = day.column("Impressions") * impression_factor
+        clicks = np.minimum(day.column("Clicks") * click_factor, impressions)
+        return {
+            "Impressions": impressions,
+            "Clicks": clicks,
+            "Cost": day.column("Cost") * click_factor * bid_ratio,
+            "Conversions": day.column("Conversions") * click_factor
+        }
+
+
+def _totals(metrics: Dict[str, Any]) -> Dict[str, float]:
+    """Суммы метрик и CPA"""
+    totals = {metric.lower(): float(np.sum(metrics[metric])) for metric in METRIC_COLUMNS}
+    totals["cpa"] = totals["cost"] / totals["conversions"] if totals["conversions"] else 0.0
+    return totals
+
+
+class _ReplayAutomation(CampaignAutomation):
+    """Автоматизация, для которой текущий день - день имитации"""
+    
+    def __init__(self, manager: YandexDirectManager, backend: FakeDirectBackend):
+        super().__init__(manager)
+        self.backend = backend
+        
+    def _today(self) -> date:
+        return date.fromisoformat(self.backend.today)
+
+
+class BidSimulator:
+    """
+    Проигрывание истории через автоматизацию
+    
+    Первые warmup_days дней истории остаются как есть. Каждый следующий
+    день имитация API "перематывается" на него, CampaignAutomation и
+    AdvancedYandexDirectScenarios.plan_bid_changes принимают решения по
+    статистике предыдущих дней через обычный YandexDirectManager, а
+    статистика дня пересчитывается моделью по ставкам и статусам после
+    решений и добавляется в имитацию.
+    """
+    
+    def __init__(self,
+                 account: FakeAccount,
+                 model: Optional[BidResponseModel] = None,
+                 warmup_days: int = 14):
+        """
+        Args:
+            account: История аккаунта (не изменяется)
+            model: Модель реакции на ставки
+            warmup_days: Дней истории до начала проигрывания
+        """
+        self.account = account
+        self.model = model or BidResponseModel()
+        self.warmup_days = warmup_days
+        
+    def run(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Проигрывает историю с параметрами автоматизации
+        
+        Args:
+            params: Параметры в формате Config.AUTOMATION_CONFIG (min_ctr,
+                bid_increase_percent, min_bid и max_bid в копейках); дополнительно
+                bid_decrease_percent (по умолчанию 15, как в plan_bid_changes),
+                top_percent, bottom_percent и analysis_period
+                
+        Returns:
+            Словарь с параметрами, прогнозом (projected), фактической
+            историей за те же дни (baseline) и количеством действий
+        """
+        dates = self.account.dates()
+        if len(dates) <= self.warmup_days:
+            raise ValueError(f"Недостаточно истории: {len(dates)} дн. при разогреве {self.warmup_days} дн.")
+        warmup, replay = dates[:self.warmup_days], dates[self.warmup_days:]
+        
+        simulated = self.account.copy()
+        simulated.stats = self.account.stats_between(warmup[0], warmup[-1])
+        base_bids = {keyword_id: keyword.get("Bid", 0) for keyword_id, keyword in self.account.keywords.items()}
+        
+        backend = FakeDirectBackend(simulated, today=replay[0])
+        projected = {metric: 0.0 for metric in METRIC_COLUMNS}
+        actions = {"paused": 0, "bid_changes": 0}
+        
+        with FakeDirectServer(backend) as server:
+            manager = YandexDirectManager(
+                access_token="backtest",
+                rate_limiter=UnitsRateLimiter(max_requests_per_second=100000)
+            )
+            manager.base_url = server.url
+            automation = _ReplayAutomation(manager, backend)
+            
+            try:
+                for day in replay:
+                    backend.today = day
+                    
+                    # Решения автоматизации по статистике предыдущих дней
+                    plan = automation.plan_pause_low_performing_campaigns(
+                        min_ctr=params["min_ctr"],
+                        days=params.get("analysis_period", 7)
+                    )
+                    active = [
+                        campaign_id for campaign_id, campaign in simulated.campaigns.items()
+                        if campaign.get("Status") != "STOPPED" and campaign_id not in plan.status_changes
+                    ]
+                    if active:
+                        keyword_stats = manager.get_keyword_statistics_frame(active).split("CampaignId")
+                        no_stats = StatsFrame.empty(["CriterionId", *METRIC_COLUMNS])
+                        keywords_by_campaign: Dict[int, List[Dict[str, Any]]] = {}
+                        for keyword in manager.iter_keywords(campaign_ids=active):
+                            keywords_by_campaign.setdefault(keyword.get("CampaignId"), []).append(keyword)
+                            
+                        for campaign_id, keywords in keywords_by_campaign.items():
+                            AdvancedYandexDirectScenarios.plan_bid_changes(
+                                keywords,
+                                keyword_stats.get(campaign_id, no_stats),
+                                params.get("top_percent", 20),
+                                params.get("bottom_percent", 20),
+                                plan=plan,
+                                increase_percent=params["bid_increase_percent"],
+                                decrease_percent=params.get("bid_decrease_percent", 15),
+                                min_bid=params["min_bid"] * MICROS_PER_KOPECK,
+                                max_bid=params["max_bid"] * MICROS_PER_KOPECK
+                            )
+                            
+                    actions["paused"] += len(plan.status_changes)
+                    actions["bid_changes"] += len(plan.bid_changes)
+                    plan.apply(manager)
+                    
+                    # Статистика дня при ставках и статусах после решений
+                    day_stats = self._simulate_day(simulated, base_bids, day)
+                    for metric in METRIC_COLUMNS:
+                        projected[metric] += float(day_stats[metric].sum())
+                    backend.add_stats(self._to_report_rows(day_stats))
+            finally:
+                manager.close()
+                
+        history = self.account.stats_between(replay[0], replay[-1])
+        return {
+            "params": dict(params),
+            "days": len(replay),
+            "projected": _totals(projected),
+            "baseline": _totals({metric: history.column(metric) for metric in METRIC_COLUMNS}),
+            "actions": actions,
+            "final_bids": {
+                keyword_id: keyword.get("Bid", 0) for keyword_id, keyword in simulated.keywords.items()
+            }
+        }
+        
+    def _simulate_day(self,
+                      simulated: FakeAccount,
+                      base_bids: Dict[int, int],
+                      day: str) -> Dict[str, np.ndarray]:
+        """Ожидаемая статистика дня по исторической и текущим ставкам"""
+        history = self.account.stats_between(day, day)
+        keyword_ids = history.column("CriterionId").tolist()
+        
+        current = np.array([simulated.keywords.get(keyword_id, {}).get("Bid", 0) for keyword_id in keyword_ids], dtype=np.float64)
+        base = np.array([base_bids.get(keyword_id, 0) for keyword_id in keyword_ids], dtype=np.float64)
+        ratio = np.ones(len(keyword_ids))
+        np.divide(current, base, out=ratio, where=base > 0)
+        
+        stopped = [
+            campaign_id for campaign_id, campaign in simulated.campaigns.items()
+            if campaign.get("Status") == "STOPPED" or campaign.get("State") == "SUSPENDED"
+        ]
+        active = ~np.isin(history.column("CampaignId"), stopped)
+        
+        expected = self.model.apply(history, ratio, active)
+        expected.update({
+            field: history.column(field)
+            for field in STATS_FIELDS if field not in METRIC_COLUMNS
+        })
+        return expected
+    
+    @staticmethod
+    def _to_report_rows(day_stats: Dict[str, np.ndarray]) -> StatsFrame:
+        """Округляет ожидаемую статистику до строк отчета (без строк без показов)"""
+        columns = {
+            field: np.rint(values).astype(np.int64) if field in ("Impressions", "Clicks", "Conversions") else values
+            for field, values in day_stats.items()
+        }
+        columns["Cost"] = np.round(columns["Cost"], 2)
+        return StatsFrame(columns).filter(columns["Impressions"] > 0)
+
+
+def run_backtest(account: FakeAccount,
+                 params: Dict[str, Any],
+                 model: Optional[BidResponseModel] = None,
+                 warmup_days: int = 14) -> Dict[str, Any]:
+    """Один прогон симулятора (функция верхнего уровня для пула процессов)"""
+    return BidSimulator(account, model, warmup_days).run(params)
+
+
+class BacktestHarness:
+    """
+    Перебор параметров автоматизации на истории аккаунта
+    
+    Каждое сочетание параметров проигрывается в отдельном процессе со
+    своим сервером-имитацией, поэтому прогоны не влияют друг на друга и
+    занимают все ядра.
+    """
+    
+    def __init__(self,
+                 account: FakeAccount,
+                 max_workers: Optional[int] = None,
+                 model: Optional[BidResponseModel] = None,
+                 warmup_days: int = 14):
+        """
+        Args:
+            account: История аккаунта (generate_account или FakeAccount.from_manager)
+            max_workers: Количество процессов (по умолчанию по числу ядер)
+            model: Модель реакции на ставки
+            warmup_days: Дней истории до начала проигрывания
+        """
+        self.account = account
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.model = model
+        self.warmup_days = warmup_days
+        
+    @staticmethod
+    def parameter_grid(base: Optional[Dict[str, Any]] = None, **options: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Все сочетания значений параметров
+        
+        Args:
+            base: Исходные параметры (по умолчанию Config.AUTOMATION_CONFIG)
+            **options: Перебираемые значения, например min_ctr=[0.3, 0.5]
+            
+        Returns:
+            Список наборов параметров
+        """
+        base = dict(config.AUTOMATION_CONFIG if base is None else base)
+        names = list(options)
+        return [
+            {**base, **dict(zip(names, values))}
+            for values in itertools.product(*(list(options[name]) for name in names))
+        ]
+        
+    def run(self, param_sets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Проигрывает историю для каждого набора параметров
+        
+        Returns:
+            Результаты BidSimulator.run в порядке param_sets
+        """
+        logger.info(f"Бэктест: {len(param_sets)} наборов параметров, {self.max_workers} процессов")
+        
+        if self.max_workers <= 1 or len(param_sets) <= 1:
+            return [run_backtest(self.account, params, self.model, self.warmup_days) for params in param_sets]
+        
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(param_sets))) as executor:
+            futures = [
+                executor.submit(run_backtest, self.account, params, self.model, self.warmup_days)
+                for params in param_sets
+            ]
+            return [future.result() for future in futures]
+        
+    @staticmethod
+    def rank(results: List[Dict[str, Any]], max_cpa: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Упорядочивает результаты по прогнозу конверсий
+        
+        Args:
+            results: Результаты run
+            max_cpa: Отбросить наборы с прогнозной CPA выше этого значения
+            
+        Returns:
+            Результаты по убыванию конверсий (при равенстве - по затратам)
+        """
+        if max_cpa is not None:
+            results = [result for result in results if result["projected"]["cpa"] <= max_cpa]
+        return sorted(
+            results,
+            key=lambda result: (-result["projected"]["conversions"], result["projected"]["cost"])
+        )
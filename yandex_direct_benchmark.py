@@ -0,0 +1,337 @@
+"""
+Нагрузочные замеры Яндекс.Директ на локальной имитации API
+Запросы в секунду, задержки p50/p99 и время выполнения сценариев автоматизации
+"""
+
+import contextlib
+import io
+import threading
+import time
+from typing import Dict, List, Optional, Any, Callable, Tuple
+import logging
+
+import numpy as np
+
+from yandex_direct_manager import YandexDirectManager, CampaignAutomation
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_retry import RetryPolicy
+from yandex_direct_sync import StatsStore, StatsSync
+from yandex_direct_mirror import AccountMirror
+from yandex_direct_fake import FakeAccount, FakeDirectBackend, FakeDirectServer, generate_account
+from yandex_direct_config import config
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyRecorder:
+    """
+    Время ответа каждого HTTP запроса менеджера
+    
+    Подключается хуком response сессии requests, поэтому учитывает все
+    запросы, включая повторы и опрос отчетов. Для потоковых ответов
+    (отчеты) время считается до получения заголовков.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: List[Tuple[str, float]] = []
+        
+    def attach(self, manager: YandexDirectManager):
+        """Подключает запись к сессии менеджера"""
+        manager.session.hooks["response"].append(self._on_response)
+        
+    def _on_response(self, response, *args, **kwargs):
+        service = response.url.rstrip("/").rsplit("/", 1)[-1]
+        with self._lock:
+            self.samples.append((service, response.elapsed.total_seconds()))
+            
+    def clear(self):
+        with self._lock:
+            self.samples = []
+            
+    def summary(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Количество запросов, задержки p50, p99 и средняя в миллисекундах
+            и количество запросов по сервисам
+        """
+        with self._lock:
+            samples = list(self.samples)
+            
+        by_service: Dict[str, int] = {}
+        for service, _ in samples:
+            by_service[service] = by_service.get(service, 0) + 1
+            
+        latencies = np.array([elapsed for _, elapsed in samples]) * 1000
+        return {
+            "calls": len(samples),
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            "mean_ms": float(latencies.mean()) if len(latencies) else 0.0,
+            "by_service": by_service
+        }
+
+
+# ==================== СЦЕНАРИИ ====================
+
+def _campaign_ids(manager: YandexDirectManager) -> List[int]:
+    return [campaign["Id"] for campaign in manager.get_campaigns(fields=["Id"])]
+
+
+def _scenarios(manager: YandexDirectManager):
+    """Сценарии со статистикой в памяти (не затрагивают STATS_STORE_PATH)"""
+    from yandex_direct_advanced import AdvancedYandexDirectScenarios
+    return AdvancedYandexDirectScenarios(manager, stats_sync=StatsSync(manager, StatsStore()))
+
+
+def scenario_read_account(manager: YandexDirectManager) -> int:
+    """Кампании, группы, объявления и ключевые слова всего аккаунта"""
+    campaign_ids = _campaign_ids(manager)
+    count = len(campaign_ids)
+    for campaign_id in campaign_ids:
+        count += sum(1 for _ in manager.iter_ad_groups(campaign_id=campaign_id))
+        count += sum(1 for _ in manager.iter_ads(campaign_id=campaign_id))
+    count += sum(1 for _ in manager.iter_keywords(campaign_ids=campaign_ids))
+    return count
+
+
+def scenario_statistics(manager: YandexDirectManager) -> int:
+    """Дневная статистика кампаний и статистика ключевых слов за 30 дней"""
+    frame = manager.get_statistics_frame(date_range_type="LAST_30_DAYS")
+    keyword_frame = manager.get_keyword_statistics_frame(date_range_type="LAST_30_DAYS")
+    return len(frame) + len(keyword_frame)
+
+
+def scenario_pause_low_ctr(manager: YandexDirectManager) -> int:
+    """Приостановка кампаний с низким CTR (CampaignAutomation)"""
+    plan = CampaignAutomation(manager).plan_pause_low_performing_campaigns(
+        min_ctr=config.AUTOMATION_CONFIG["min_ctr"],
+        days=config.AUTOMATION_CONFIG["analysis_period"]
+    )
+    plan.apply(manager)
+    return len(plan)
+
+
+def scenario_optimize_bids(manager: YandexDirectManager) -> int:
+    """Оптимизация ставок каждой кампании отдельно (optimize_bids_by_performance)"""
+    scenarios = _scenarios(manager)
+    changes = 0
+    for campaign_id in _campaign_ids(manager):
+        plan = scenarios.plan_bid_optimization(campaign_id)
+        plan.apply(manager)
+        changes += len(plan)
+    return changes
+
+
+def scenario_analyze_campaigns(manager: YandexDirectManager) -> int:
+    """Анализ эффективности всех кампаний"""
+    return len(_scenarios(manager).analyze_campaigns_performance())
+
+
+def scenario_budget_monitoring(manager: YandexDirectManager) -> int:
+    """Мониторинг расхода бюджета"""
+    return len(_scenarios(manager).monitor_budget_spending())
+
+
+def scenario_daily_optimization(manager: YandexDirectManager) -> int:
+    """Ежедневная оптимизация всего аккаунта"""
+    return len(_scenarios(manager).schedule_daily_optimization()["actions"])
+
+
+def scenario_mirror(manager: YandexDirectManager) -> int:
+    """Загрузка зеркала аккаунта, изменение ставок и обновление зеркала через changes"""
+    mirror = AccountMirror(manager)
+    try:
+        loaded = mirror.full_load()
+        keywords = list(manager.iter_keywords(campaign_ids=_campaign_ids(manager)))[:100]
+        manager.update_keyword_bids([(keyword["Id"], keyword["Bid"] + 1000000) for keyword in keywords])
+        refreshed = mirror.refresh()
+    finally:
+        mirror.close()
+    return sum(loaded.values()) + refreshed["keywords"]
+
+
+# Сценарии по умолчанию: {название: функция(manager)}
+DEFAULT_SCENARIOS: Dict[str, Callable[[YandexDirectManager], Any]] = {
+    "read_account": scenario_read_account,
+    "statistics": scenario_statistics,
+    "pause_low_ctr": scenario_pause_low_ctr,
+    "optimize_bids": scenario_optimize_bids,
+    "analyze_campaigns": scenario_analyze_campaigns,
+    "budget_monitoring": scenario_budget_monitoring,
+    "daily_optimization": scenario_daily_optimization,
+    "mirror": scenario_mirror
+}
+
+
+# ==================== ЗАМЕРЫ ====================
+
+class BenchmarkRunner:
+    """
+    Выполняет сценарии против FakeDirectServer и собирает метрики
+    
+    Каждый прогон начинается с копии аккаунта, чтобы изменения одного
+    сценария не влияли на следующий. Задержки, ошибки и лимиты задаются
+    параметрами сервера (server_options) и лимитом баллов.
+    """
+    
+    def __init__(self,
+                 account: Optional[FakeAccount] = None,
+                 scenarios: Optional[Dict[str, Callable[[YandexDirectManager], Any]]] = None,
+                 repeat: int = 3,
+                 server_options: Optional[Dict[str, Any]] = None,
+                 units_limit: Optional[int] = None,
+                 manager_options: Optional[Dict[str, Any]] = None,
+                 quiet: bool = True):
+        """
+        Args:
+            account: Данные аккаунта (по умолчанию generate_account())
+            scenarios: Сценарии (по умолчанию DEFAULT_SCENARIOS)
+            repeat: Количество прогонов каждого сценария
+            server_options: Параметры FakeDirectServer (latency,
+                error_rate, throttle_rate, max_concurrent...)
+            units_limit: Суточный лимит баллов имитации
+            manager_options: Параметры YandexDirectManager поверх значений
+                для замеров (без ограничения частоты, короткие повторы)
+            quiet: Не выводить печать сценариев
+        """
+        self.account = account if account is not None else generate_account()
+        self.scenarios = scenarios or DEFAULT_SCENARIOS
+        self.repeat = repeat
+        self.server_options = server_options or {}
+        self.units_limit = units_limit
+        self.manager_options = manager_options or {}
+        self.quiet = quiet
+        
+    def _create_manager(self, url: str) -> YandexDirectManager:
+        options = {
+            "rate_limiter": UnitsRateLimiter(max_requests_per_second=0, throttle_delay=0.05),
+            "retry_policy": RetryPolicy(max_attempts=5, base_delay=0.05, max_delay=0.5),
+            "max_throttle_wait": 60,
+            **self.manager_options
+        }
+        manager = YandexDirectManager(access_token="benchmark", **options)
+        manager.base_url = url
+        return manager
+    
+    def run_scenario(self, name: str, job: Callable[[YandexDirectManager], Any]) -> Dict[str, Any]:
+        """
+        Выполняет сценарий repeat раз
+        
+        Returns:
+            Время выполнения (среднее, минимальное, максимальное), запросы
+            в секунду, задержки, повторы, ошибки сервера и списанные баллы
+        """
+        recorder = LatencyRecorder()
+        durations = []
+        totals = {"retries": 0, "throttled": 0, "units_spent": 0, "errors": 0, "failed_runs": 0}
+        server_stats: Dict[str, int] = {}
+        
+        for _ in range(self.repeat):
+            backend = FakeDirectBackend(self.account.copy(), units_limit=self.units_limit)
+            with FakeDirectServer(backend, **self.server_options) as server:
+                manager = self._create_manager(server.url)
+                recorder.attach(manager)
+                output = io.StringIO() if self.quiet else None
+                
+                started = time.perf_counter()
+                try:
+                    with contextlib.redirect_stdout(output) if output is not None else contextlib.nullcontext():
+                        job(manager)
+                except Exception as e:
+                    logger.error(f"Сценарий {name} завершился ошибкой: {e}")
+                    totals["failed_runs"] += 1
+                durations.append(time.perf_counter() - started)
+                
+                totals["retries"] += manager.retry_stats["retries"]
+                totals["throttled"] += manager.rate_limiter.get_stats()["throttled"]
+                totals["units_spent"] += backend.units_spent
+                manager.close()
+                
+            for key, value in server.stats.items():
+                server_stats[key] = server_stats.get(key, 0) + value
+                
+        latency = recorder.summary()
+        elapsed = sum(durations)
+        return {
+            "scenario": name,
+            "runs": self.repeat,
+            "job_time": {
+                "mean": elapsed / self.repeat,
+                "min": min(durations),
+                "max": max(durations)
+            },
+            "calls_per_run": latency["calls"] / self.repeat,
+            "calls_per_second": latency["calls"] / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                "p50": latency["p50_ms"],
+                "p99": latency["p99_ms"],
+                "mean": latency["mean_ms"]
+            },
+            "calls_by_service": latency["by_service"],
+            "retries": totals["retries"],
+            "throttled": totals["throttled"],
+            "units_per_run": totals["units_spent"] / self.repeat,
+            "failed_runs": totals["failed_runs"],
+            "server": server_stats
+        }
+        
+    def run(self, names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Выполняет сценарии
+        
+        Args:
+            names: Названия сценариев (по умолчанию все)
+            
+        Returns:
+            Словарь {название сценария: результат run_scenario}
+        """
+        results = {}
+        for name in names or list(self.scenarios):
+            logger.info(f"Замер сценария {name}")
+            results[name] = self.run_scenario(name, self.scenarios[name])
+        return results
+
+
+def format_results(results: Dict[str, Dict[str, Any]]) -> str:
+    """Таблица результатов замеров"""
+    header = f"{'Сценарий':<20}{'Время, с':>10}{'Запросов':>10}{'Запр/с':>10}{'p50, мс':>10}{'p99, мс':>10}{'Повторы':>9}{'Баллы':>9}"
+    lines = [header, "-" * len(header)]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<20}"
+            f"{result['job_time']['mean']:>10.3f}"
+            f"{result['calls_per_run']:>10.0f}"
+            f"{result['calls_per_second']:>10.1f}"
+            f"{result['latency_ms']['p50']:>10.2f}"
+            f"{result['latency_ms']['p99']:>10.2f}"
+            f"{result['retries']:>9}"
+            f"{result['units_per_run']:>9.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    """Замеры всех сценариев на аккаунте из 50 кампаний"""
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    account = generate_account(campaigns=50, adgroups_per_campaign=5, keywords_per_adgroup=20, days=60)
+    profiles = {
+        "без задержек": {},
+        "задержка 20 мс, 2% ошибок, 2% лимитов": {
+            "latency": 0.02,
+            "latency_jitter": 0.01,
+            "error_rate": 0.02,
+            "throttle_rate": 0.02,
+            "seed": 0
+        }
+    }
+    
+    for title, server_options in profiles.items():
+        print(f"\n📊 Имитация API: {title}")
+        runner = BenchmarkRunner(account, repeat=3, server_options=server_options, units_limit=10000000)
+        print(format_results(runner.run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Локальный кэш ответов Яндекс.Директ API
+Хранилище SQLite с TTL по сервисам и сбросом после изменения объектов
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Any, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Кэш ответов на запросы чтения
+    
+    Ключ записи - сервис API и нормализованные параметры запроса (порядок
+    ключей и списков ID не влияет на ключ). Время жизни задается отдельно
+    для каждого сервиса; изменение объектов сервиса (update, suspend и
+    т.п.) сбрасывает все его записи, чтобы следующее чтение шло в API.
+    """
+    
+    # Время жизни записей по сервисам (в секундах)
+    DEFAULT_TTLS = {
+        "campaigns": 300,
+        "adgroups": 300,
+        "ads": 300,
+        "keywords": 300,
+        "reports": 3600,
+        # Отчеты за периоды, включающие текущий день
+        "reports_today": 60
+    }
+    
+    # Сервисы, записи которых устаревают при изменении другого сервиса
+    DEPENDENT_SERVICES = {
+        "keywordbids": ("keywords",),
+        "bids": ("keywords",)
+    }
+    
+    def __init__(self,
+                 path: str = ":memory:",
+                 ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 0):
+        """
+        Инициализация кэша
+        
+        Args:
+            path: Файл базы SQLite (":memory:" - кэш только на время работы)
+            ttls: Время жизни по сервисам, дополняет DEFAULT_TTLS
+            default_ttl: Время жизни для остальных сервисов (0 - не кэшировать)
+        """
+        self.path = path
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, service TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_service ON responses (service)")
+        self._db.commit()
+        
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "invalidations": 0
+        }
+        
+    def close(self):
+        """Закрывает базу кэша"""
+        with self._lock:
+            self._db.close()
+            
+    def get_ttl(self, service: str) -> float:
+        """Время жизни записей сервиса в секундах"""
+        return self.ttls.get(service, self.default_ttl)
+    
+    @classmethod
+    def _normalize(cls, value: Any) -> Any:
+        """Приводит параметры к каноническому виду (списки скаляров сортируются)"""
+        if isinstance(value, dict):
+            return {key: cls._normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            items = [cls._normalize(item) for item in value]
+            if all(isinstance(item, (str, int, float)) for item in items):
+                return sorted(items, key=lambda item: (type(item).__name__, item))
+            return items
+        return value
+    
+    def make_key(self, namespace: str, service: str, params: Dict[str, Any]) -> str:
+        """
+        Формирует ключ записи
+        
+        Args:
+            namespace: Пространство ключей (адрес API и аккаунт)
+            service: Сервис API
+            params: Параметры запроса
+            
+        Returns:
+            Хэш нормализованного запроса
+        """
+        payload = json.dumps(
+            [namespace, service, self._normalize(params)],
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Возвращает сохраненный ответ
+        
+        Args:
+            key: Ключ из make_key
+            
+        Returns:
+            Ответ или None, если записи нет или она устарела
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires_at, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is not None and row[0] <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self.stats["expired"] += 1
+                row = None
+                
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            
+            self.stats["hits"] += 1
+            
+        return json.loads(row[1])
+    
+    def set(self, key: str, service: str, value: Any):
+        """
+        Сохраняет ответ с временем жизни сервиса
+        
+        Args:
+            key: Ключ из make_key
+            service: Сервис API
+            value: JSON-совместимый ответ
+        """
+        ttl = self.get_ttl(service)
+        if ttl <= 0:
+            return
+        
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, service, expires_at, value) VALUES (?, ?, ?, ?)",
+                (key, service, time.time() + ttl, payload)
+            )
+            self._db.commit()
+            self.stats["stores"] += 1
+            
+    def invalidate(self, services: Iterable[str]) -> int:
+        """
+        Удаляет записи сервисов и зависящих от них сервисов
+        
+        Args:
+            services: Сервисы, объекты которых изменились
+            
+        Returns:
+            Количество удаленных записей
+        """
+        affected = set()
+        for service in services:
+            affected.add(service)
+            affected.update(self.DEPENDENT_SERVICES.get(service, ()))
+            
+        with self._lock:
+            cursor = self._db.executemany(
+                "DELETE FROM responses WHERE service = ?",
+                [(service,) for service in affected]
+            )
+            self._db.commit()
+            removed = max(cursor.rowcount, 0)
+            self.stats["invalidations"] += removed
+            
+        if removed:
+            logger.debug(f"Кэш сброшен для {', '.join(sorted(affected))}: {removed} записей")
+        return removed
+    
+    def purge_expired(self) -> int:
+        """Удаляет устаревшие записи и возвращает их количество"""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+            removed = max(cursor.rowcount, 0)
+            self.stats["expired"] += removed
+        return removed
+    
+    def clear(self):
+        """Удаляет все записи"""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает счетчики кэша
+        
+        Returns:
+            Словарь с попаданиями, промахами, устаревшими и сохраненными
+            записями, сбросами и долей попаданий
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
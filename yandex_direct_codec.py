@@ -0,0 +1,225 @@
+"""
+Кодирование и разбор JSON запросов к API Яндекс.Директ
+Стандартный модуль json или orjson (если установлен), отложенный разбор страниц get
+"""
+
+import json
+import re
+from typing import Dict, Any, Iterator, Optional, Sequence
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class JSONCodec:
+    """Кодек на стандартном модуле json"""
+    
+    name = "json"
+    _decode = json.JSONDecoder().decode
+    
+    def dumps(self, obj: Any) -> bytes:
+        """Кодирует объект в компактный JSON (UTF-8)"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    
+    def loads(self, data: bytes) -> Any:
+        """Разбирает JSON целиком (ответы API - в UTF-8)"""
+        return self._decode(data.decode("utf-8") if isinstance(data, bytes) else data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Кодек на orjson: кодирование и полный разбор в несколько раз быстрее json"""
+    
+    name = "orjson"
+    
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("Для кодека orjson установите пакет orjson")
+        
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+CODECS = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec
+}
+
+
+def get_codec(name: str = "auto") -> JSONCodec:
+    """
+    Возвращает кодек по названию
+    
+    Args:
+        name: json, orjson или auto (orjson, если установлен, иначе json)
+        
+    Returns:
+        Кодек
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name not in CODECS:
+        raise ValueError(f"Неизвестный кодек JSON: {name}")
+    return CODECS[name]()
+
+
+# ==================== ОТЛОЖЕННЫЙ РАЗБОР СТРАНИЦ ====================
+
+# Начало ответа get: {"result": {["LimitedBy": N,] "<Ключ>": [
+_PAGE_HEAD = rb'\s*\{\s*"result"\s*:\s*\{\s*(?:"LimitedBy"\s*:\s*(\d+)\s*,\s*)?"%s"\s*:\s*\['
+
+# Конец ответа get: ] [, "LimitedBy": N] } }
+_PAGE_TAIL = re.compile(rb'\]\s*(?:,\s*"LimitedBy"\s*:\s*(\d+)\s*)?\}\s*\}\s*$')
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+
+# Текст без скобок со строками (скобки внутри строк не учитываются)
+_FLAT = rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*'
+
+# Объект без вложенных объектов и списков - одним совпадением
+_FLAT_OBJECT = re.compile(rb'\{' + _FLAT + rb'\}', re.S)
+
+# Следующая скобка внутри объекта: текст и строки до нее пропускаются
+_NEXT_BRACKET = re.compile(_FLAT + rb'([\[\]{}])', re.S)
+
+# Значение без скобок: строка, число, true, false, null
+_SCALAR = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[^\s,\[\]{}"]+', re.S)
+
+# Разделитель после объекта: запятая (с пробелами до следующего объекта) или конец списка
+_SEPARATOR = re.compile(rb"[ \t\n\r]*(?:(\])|,[ \t\n\r]*)")
+
+_OPENING = b"[{"
+
+# Сколько последних символов ответа просматривать в поисках конца списка
+_TAIL_WINDOW = 256
+
+
+def _project(item: Any, fields: Optional[Sequence[str]]) -> Any:
+    """Оставляет в объекте только запрошенные поля FieldNames"""
+    if fields is None or not isinstance(item, dict):
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+
+class LazyItems:
+    """
+    Объекты страницы, разбираемые по одному при переборе
+    
+    В памяти остаются только байты ответа: границы объектов находятся
+    сканированием структуры (без разбора значений), а каждый объект
+    разбирается выбранным кодеком из своего среза. Словари объектов
+    создаются по мере перебора: iter_campaigns и другие генераторы не
+    держат всю страницу разобранной, а перебор, прерванный раньше, не
+    разбирает оставшиеся объекты.
+    """
+    
+    def __init__(self,
+                 data: bytes,
+                 start: int,
+                 codec: JSONCodec,
+                 fields: Optional[Sequence[str]] = None):
+        """
+        Args:
+            data: Тело ответа
+            start: Позиция сразу после "[" списка объектов
+            codec: Кодек для разбора объектов
+            fields: Поля FieldNames, которые остаются в объектах
+                (по умолчанию все поля ответа)
+        """
+        self._data = data
+        self._start = start
+        self._codec = codec
+        self._fields = list(fields) if fields is not None else None
+        
+    def __iter__(self) -> Iterator[Any]:
+        data = self._data
+        loads, fields = self._codec.loads, self._fields
+        flat_object, next_bracket, separator = _FLAT_OBJECT.match, _NEXT_BRACKET.match, _SEPARATOR.match
+        
+        pos = _WHITESPACE.match(data, self._start).end()
+        if data[pos:pos + 1] == b"]":
+            return
+        while True:
+            start = pos
+            match = flat_object(data, pos)
+            if match is not None:
+                pos = match.end()
+            elif data[pos:pos + 1] in (b"{", b"["):
+                # Конец объекта с вложенными скобками - парная скобка
+                depth = 0
+                while True:
+                    match = next_bracket(data, pos)
+                    if match is None:
+                        raise ValueError(f"Некорректный JSON: объект с позиции {start} не закрыт")
+                    pos = match.end()
+                    if data[pos - 1] in _OPENING:
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if not depth:
+                            break
+            else:
+                match = _SCALAR.match(data, pos)
+                if match is None:
+                    raise ValueError(f"Некорректный JSON в позиции {pos}")
+                pos = match.end()
+                
+            item = loads(data[start:pos])
+            yield item if fields is None else _project(item, fields)
+            
+            match = separator(data, pos)
+            if match is None:
+                raise ValueError(f"Некорректный JSON в позиции {pos}")
+            if match.group(1):
+                return
+            pos = match.end()
+            
+    def to_list(self) -> list:
+        """Разбирает все объекты"""
+        return list(self)
+
+
+def decode_page(data: bytes,
+                result_key: str,
+                codec: JSONCodec,
+                fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Разбирает ответ get с отложенным разбором списка объектов
+    
+    Ответ того же вида, что и при полном разборе, но result[result_key] -
+    LazyItems. Ответы с ошибкой и ответы другой структуры разбираются
+    целиком.
+    
+    Args:
+        data: Тело ответа
+        result_key: Ключ списка объектов (Campaigns, Keywords...)
+        codec: Кодек
+        fields: Поля FieldNames запроса: остальные поля объектов
+            отбрасываются (по умолчанию объекты не изменяются)
+        
+    Returns:
+        Ответ API
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    head = re.match(_PAGE_HEAD % re.escape(result_key.encode("utf-8")), data)
+    tail = _PAGE_TAIL.search(data, max(head.end(), len(data) - _TAIL_WINDOW)) if head else None
+    if tail is None:
+        response = codec.loads(data)
+        result = response.get("result") if isinstance(response, dict) else None
+        if fields is not None and isinstance(result, dict) and isinstance(result.get(result_key), list):
+            result[result_key] = [_project(item, fields) for item in result[result_key]]
+        return response
+    
+    result: Dict[str, Any] = {result_key: LazyItems(data, head.end(), codec, fields)}
+    limited_by: Optional[bytes] = head.group(1) or tail.group(1)
+    if limited_by is not None:
+        result["LimitedBy"] = int(limited_by)
+    return {"result": result}
@@ -29,6 +29,82 @@ class Config:
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
     RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
     RETRY_DELAY = int(os.getenv("RETRY_DELAY", "5"))
+    RETRY_MAX_DELAY = int(os.getenv("RETRY_MAX_DELAY", "60"))
+    
+    # Максимум повторов за одно задание (например, ежедневную оптимизацию)
+    RETRY_BUDGET = int(os.getenv("RETRY_BUDGET", "50"))
+    
+    # Пул HTTP соединений
+    POOL_CONNECTIONS = int(os.getenv("POOL_CONNECTIONS", "10"))
+    POOL_MAXSIZE = int(os.getenv("POOL_MAXSIZE", "10"))
+    POOL_BLOCK = os.getenv("POOL_BLOCK", "False").lower() == "true"
+    KEEP_ALIVE = os.getenv("KEEP_ALIVE", "True").lower() == "true"
+    
+    # Планировщик запросов по баллам API
+    RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "5"))
+    RATE_LIMIT_RESERVE_UNITS = int(os.getenv("RATE_LIMIT_RESERVE_UNITS", "0"))
+    RATE_LIMIT_MAX_WAIT = int(os.getenv("RATE_LIMIT_MAX_WAIT", "600"))
+    
+    # Кэш ответов API (повторные чтения не расходуют баллы)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() == "true"
+    CACHE_PATH = os.getenv("CACHE_PATH", ".yandex_direct_cache.sqlite")
+    
+    # Время жизни записей кэша по сервисам (в секундах, 0 - не кэшировать)
+    CACHE_TTLS = {
+        "campaigns": int(os.getenv("CACHE_TTL_CAMPAIGNS", "300")),
+        "adgroups": int(os.getenv("CACHE_TTL_ADGROUPS", "300")),
+        "ads": int(os.getenv("CACHE_TTL_ADS", "300")),
+        "keywords": int(os.getenv("CACHE_TTL_KEYWORDS", "300")),
+        "reports": int(os.getenv("CACHE_TTL_REPORTS", "3600")),
+        "reports_today": int(os.getenv("CACHE_TTL_REPORTS_TODAY", "60")),
+    }
+    
+    # Локальное хранилище дневной статистики
+    STATS_STORE_PATH = os.getenv("STATS_STORE_PATH", ".yandex_direct_stats.sqlite")
+    
+    # Сколько последних дней статистики загружать повторно (Директ уточняет их)
+    STATS_RESTATEMENT_DAYS = int(os.getenv("STATS_RESTATEMENT_DAYS", "3"))
+    
+    # Минимальный интервал между повторными загрузками последних дней (в секундах)
+    STATS_SYNC_INTERVAL = int(os.getenv("STATS_SYNC_INTERVAL", "900"))
+    
+    # Тренды и аномалии дневной статистики
+    TREND_OPTIONS = {
+        # Окно скользящего среднего и базы для z-score (в днях)
+        "window": int(os.getenv("TREND_WINDOW", "7")),
+        # Порог |z-score| для аномалии
+        "z_threshold": float(os.getenv("TREND_Z_THRESHOLD", "3.0")),
+        # Изменение за период (в процентах), начиная с которого есть тренд
+        "trend_threshold": float(os.getenv("TREND_CHANGE_PERCENT", "10")),
+    }
+    
+    # Количество процессов для анализа кампаний (0 - по числу ядер)
+    ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0"))
+    
+    # Логины клиентов агентства через запятую (запросы с заголовком Client-Login)
+    AGENCY_CLIENT_LOGINS = [
+        login.strip()
+        for login in os.getenv("AGENCY_CLIENT_LOGINS", "").split(",")
+        if login.strip()
+    ]
+    
+    # Количество аккаунтов, обрабатываемых одновременно
+    AGENCY_MAX_WORKERS = int(os.getenv("AGENCY_MAX_WORKERS", "4"))
+    
+    # Метрики запросов (время фаз, размеры, баллы, повторы) и трассировка сценариев
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() == "true"
+    
+    # Файл для выгрузки метрик после запуска: *.json - JSON, иначе формат Prometheus
+    METRICS_EXPORT_PATH = os.getenv("METRICS_EXPORT_PATH", "")
+    
+    # Кодек JSON: auto (orjson, если установлен), orjson или json
+    JSON_CODEC = os.getenv("JSON_CODEC", "auto")
+    
+    # Разбирать объекты страниц get по одному при переборе (работает без кэша ответов)
+    LAZY_PAGES = os.getenv("LAZY_PAGES", "False").lower() == "true"
+    
+    # Количество объектов в части потокового экспорта
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "10000"))
     
     # Лимиты
     MAX_CAMPAIGNS_PER_REQUEST = 10000
@@ -6,6 +6,12 @@
 import json
 from datetime import datetime, timedelta
 from yandex_direct_manager import YandexDirectManager, CampaignAutomation
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_retry import RetryPolicy
+from yandex_direct_cache import ResponseCache
+from yandex_direct_sync import StatsStore, StatsSync
+from yandex_direct_metrics import MetricsRegistry
+from yandex_direct_codec import get_codec
 from yandex_direct_config import config
 import logging
 
@@ -19,9 +25,39 @@ class YandexDirectExamples:
         """Инициализация примеров"""
         self.manager = YandexDirectManager(
             access_token=config.YANDEX_DIRECT_TOKEN,
-            use_sandbox=config.USE_SANDBOX
+            use_sandbox=config.USE_SANDBOX,
+            pool_connections=config.POOL_CONNECTIONS,
+            pool_maxsize=config.POOL_MAXSIZE,
+            pool_block=config.POOL_BLOCK,
+            keep_alive=config.KEEP_ALIVE,
+            rate_limiter=UnitsRateLimiter(
+                max_requests_per_second=config.RATE_LIMIT_RPS,
+                reserve_units=config.RATE_LIMIT_RESERVE_UNITS
+            ),
+            max_throttle_wait=config.RATE_LIMIT_MAX_WAIT,
+            request_timeout=config.REQUEST_TIMEOUT,
+            retry_policy=RetryPolicy(
+                max_attempts=config.RETRY_ATTEMPTS,
+                base_delay=config.RETRY_DELAY,
+                max_delay=config.RETRY_MAX_DELAY
+            ),
+            cache=ResponseCache(
+                config.CACHE_PATH,
+                ttls=config.CACHE_TTLS
+            ) if config.CACHE_ENABLED else None,
+            metrics=MetricsRegistry() if config.METRICS_ENABLED else None,
+            codec=get_codec(config.JSON_CODEC),
+            lazy_pages=config.LAZY_PAGES
+        )
+        self.automation = CampaignAutomation(
+            self.manager,
+            stats_sync=StatsSync(
+                self.manager,
+                StatsStore(config.STATS_STORE_PATH),
+                restatement_days=config.STATS_RESTATEMENT_DAYS,
+                min_sync_interval=config.STATS_SYNC_INTERVAL
+            )
         )
-        self.automation = CampaignAutomation(self.manager)
     
     # ==================== ПРИМЕР 1: УПРАВЛЕНИЕ КАМПАНИЯМИ ====================
     
@@ -388,6 +424,9 @@ def main():
     # Запускаем все примеры
     examples.run_all_examples()
     
+    if examples.manager.metrics is not None and config.METRICS_EXPORT_PATH:
+        examples.manager.metrics.export(config.METRICS_EXPORT_PATH)
+        
     # Или запускаем отдельные примеры:
     # examples.example_1_manage_campaigns()
     # examples.example_4_get_statistics()
@@ -0,0 +1,466 @@
+"""
+Потоковый экспорт объектов аккаунта Яндекс.Директ
+Кампании, группы и ключевые слова со статистикой в CSV, CSV.GZ, Parquet или Arrow частями
+"""
+
+import csv
+import gzip
+import json
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Mapping, Sequence
+import logging
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS, DERIVED_METRICS
+
+logger = logging.getLogger(__name__)
+
+
+# Столбцы статистики, которые присоединяются к объектам
+STATS_COLUMNS = (*METRIC_COLUMNS, *DERIVED_METRICS)
+
+# Форматы по расширению файла
+FORMATS = {
+    ".csv": "csv",
+    ".csv.gz": "csv.gz",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow"
+}
+
+
+def detect_format(path: str) -> str:
+    """
+    Определяет формат экспорта по расширению файла
+    
+    Args:
+        path: Путь к файлу
+        
+    Returns:
+        csv, csv.gz, parquet или arrow
+    """
+    lowered = path.lower()
+    for extension in sorted(FORMATS, key=len, reverse=True):
+        if lowered.endswith(extension):
+            return FORMATS[extension]
+    raise ValueError(f"Неизвестный формат экспорта: {path}")
+
+
+def column_value(item: Mapping, column: str) -> Any:
+    """
+    Значение столбца объекта
+    
+    Args:
+        item: Объект (модель или словарь)
+        column: Поле или путь через точку во вложенный объект
+            (например, TextAd.Title)
+            
+    Returns:
+        Значение или None, если поля нет
+    """
+    value = item
+    for name in column.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(name)
+    return value
+
+
+def _plain(value: Any) -> Any:
+    """Вложенные объекты и списки записываются строкой JSON"""
+    if isinstance(value, (Mapping, list, tuple)):
+        return json.dumps(value if isinstance(value, (list, tuple)) else dict(value), ensure_ascii=False)
+    return value
+
+
+# ==================== СТАТИСТИКА ====================
+
+class StatsLookup:
+    """
+    Метрики объектов по ID для присоединения к частям экспорта
+    
+    Статистика сворачивается по ключу в отсортированные массивы NumPy,
+    поэтому на каждый объект приходится несколько чисел, а не словарь.
+    Часть объектов присоединяется одним np.searchsorted; объекты без
+    статистики за период получают нули.
+    """
+    
+    def __init__(self, frame: StatsFrame, key: str = "CampaignId"):
+        """
+        Args:
+            frame: Статистика со столбцом key и METRIC_COLUMNS
+            key: Поле с ID объекта (CampaignId, AdGroupId, CriterionId)
+        """
+        grouped = frame.group_by(key)
+        self.key = key
+        self.keys = grouped.column(key).astype(np.int64)
+        self.columns = {name: grouped.column(name) for name in STATS_COLUMNS}
+        
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def join(self, ids: Sequence[Any]) -> Dict[str, List[Any]]:
+        """
+        Метрики для списка ID
+        
+        Args:
+            ids: ID объектов части
+            
+        Returns:
+            {столбец STATS_COLUMNS: значения в порядке ids}
+        """
+        ids = np.asarray([-1 if object_id is None else object_id for object_id in ids], dtype=np.int64)
+        if len(self.keys) == 0:
+            return {name: np.zeros(len(ids), dtype=values.dtype).tolist() for name, values in self.columns.items()}
+        
+        positions = np.minimum(np.searchsorted(self.keys, ids), len(self.keys) - 1)
+        found = self.keys[positions] == ids
+        return {
+            name: np.where(found, values[positions], 0).astype(values.dtype).tolist()
+            for name, values in self.columns.items()
+        }
+
+
+# ==================== ЗАПИСЬ ====================
+
+class ExportWriter(ABC):
+    """
+    Запись частей экспорта в файл
+    
+    Часть передается столбцами {столбец: значения}; каждая часть
+    записывается и сбрасывается на диск сразу, в памяти держится
+    только текущая часть.
+    """
+    
+    def __init__(self, path: str, columns: Sequence[str], headers: Optional[Sequence[str]] = None):
+        """
+        Args:
+            path: Путь к файлу
+            columns: Столбцы в порядке записи
+            headers: Заголовки столбцов в файле (по умолчанию названия столбцов)
+        """
+        if headers is not None and len(headers) != len(columns):
+            raise ValueError("Количество заголовков не совпадает с количеством столбцов")
+        self.path = path
+        self.columns = list(columns)
+        self.headers = list(headers) if headers is not None else list(columns)
+        self.rows = 0
+        
+    @abstractmethod
+    def write_chunk(self, data: Dict[str, List[Any]]):
+        """Записывает часть"""
+        
+    @abstractmethod
+    def close(self):
+        """Завершает файл"""
+        
+    def __enter__(self) -> "ExportWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CSVWriter(ExportWriter):
+    """CSV (UTF-8), при compress=True - сжатый gzip"""
+    
+    def __init__(self,
+                 path: str,
+                 columns: Sequence[str],
+                 headers: Optional[Sequence[str]] = None,
+                 compress: bool = False):
+        super().__init__(path, columns, headers)
+        if compress:
+            self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.headers)
+        
+    def write_chunk(self, data: Dict[str, List[Any]]):
+        columns = [[_plain(value) for value in data[column]] for column in self.columns]
+        rows = list(zip(*columns))
+        self._writer.writerows(rows)
+        self._file.flush()
+        self.rows += len(rows)
+        
+    def close(self):
+        self._file.close()
+
+
+class ArrowWriter(ExportWriter):
+    """
+    Parquet или Arrow IPC (Feather v2) через pyarrow
+    
+    Каждая часть становится группой строк Parquet или пакетом Arrow.
+    Схема определяется по первой части; столбцы, в которых в первой
+    части были только пустые значения, записываются строками.
+    """
+    
+    def __init__(self,
+                 path: str,
+                 columns: Sequence[str],
+                 headers: Optional[Sequence[str]] = None,
+                 fmt: str = "parquet"):
+        if pa is None:
+            raise ImportError("Для экспорта в Parquet и Arrow установите пакет pyarrow")
+        super().__init__(path, columns, headers)
+        self.fmt = fmt
+        self._schema = None
+        self._writer = None
+        
+    def _table(self, data: Dict[str, List[Any]]):
+        arrays = [pa.array([_plain(value) for value in data[column]]) for column in self.columns]
+        if self._schema is None:
+            self._schema = pa.schema([
+                pa.field(header, pa.string() if pa.types.is_null(array.type) else array.type)
+                for header, array in zip(self.headers, arrays)
+            ])
+        return pa.Table.from_arrays(arrays, names=self.headers).cast(self._schema)
+    
+    def write_chunk(self, data: Dict[str, List[Any]]):
+        table = self._table(data)
+        if self._writer is None:
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._writer = pa_ipc.new_file(self.path, self._schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+        
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path: str,
+                columns: Sequence[str],
+                headers: Optional[Sequence[str]] = None,
+                fmt: Optional[str] = None) -> ExportWriter:
+    """
+    Открывает запись экспорта
+    
+    Args:
+        path: Путь к файлу
+        columns: Столбцы
+        headers: Заголовки столбцов
+        fmt: csv, csv.gz, parquet или arrow (по умолчанию по расширению)
+        
+    Returns:
+        Писатель
+    """
+    fmt = fmt or detect_format(path)
+    if fmt in ("csv", "csv.gz"):
+        return CSVWriter(path, columns, headers, compress=fmt == "csv.gz")
+    if fmt in ("parquet", "arrow"):
+        return ArrowWriter(path, columns, headers, fmt=fmt)
+    raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+
+
+def iter_chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Разбивает поток объектов на списки по chunk_size"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_items(items: Iterable[Mapping],
+                 path: str,
+                 columns: Sequence[str],
+                 headers: Optional[Sequence[str]] = None,
+                 stats: Optional[StatsLookup] = None,
+                 chunk_size: int = 10000,
+                 fmt: Optional[str] = None,
+                 fill: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Записывает поток объектов в файл частями
+    
+    Файл открывается при первой части: если объектов нет, он не создается.
+    
+    Args:
+        items: Объекты (например, генератор iter_keywords)
+        path: Путь к файлу
+        columns: Поля объектов (пути через точку допускаются)
+        headers: Заголовки для columns и присоединенных STATS_COLUMNS
+        stats: Статистика для присоединения по Id объекта
+        chunk_size: Количество объектов в части
+        fmt: Формат (по умолчанию по расширению)
+        fill: Значения для отсутствующих полей по столбцам (например, {"EndDate": "N/A"})
+        
+    Returns:
+        Количество записанных объектов
+    """
+    fmt = fmt or detect_format(path)
+    all_columns = [*columns, *(STATS_COLUMNS if stats is not None else ())]
+    fill = fill or {}
+    
+    writer = None
+    try:
+        for chunk in iter_chunks(items, chunk_size):
+            if writer is None:
+                writer = open_writer(path, all_columns, headers, fmt)
+            data = {}
+            for column in columns:
+                values = [column_value(item, column) for item in chunk]
+                if column in fill:
+                    values = [fill[column] if value is None else value for value in values]
+                data[column] = values
+            if stats is not None:
+                data.update(stats.join([item.get("Id") for item in chunk]))
+            writer.write_chunk(data)
+    finally:
+        if writer is not None:
+            writer.close()
+            
+    rows = writer.rows if writer is not None else 0
+    logger.info(f"Экспортировано объектов: {rows} в {path}")
+    return rows
+
+
+# ==================== ЭКСПОРТ АККАУНТА ====================
+
+class AccountExporter:
+    """
+    Экспорт кампаний, групп или ключевых слов аккаунта со статистикой
+    
+    Объекты читаются постраничными генераторами менеджера и пишутся
+    частями по chunk_size, поэтому память не растет с размером аккаунта.
+    Статистика за период загружается одним отчетом и хранится свернутой
+    по ID (StatsLookup).
+    """
+    
+    # Столбцы по умолчанию
+    DEFAULT_COLUMNS = {
+        "campaigns": ["Id", "Name", "Status", "Type", "DailyBudget", "Timezone", "StartDate", "EndDate"],
+        "adgroups": ["Id", "CampaignId", "Name", "Status", "Type"],
+        "keywords": ["Id", "CampaignId", "AdGroupId", "Keyword", "Status", "Bid"]
+    }
+    
+    # Ключ и тип отчета статистики по сервисам
+    STATS_REPORTS = {
+        "campaigns": ("CampaignId", "CAMPAIGN_PERFORMANCE_REPORT"),
+        "adgroups": ("AdGroupId", "ADGROUP_PERFORMANCE_REPORT"),
+        "keywords": ("CriterionId", "CRITERIA_PERFORMANCE_REPORT")
+    }
+    
+    def __init__(self, manager, chunk_size: int = 10000):
+        """
+        Args:
+            manager: Экземпляр YandexDirectManager
+            chunk_size: Количество объектов в части записи
+        """
+        self.manager = manager
+        self.chunk_size = chunk_size
+        
+    def stats(self,
+              service: str,
+              campaign_ids: Optional[List[int]] = None,
+              date_range_type: str = "LAST_30_DAYS") -> StatsLookup:
+        """
+        Загружает статистику объектов сервиса за период
+        
+        Args:
+            service: campaigns, adgroups или keywords
+            campaign_ids: Фильтр по кампаниям
+            date_range_type: Период
+            
+        Returns:
+            Метрики по ID объектов
+        """
+        key, report_type = self.STATS_REPORTS[service]
+        frame = self.manager.get_statistics_frame(
+            date_range_type=date_range_type,
+            fields=[key, *METRIC_COLUMNS],
+            campaign_ids=campaign_ids,
+            report_type=report_type
+        )
+        return StatsLookup(frame, key)
+    
+    def iter_items(self,
+                   service: str,
+                   fields: List[str],
+                   campaign_ids: Optional[List[int]] = None) -> Iterator[Mapping]:
+        """
+        Постранично перебирает объекты сервиса
+        
+        Args:
+            service: campaigns, adgroups или keywords
+            fields: FieldNames запроса
+            campaign_ids: Фильтр по кампаниям (по умолчанию все)
+            
+        Yields:
+            Объекты по мере загрузки страниц
+        """
+        if service == "campaigns":
+            yield from self.manager.iter_campaigns(campaign_ids=campaign_ids, fields=fields)
+            return
+        
+        if campaign_ids is None:
+            campaign_ids = [campaign["Id"] for campaign in self.manager.iter_campaigns(fields=["Id"])]
+        if service == "adgroups":
+            yield from self.manager.iter_ad_groups(campaign_ids=campaign_ids, fields=fields)
+        elif service == "keywords":
+            yield from self.manager.iter_keywords(campaign_ids=campaign_ids, fields=fields)
+        else:
+            raise ValueError(f"Экспорт сервиса {service} не поддерживается")
+        
+    def export(self,
+               service: str,
+               path: str,
+               columns: Optional[Sequence[str]] = None,
+               headers: Optional[Sequence[str]] = None,
+               with_stats: bool = True,
+               campaign_ids: Optional[List[int]] = None,
+               date_range_type: str = "LAST_30_DAYS",
+               fmt: Optional[str] = None,
+               fill: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Экспортирует объекты сервиса со статистикой
+        
+        Args:
+            service: campaigns, adgroups или keywords
+            path: Файл (.csv, .csv.gz, .parquet, .arrow, .feather)
+            columns: Поля объектов (по умолчанию DEFAULT_COLUMNS)
+            headers: Заголовки для columns и STATS_COLUMNS
+            with_stats: Присоединить метрики и производные метрики за период
+            campaign_ids: Фильтр по кампаниям
+            date_range_type: Период статистики
+            fmt: Формат (по умолчанию по расширению)
+            fill: Значения для отсутствующих полей по столбцам
+            
+        Returns:
+            Количество записанных объектов (0 - файл не создается)
+        """
+        if service not in self.DEFAULT_COLUMNS:
+            raise ValueError(f"Экспорт сервиса {service} не поддерживается")
+        columns = list(columns or self.DEFAULT_COLUMNS[service])
+        fmt = fmt or detect_format(path)
+        if fmt in ("parquet", "arrow") and pa is None:
+            raise ImportError("Для экспорта в Parquet и Arrow установите пакет pyarrow")
+        
+        # Запрашиваются только поля верхнего уровня, нужные для столбцов
+        fields = list(dict.fromkeys(["Id", *(column.split(".")[0] for column in columns)]))
+        stats = self.stats(service, campaign_ids, date_range_type) if with_stats else None
+        
+        return export_items(
+            self.iter_items(service, fields, campaign_ids),
+            path,
+            columns,
+            headers=headers,
+            stats=stats,
+            chunk_size=self.chunk_size,
+            fmt=fmt,
+            fill=fill
+        )
@@ -0,0 +1,906 @@
+"""
+Локальная имитация Яндекс.Директ API
+Аккаунт со сгенерированной статистикой и HTTP-сервер с JSON, Reports и Changes API,
+задержками, ошибками и учетом баллов для интеграционных и нагрузочных проверок
+"""
+
+import copy
+import functools
+import itertools
+import json
+import random
+import socket
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Any, Iterable, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS, derived_metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Поля дневной статистики аккаунта
+STATS_FIELDS = ("Date", "CampaignId", "AdGroupId", "CriterionId", *METRIC_COLUMNS)
+
+# Поля отчета, по которым группируются строки
+REPORT_DIMENSIONS = ("Date", "CampaignId", "AdGroupId", "CriterionId")
+
+# Начало отсчета меток времени сервиса changes (секунда на изменение)
+CHANGES_EPOCH = datetime(2020, 1, 1)
+
+
+class FakeApiError(Exception):
+    """Ошибка, которую имитация возвращает в теле ответа API"""
+    
+    def __init__(self, code: int, message: str, detail: str = ""):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.detail = detail
+        
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "error_code": self.code,
+            "error_string": self.message,
+            "error_detail": self.detail
+        }
+
+
+class FakeAccount:
+    """
+    Данные рекламного аккаунта для имитации API
+    
+    Объекты хранятся словарями {ID: объект} по сервисам, дневная
+    статистика - StatsFrame со строками по ключевым словам (поля
+    STATS_FIELDS).
+    """
+    
+    SERVICES = ("campaigns", "adgroups", "ads", "keywords")
+    
+    def __init__(self,
+                 campaigns: Iterable[Dict[str, Any]] = (),
+                 adgroups: Iterable[Dict[str, Any]] = (),
+                 ads: Iterable[Dict[str, Any]] = (),
+                 keywords: Iterable[Dict[str, Any]] = (),
+                 stats: Optional[StatsFrame] = None):
+        self.objects = {
+            "campaigns": {item["Id"]: dict(item) for item in campaigns},
+            "adgroups": {item["Id"]: dict(item) for item in adgroups},
+            "ads": {item["Id"]: dict(item) for item in ads},
+            "keywords": {item["Id"]: dict(item) for item in keywords}
+        }
+        self.stats = stats if stats is not None else self._empty_stats()
+        
+    @staticmethod
+    def _empty_stats() -> StatsFrame:
+        """Пустая статистика с датами-строками, как в сгенерированной"""
+        frame = StatsFrame.empty(STATS_FIELDS)
+        frame.columns["Date"] = np.zeros(0, dtype="<U10")
+        return frame
+        
+    @property
+    def campaigns(self) -> Dict[int, Dict[str, Any]]:
+        return self.objects["campaigns"]
+    
+    @property
+    def keywords(self) -> Dict[int, Dict[str, Any]]:
+        return self.objects["keywords"]
+    
+    def copy(self) -> "FakeAccount":
+        """Независимая копия объектов (статистика общая, она не изменяется на месте)"""
+        account = FakeAccount(stats=self.stats)
+        account.objects = copy.deepcopy(self.objects)
+        return account
+    
+    def dates(self) -> List[str]:
+        """Дни, за которые есть статистика, по возрастанию"""
+        return np.unique(self.stats.column("Date")).tolist() if len(self.stats) else []
+    
+    def stats_between(self, date_from: str, date_to: str) -> StatsFrame:
+        """Строки статистики за период включительно"""
+        dates = self.stats.column("Date")
+        return self.stats.filter((dates >= date_from) & (dates <= date_to))
+    
+    def add_stats(self, frame: StatsFrame):
+        """Добавляет строки статистики (например, смоделированный день)"""
+        if len(frame) == 0:
+            return
+        if len(self.stats) == 0:
+            self.stats = StatsFrame({field: frame[field] for field in STATS_FIELDS})
+            return
+        self.stats = StatsFrame({
+            field: np.concatenate([self.stats[field], frame[field]])
+            for field in STATS_FIELDS
+        })
+        
+    @classmethod
+    def from_manager(cls, manager, days: int = 60) -> "FakeAccount":
+        """
+        Снимок реального аккаунта: объекты и дневная статистика ключевых слов
+        
+        Args:
+            manager: Экземпляр YandexDirectManager
+            days: Глубина статистики в днях (до вчерашнего дня)
+            
+        Returns:
+            FakeAccount
+        """
+        date_to = date.today() - timedelta(days=1)
+        date_from = date_to - timedelta(days=days - 1)
+        
+        campaigns = manager.get_campaigns()
+        campaign_ids = [campaign["Id"] for campaign in campaigns]
+        stats = manager.get_statistics_frame(
+            fields=list(STATS_FIELDS),
+            campaign_ids=campaign_ids,
+            date_from=date_from.isoformat(),
+            date_to=date_to.isoformat(),
+            report_type="CRITERIA_PERFORMANCE_REPORT"
+        )
+        
+        return cls(
+            campaigns=campaigns,
+            adgroups=itertools.chain.from_iterable(
+                manager.iter_ad_groups(campaign_id=campaign_id) for campaign_id in campaign_ids
+            ),
+            ads=itertools.chain.from_iterable(
+                manager.iter_ads(campaign_id=campaign_id) for campaign_id in campaign_ids
+            ),
+            keywords=manager.iter_keywords(campaign_ids=campaign_ids) if campaign_ids else (),
+            stats=stats
+        )
+
+
+def generate_account(campaigns: int = 10,
+                     adgroups_per_campaign: int = 5,
+                     keywords_per_adgroup: int = 10,
+                     ads_per_adgroup: int = 2,
+                     days: int = 60,
+                     end_date: Optional[str] = None,
+                     seed: int = 0) -> FakeAccount:
+    """
+    Генерирует аккаунт со статистикой заданного размера
+    
+    У каждого ключевого слова свои средние показы, CTR, конверсия и доля
+    ставки, которую составляет цена клика; дневные значения случайны вокруг
+    средних. Строки без показов в статистику не попадают, как в отчетах
+    Директа.
+    
+    Args:
+        campaigns: Количество кампаний
+        adgroups_per_campaign: Групп объявлений в кампании
+        keywords_per_adgroup: Ключевых слов в группе
+        ads_per_adgroup: Объявлений в группе
+        days: Дней статистики
+        end_date: Последний день статистики (по умолчанию вчера)
+        seed: Зерно генератора случайных чисел
+        
+    Returns:
+        FakeAccount
+    """
+    rng = np.random.default_rng(seed)
+    end = date.fromisoformat(end_date) if end_date else date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    
+    account_campaigns, adgroups, ads, keywords = [], [], [], []
+    for campaign_index in range(campaigns):
+        campaign_id = 1000 + campaign_index
+        account_campaigns.append({
+            "Id": campaign_id,
+            "Name": f"Кампания {campaign_index + 1}",
+            "Status": "ACCEPTED",
+            "State": "ON",
+            "StatusPayment": "ALLOWED",
+            "Type": "TEXT_CAMPAIGN",
+            "StartDate": start.isoformat(),
+            "EndDate": None,
+            "DailyBudget": int(rng.integers(5, 50)) * 10000000,
+            "Timezone": "Europe/Moscow"
+        })
+        for group_index in range(adgroups_per_campaign):
+            adgroup_id = 100000 + campaign_index * adgroups_per_campaign + group_index
+            adgroups.append({
+                "Id": adgroup_id,
+                "CampaignId": campaign_id,
+                "Name": f"Группа {group_index + 1}",
+                "Status": "ACCEPTED",
+                "Type": "TEXT_AD_GROUP"
+            })
+            for ad_index in range(ads_per_adgroup):
+                ads.append({
+                    "Id": 10000000 + adgroup_id * ads_per_adgroup + ad_index,
+                    "CampaignId": campaign_id,
+                    "AdGroupId": adgroup_id,
+                    "HeadlinesPart1": f"Заголовок {ad_index + 1}",
+                    "HeadlinesPart2": "",
+                    "Description": "Описание объявления",
+                    "Status": "ACCEPTED",
+                    "State": "ON",
+                    "Type": "TEXT_AD"
+                })
+            for keyword_index in range(keywords_per_adgroup):
+                keywords.append({
+                    "Id": 100000000 + adgroup_id * keywords_per_adgroup + keyword_index,
+                    "Keyword": f"ключевое слово {campaign_index + 1}-{group_index + 1}-{keyword_index + 1}",
+                    "CampaignId": campaign_id,
+                    "AdGroupId": adgroup_id,
+                    "Status": "ACCEPTED",
+                    "State": "ON",
+                    "Bid": int(rng.integers(5, 60)) * 1000000,
+                    "ContextBid": 0
+                })
+                
+    count = len(keywords)
+    if count == 0 or days <= 0:
+        return FakeAccount(account_campaigns, adgroups, ads, keywords)
+    
+    # Средние показатели ключевых слов
+    keyword_ids = np.array([keyword["Id"] for keyword in keywords], dtype=np.int64)
+    campaign_ids = np.array([keyword["CampaignId"] for keyword in keywords], dtype=np.int64)
+    adgroup_ids = np.array([keyword["AdGroupId"] for keyword in keywords], dtype=np.int64)
+    bids = np.array([keyword["Bid"] for keyword in keywords], dtype=np.float64) / 1000000
+    mean_impressions = rng.lognormal(3.0, 1.0, count)
+    ctr = rng.beta(2, 60, count)
+    conversion_rate = rng.beta(2, 40, count)
+    cpc_share = rng.uniform(0.4, 0.9, count)
+    
+    # Дневные значения: матрица ключевые слова x дни
+    impressions = rng.poisson(mean_impressions[:, None], (count, days))
+    clicks = rng.binomial(impressions, ctr[:, None])
+    conversions = rng.binomial(clicks, conversion_rate[:, None])
+    cost = np.round(clicks * bids[:, None] * cpc_share[:, None] * rng.uniform(0.9, 1.1, (count, days)), 2)
+    
+    rows, columns = np.nonzero(impressions)
+    day_strings = np.datetime_as_string(
+        np.arange(np.datetime64(start), np.datetime64(end) + np.timedelta64(1, "D"))
+    )
+    stats = StatsFrame({
+        "Date": day_strings[columns],
+        "CampaignId": campaign_ids[rows],
+        "AdGroupId": adgroup_ids[rows],
+        "CriterionId": keyword_ids[rows],
+        "Impressions": impressions[rows, columns].astype(np.int64),
+        "Clicks": clicks[rows, columns].astype(np.int64),
+        "Cost": cost[rows, columns],
+        "Conversions": conversions[rows, columns].astype(np.int64)
+    })
+    # Строки по дням, как в отчетах с сортировкой по дате
+    stats = stats.filter(np.argsort(stats["Date"], kind="stable"))
+    
+    return FakeAccount(account_campaigns, adgroups, ads, keywords, stats)
+
+
+class FakeDirectBackend:
+    """
+    Обработка запросов к имитации API
+    
+    Поддерживает методы get, update, add, delete, suspend и resume
+    сервисов campaigns, adgroups, ads и keywords, сервис changes
+    (checkDictionaries, checkCampaigns, check) и отчеты Reports API по
+    статистике аккаунта. Периоды отчетов (LAST_7_DAYS и т.п.) считаются
+    от today, поэтому имитацию можно "перематывать" по дням.
+    
+    Баллы списываются по UNITS_COSTS; если задан units_limit, ответы
+    содержат заголовок Units, а при нехватке баллов возвращается ошибка 152.
+    """
+    
+    RESULT_KEYS = {
+        "campaigns": "Campaigns",
+        "adgroups": "AdGroups",
+        "ads": "Ads",
+        "keywords": "Keywords"
+    }
+    
+    CHANGES_METHODS = {
+        "checkDictionaries": "_check_dictionaries",
+        "checkCampaigns": "_check_campaigns",
+        "check": "_check"
+    }
+    
+    # Стоимость в баллах: (за запрос, за объект в запросе или ответе)
+    UNITS_COSTS = {
+        "get": (10, 1),
+        "update": (10, 2),
+        "add": (20, 20),
+        "delete": (10, 2),
+        "suspend": (10, 2),
+        "resume": (10, 2),
+        "checkDictionaries": (1, 0),
+        "checkCampaigns": (10, 0),
+        "check": (10, 0)
+    }
+    
+    def __init__(self,
+                 account: FakeAccount,
+                 today: Optional[str] = None,
+                 units_limit: Optional[int] = None,
+                 units_costs: Optional[Dict[str, Tuple[int, int]]] = None):
+        """
+        Args:
+            account: Данные аккаунта (изменяются запросами update, add и т.п.)
+            today: Текущий день имитации (по умолчанию следующий после
+                последнего дня статистики или сегодня)
+            units_limit: Суточный лимит баллов (по умолчанию без лимита и
+                без заголовка Units)
+            units_costs: Переопределение стоимости методов в баллах
+        """
+        self.account = account
+        if today is None:
+            dates = account.dates()
+            today = (date.fromisoformat(dates[-1]) + timedelta(days=1)).isoformat() if dates else date.today().isoformat()
+        self.today = today
+        self.lock = threading.RLock()
+        self.calls: Dict[str, int] = {}
+        self._next_id = 1 + max(
+            (object_id for objects in account.objects.values() for object_id in objects),
+            default=0
+        )
+        
+        self.units_limit = units_limit
+        self.units_costs = {**self.UNITS_COSTS, **(units_costs or {})}
+        self.units_spent = 0
+        
+        # Журнал изменений для сервиса changes: (номер, сервис, ID, ID кампании, ID группы)
+        self._changes: List[Tuple[int, str, Optional[int], Optional[int], Optional[int]]] = []
+        self._clock = 0
+        
+    def handle(self, service: str, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Выполняет метод сервиса
+        
+        Returns:
+            Содержимое поля result ответа
+            
+        Raises:
+            FakeApiError: Неизвестный сервис или метод
+        """
+        if service == "changes":
+            handler = getattr(self, self.CHANGES_METHODS.get(method, ""), None)
+        elif service in self.RESULT_KEYS:
+            handler = getattr(self, f"_{method}", None)
+            if handler is not None:
+                handler = functools.partial(handler, service)
+        else:
+            raise FakeApiError(3500, "Не поддерживается", f"Сервис {service} не поддерживается")
+        
+        if handler is None:
+            raise FakeApiError(55, "Операция не найдена", f"Метод {service}.{method} не поддерживается")
+        
+        with self.lock:
+            key = f"{service}.{method}"
+            self.calls[key] = self.calls.get(key, 0) + 1
+            return handler(params)
+        
+    def execute(self, service: str, method: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Выполняет метод сервиса со списанием баллов
+        
+        Returns:
+            (содержимое поля result, значение заголовка Units или None)
+            
+        Raises:
+            FakeApiError: Ошибка метода или нехватка баллов (152)
+        """
+        call_cost, object_cost = self.units_costs.get(method, (10, 0))
+        
+        with self.lock:
+            if self.units_limit is not None and self.units_spent + call_cost > self.units_limit:
+                raise FakeApiError(152, "Недостаточно баллов", "Суточный лимит баллов исчерпан")
+            
+            result = self.handle(service, method, params)
+            objects = sum(len(value) for value in result.values() if isinstance(value, list))
+            spent = call_cost + object_cost * objects
+            self.units_spent += spent
+            
+            if self.units_limit is None:
+                return result, None
+            rest = max(self.units_limit - self.units_spent, 0)
+            return result, f"{spent}/{rest}/{self.units_limit}"
+        
+    def reset_units(self):
+        """Начинает новые сутки для лимита баллов"""
+        with self.lock:
+            self.units_spent = 0
+            
+    @staticmethod
+    def _matches(item: Dict[str, Any], criteria: Dict[str, Any]) -> bool:
+        """Проверяет объект на соответствие SelectionCriteria"""
+        filters = (
+            ("Ids", "Id"),
+            ("CampaignIds", "CampaignId"),
+            ("CampaignIdsList", "CampaignId"),
+            ("AdGroupIds", "AdGroupId"),
+            ("States", "State"),
+            ("Statuses", "Status")
+        )
+        for criterion, field in filters:
+            values = criteria.get(criterion)
+            if values and item.get(field) not in values:
+                return False
+        return True
+    
+    def _get(self, service: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        criteria = params.get("SelectionCriteria", {})
+        fields = params.get("FieldNames") or None
+        page = params.get("Page", {})
+        limit = page.get("Limit", 10000)
+        offset = page.get("Offset", 0)
+        
+        objects = self.account.objects[service]
+        if criteria.get("Ids"):
+            candidates = (objects[object_id] for object_id in criteria["Ids"] if object_id in objects)
+        else:
+            candidates = objects.values()
+        matched = [item for item in candidates if self._matches(item, criteria)]
+        
+        items = [
+            {field: item.get(field) for field in fields} if fields else dict(item)
+            for item in matched[offset:offset + limit]
+        ]
+        result = {self.RESULT_KEYS[service]: items}
+        if offset + limit < len(matched):
+            result["LimitedBy"] = offset + limit
+        return result
+    
+    def _update(self, service: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        objects = self.account.objects[service]
+        results = []
+        for item in params.get(self.RESULT_KEYS[service], []):
+            target = objects.get(item.get("Id"))
+            if target is None:
+                results.append({"Errors": [{"Code": 8800, "Message": "Объект не найден"}]})
+                continue
+            target.update(item)
+            self._record(service, target)
+            results.append({"Id": item["Id"]})
+        return {"UpdateResults": results}
+    
+    def _add(self, service: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        objects = self.account.objects[service]
+        results = []
+        for item in params.get(self.RESULT_KEYS[service], []):
+            object_id = self._next_id
+            self._next_id += 1
+            objects[object_id] = {"Id": object_id, "Status": "DRAFT", "State": "ON", **item}
+            self._record(service, objects[object_id])
+            results.append({"Id": object_id})
+        return {"AddResults": results}
+    
+    def _delete(self, service: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        objects = self.account.objects[service]
+        results = []
+        for object_id in params.get("SelectionCriteria", {}).get("Ids", []):
+            target = objects.pop(object_id, None)
+            if target is None:
+                results.append({"Errors": [{"Code": 8800, "Message": "Объект не найден"}]})
+                continue
+            self._record(service, target)
+            results.append({"Id": object_id})
+        return {"DeleteResults": results}
+    
+    def _set_state(self, service: str, params: Dict[str, Any], state: str) -> List[Dict[str, Any]]:
+        objects = self.account.objects[service]
+        results = []
+        for object_id in params.get("SelectionCriteria", {}).get("Ids", []):
+            if object_id not in objects:
+                results.append({"Errors": [{"Code": 8800, "Message": "Объект не найден"}]})
+                continue
+            objects[object_id]["State"] = state
+            self._record(service, objects[object_id])
+            results.append({"Id": object_id})
+        return results
+    
+    def _suspend(self, service: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"SuspendResults": self._set_state(service, params, "SUSPENDED")}
+    
+    def _resume(self, service: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"ResumeResults": self._set_state(service, params, "ON")}
+    
+    # ==================== ИЗМЕНЕНИЯ ====================
+    
+    def _record(self, service: str, item: Dict[str, Any]):
+        """Записывает изменение объекта в журнал сервиса changes"""
+        self._clock += 1
+        campaign_id = item.get("Id") if service == "campaigns" else item.get("CampaignId")
+        ad_group_id = item.get("Id") if service == "adgroups" else item.get("AdGroupId")
+        self._changes.append((self._clock, service, item.get("Id"), campaign_id, ad_group_id))
+        
+    def add_stats(self, frame: StatsFrame):
+        """Добавляет статистику в аккаунт и отмечает изменение STAT у ее кампаний"""
+        with self.lock:
+            self.account.add_stats(frame)
+            for campaign_id in np.unique(frame.column("CampaignId")).tolist() if len(frame) else []:
+                self._record("stats", {"CampaignId": campaign_id})
+                
+    def _timestamp(self) -> str:
+        """Текущая метка времени журнала в формате API"""
+        return (CHANGES_EPOCH + timedelta(seconds=self._clock)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    def _changes_since(self, timestamp: Optional[str]) -> List[Tuple[int, str, Optional[int], Optional[int], Optional[int]]]:
+        """Изменения после метки времени"""
+        try:
+            moment = datetime.strptime(timestamp or "", "%Y-%m-%dT%H:%M:%SZ")
+        except ValueError:
+            raise FakeApiError(4000, "Неверные параметры запроса", f"Timestamp {timestamp}")
+        since = int((moment - CHANGES_EPOCH).total_seconds())
+        return [change for change in self._changes if change[0] > since]
+    
+    def _check_dictionaries(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"Timestamp": self._timestamp()}
+    
+    def _check_campaigns(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        kinds: Dict[int, set] = {}
+        for _, service, _, campaign_id, _ in self._changes_since(params.get("Timestamp")):
+            if campaign_id is None:
+                continue
+            kind = {"campaigns": "SELF", "stats": "STAT"}.get(service, "CHILDREN")
+            kinds.setdefault(campaign_id, set()).add(kind)
+            
+        return {
+            "Campaigns": [
+                {"CampaignId": campaign_id, "ChangesIn": [kind for kind in ("SELF", "CHILDREN", "STAT") if kind in found]}
+                for campaign_id, found in sorted(kinds.items())
+            ],
+            "Timestamp": self._timestamp()
+        }
+        
+    def _check(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Объекты, которыми ограничен запрос: (поле запроса, сервис, позиция ID в журнале)
+        for criterion, service, position in (
+            ("CampaignIds", "campaigns", 3),
+            ("AdGroupIds", "adgroups", 4),
+            ("AdIds", "ads", 2)
+        ):
+            if criterion in params:
+                break
+        else:
+            raise FakeApiError(4000, "Неверные параметры запроса", "Нужно указать CampaignIds, AdGroupIds или AdIds")
+        
+        requested = set(params[criterion])
+        modified = {"CampaignIds": set(), "AdGroupIds": set(), "AdIds": set()}
+        for change in self._changes_since(params.get("Timestamp")):
+            _, changed_service, object_id, campaign_id, ad_group_id = change
+            if change[position] not in requested or (criterion == "AdIds" and changed_service != "ads"):
+                continue
+            if changed_service == "campaigns":
+                modified["CampaignIds"].add(campaign_id)
+            elif changed_service in ("adgroups", "keywords"):
+                modified["AdGroupIds"].add(ad_group_id)
+            elif changed_service == "ads":
+                modified["AdIds"].add(object_id)
+                
+        fields = params.get("FieldNames") or list(modified)
+        missing = sorted(object_id for object_id in requested if object_id not in self.account.objects[service])
+        return {
+            "Modified": {field: sorted(modified[field]) for field in fields if modified.get(field)},
+            "NotFound": {criterion: missing} if missing else {},
+            "Unprocessed": {},
+            "Timestamp": self._timestamp()
+        }
+        
+    # ==================== ОТЧЕТЫ ====================
+    
+    def report_period(self, params: Dict[str, Any]) -> Tuple[str, str]:
+        """Период отчета относительно текущего дня имитации"""
+        criteria = params.get("SelectionCriteria", {})
+        range_type = params.get("DateRangeType", "LAST_7_DAYS")
+        today = date.fromisoformat(self.today)
+        
+        if range_type == "CUSTOM_DATE":
+            return criteria["DateFrom"], criteria["DateTo"]
+        if range_type == "TODAY":
+            return self.today, self.today
+        if range_type == "YESTERDAY":
+            yesterday = (today - timedelta(days=1)).isoformat()
+            return yesterday, yesterday
+        if range_type == "ALL_TIME":
+            return "0000-00-00", self.today
+        if range_type.startswith("LAST_") and range_type.endswith("_DAYS"):
+            days = int(range_type[len("LAST_"):-len("_DAYS")])
+            return (today - timedelta(days=days)).isoformat(), (today - timedelta(days=1)).isoformat()
+        raise FakeApiError(4000, "Неверные параметры запроса", f"DateRangeType {range_type}")
+    
+    def report(self, params: Dict[str, Any]) -> List[str]:
+        """
+        Формирует TSV отчет (первая строка - названия столбцов)
+        
+        Строки статистики группируются по полям REPORT_DIMENSIONS,
+        которые есть в FieldNames; Ctr, AvgCpc, ConversionRate и
+        CostPerConversion рассчитываются по суммам.
+        """
+        fields = params["FieldNames"]
+        date_from, date_to = self.report_period(params)
+        
+        with self.lock:
+            self.calls["reports.get"] = self.calls.get("reports.get", 0) + 1
+            frame = self.account.stats_between(date_from, date_to)
+            names = {
+                campaign_id: campaign.get("Name", "")
+                for campaign_id, campaign in self.account.campaigns.items()
+            }
+            
+        for condition in params.get("SelectionCriteria", {}).get("Filter", []):
+            if condition.get("Operator") == "IN" and condition["Field"] in frame:
+                frame = frame.select(condition["Field"], [int(value) for value in condition["Values"]])
+                
+        dimensions = [field for field in fields if field in REPORT_DIMENSIONS]
+        if "CampaignName" in fields and "CampaignId" not in dimensions:
+            dimensions.append("CampaignId")
+            
+        columns = self._aggregate(frame, dimensions)
+        derived = derived_metrics(*(columns[metric] for metric in METRIC_COLUMNS))
+        columns.update({
+            "Ctr": derived["ctr"],
+            "AvgCpc": derived["cpc"],
+            "ConversionRate": derived["conversion_rate"],
+            "CostPerConversion": derived["cpa"]
+        })
+        if "CampaignName" in fields:
+            columns["CampaignName"] = [names.get(campaign_id, "") for campaign_id in columns["CampaignId"].tolist()]
+            
+        formatted = []
+        for field in fields:
+            values = columns.get(field)
+            if values is None:
+                formatted.append(["--"] * len(columns["Impressions"]))
+            elif isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.floating):
+                formatted.append([f"{value:.2f}" for value in values.tolist()])
+            else:
+                formatted.append([str(value) for value in (values.tolist() if isinstance(values, np.ndarray) else values)])
+                
+        return ["\t".join(fields)] + ["\t".join(row) for row in zip(*formatted)]
+    
+    @staticmethod
+    def _aggregate(frame: StatsFrame, dimensions: List[str]) -> Dict[str, np.ndarray]:
+        """Суммирует метрики по сочетаниям значений измерений"""
+        if len(frame) == 0:
+            return {field: np.zeros(0, dtype=np.int64) for field in [*dimensions, *METRIC_COLUMNS]}
+        
+        if not dimensions:
+            return {metric: np.asarray([frame.column(metric).sum()]) for metric in METRIC_COLUMNS}
+        
+        keys = np.column_stack([
+            frame["Date"].astype("datetime64[D]").astype(np.int64) if field == "Date" else frame[field]
+            for field in dimensions
+        ])
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        
+        columns = {}
+        for index, field in enumerate(dimensions):
+            values = unique[:, index]
+            columns[field] = np.datetime_as_string(values.astype("datetime64[D]")) if field == "Date" else values
+        for metric in METRIC_COLUMNS:
+            values = frame.column(metric)
+            sums = np.bincount(inverse, weights=values, minlength=len(unique))
+            columns[metric] = np.rint(sums).astype(np.int64) if np.issubdtype(values.dtype, np.integer) else sums
+        return columns
+
+
+class FakeDirectServer:
+    """
+    HTTP-сервер имитации API на локальном порту
+    
+    Принимает те же запросы, что и API Директа (JSON для сервисов, TSV
+    для reports), поэтому YandexDirectManager работает с ним без
+    изменений - достаточно указать base_url = server.url.
+    
+    Для нагрузочных проверок сервер добавляет задержку ответа и
+    случайные ошибки: временные (error_codes, по умолчанию 1000 -
+    внутренняя ошибка сервера) с вероятностью error_rate и превышение
+    лимита запросов (56) с вероятностью throttle_rate. При max_concurrent
+    запросы сверх лимита одновременных получают ошибку 506. При
+    report_pending отчеты формируются "в офлайн-режиме": на первые запросы
+    отчета сервер отвечает 201 и 202 с заголовком retryIn: 0.
+    """
+    
+    THROTTLE_ERROR = (56, "Превышен лимит запросов", "Превышено ограничение на частоту запросов к методу")
+    CONCURRENCY_ERROR = (506, "Превышен лимит подключений", "Превышено ограничение на количество одновременных запросов")
+    
+    def __init__(self,
+                 backend: FakeDirectBackend,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_codes: Sequence[int] = (1000,),
+                 throttle_rate: float = 0.0,
+                 max_concurrent: Optional[int] = None,
+                 report_pending: int = 0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            backend: Обработчик запросов
+            host: Адрес
+            port: Порт (0 - любой свободный)
+            latency: Задержка каждого ответа в секундах
+            latency_jitter: Случайная добавка к задержке (от 0 до значения)
+            error_rate: Доля запросов, завершающихся временной ошибкой
+            error_codes: Коды временных ошибок
+            throttle_rate: Доля запросов, получающих ошибку превышения лимита
+            max_concurrent: Лимит одновременных запросов (по умолчанию без лимита)
+            report_pending: Сколько запросов каждого отчета (по ReportName)
+                получают ответ "отчет формируется" до готового отчета
+            seed: Зерно генератора случайных ошибок и задержек
+        """
+        self.backend = backend
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.throttle_rate = throttle_rate
+        self.max_concurrent = max_concurrent
+        self.report_pending = report_pending
+        
+        # Количество ответов 201/202 по названиям отчетов
+        self._report_polls: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "throttled": 0,
+            "rejected": 0,
+            "report_polls": 0,
+            "max_in_flight": 0
+        }
+        
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        
+    @property
+    def url(self) -> str:
+        """Адрес для YandexDirectManager.base_url"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/json/v5"
+    
+    def _enter(self) -> Tuple[float, Optional[FakeApiError]]:
+        """
+        Регистрирует запрос и выбирает для него задержку и ошибку
+        
+        Returns:
+            (задержка в секундах, ошибка или None)
+        """
+        with self._lock:
+            self._in_flight += 1
+            self.stats["requests"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+            delay = self.latency + self._random.uniform(0, self.latency_jitter) if self.latency_jitter else self.latency
+            
+            if self.max_concurrent is not None and self._in_flight > self.max_concurrent:
+                self.stats["rejected"] += 1
+                return delay, FakeApiError(*self.CONCURRENCY_ERROR)
+            
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return delay, FakeApiError(*self.THROTTLE_ERROR)
+            if roll < self.throttle_rate + self.error_rate:
+                self.stats["errors"] += 1
+                code = self._random.choice(self.error_codes)
+                return delay, FakeApiError(code, "Внутренняя ошибка сервера", "Ошибка добавлена имитацией")
+            
+        return delay, None
+    
+    def _report_status(self, report_name: str) -> Optional[int]:
+        """
+        Статус "отчет формируется" для очередного запроса отчета
+        
+        Returns:
+            201 (отчет поставлен в очередь), 202 (формируется) или None,
+            если отчет готов
+        """
+        with self._lock:
+            polls = self._report_polls.get(report_name, 0)
+            if polls >= self.report_pending:
+                self._report_polls.pop(report_name, None)
+                return None
+            self._report_polls[report_name] = polls + 1
+            self.stats["report_polls"] += 1
+            return 201 if polls == 0 else 202
+        
+    def _leave(self):
+        with self._lock:
+            self._in_flight -= 1
+            
+    def _make_handler(self):
+        server = self
+        backend = self.backend
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def setup(self):
+                super().setup()
+                # Заголовки и тело уходят отдельными пакетами: без TCP_NODELAY
+                # второй ждет подтверждения первого (~40 мс на запрос)
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+                
+            def _send(self,
+                      status: int,
+                      body: bytes,
+                      content_type: str,
+                      units: Optional[str] = None,
+                      headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("RequestId", "fake")
+                if units:
+                    self.send_header("Units", units)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                
+            def _send_error(self, error: FakeApiError, status: int = 200):
+                body = json.dumps({"error": {**error.to_dict(), "request_id": "fake"}}, ensure_ascii=False)
+                self._send(status, body.encode("utf-8"), "application/json")
+                
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                service = self.path.rstrip("/").rsplit("/", 1)[-1]
+                
+                # Отчеты возвращают ошибки со статусом 400, сервисы - со статусом 200
+                error_status = 400 if service == "reports" else 200
+                
+                delay, injected = server._enter()
+                try:
+                    if delay:
+                        time.sleep(delay)
+                    if injected is not None:
+                        self._send_error(injected, error_status)
+                        return
+                    
+                    if service == "reports":
+                        status = server._report_status(body.get("params", {}).get("ReportName", ""))
+                        if status is not None:
+                            self._send(status, b"", "text/plain", headers={"retryIn": "0"})
+                            return
+                        lines = backend.report(body.get("params", {}))
+                        self._send(200, ("\n".join(lines) + "\n").encode("utf-8"), "text/tab-separated-values")
+                        return
+                    result, units = backend.execute(service, body.get("method"), body.get("params", {}))
+                    payload = json.dumps({"result": result}, ensure_ascii=False).encode("utf-8")
+                    self._send(200, payload, "application/json", units)
+                except FakeApiError as e:
+                    self._send_error(e, error_status)
+                except Exception as e:
+                    # Ошибка самой имитации: отвечаем 500, а не обрываем соединение
+                    logger.exception(f"Ошибка имитации API в {service}: {e}")
+                    self._send_error(FakeApiError(1000, "Внутренняя ошибка сервера", str(e)), 500)
+                finally:
+                    server._leave()
+                    
+        return Handler
+    
+    def start(self) -> "FakeDirectServer":
+        """Запускает сервер в фоновом потоке"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Останавливает сервер"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,335 @@
+"""
+Граф объектов аккаунта Яндекс.Директ в памяти
+Индексы по Id, связи кампания → группа → объявления и ключевые слова, индексы по Status и Type
+"""
+
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Union
+import logging
+
+from yandex_direct_models import Entity, Campaign, AdGroup, Ad, Keyword, MODELS
+
+logger = logging.getLogger(__name__)
+
+
+class AccountGraph:
+    """
+    Объекты аккаунта с индексами для выборок без перебора списков
+    
+    Объекты хранятся в словарях по Id (graph.campaigns[campaign_id]).
+    Для каждой кампании и группы хранятся Id дочерних объектов, для
+    полей INDEXED_FIELDS - Id объектов с каждым значением. Выборка по
+    Id, родителю или значению поля стоит O(k) от размера результата,
+    а не O(n) от размера аккаунта.
+    
+    Дочерние объекты связываются с родителями по CampaignId и AdGroupId
+    и могут добавляться раньше родителей.
+    """
+    
+    SERVICES = ("campaigns", "adgroups", "ads", "keywords")
+    
+    # Поля вторичных индексов
+    INDEXED_FIELDS = ("Status", "Type")
+    
+    # Поле с ID родителя для свертки на уровень кампаний или групп
+    PARENT_FIELDS = {
+        "campaigns": "CampaignId",
+        "adgroups": "AdGroupId"
+    }
+    
+    def __init__(self,
+                 campaigns: Iterable[Campaign] = (),
+                 ad_groups: Iterable[AdGroup] = (),
+                 ads: Iterable[Ad] = (),
+                 keywords: Iterable[Keyword] = ()):
+        """
+        Args:
+            campaigns: Кампании
+            ad_groups: Группы объявлений
+            ads: Объявления
+            keywords: Ключевые слова
+        """
+        self.entities: Dict[str, Dict[int, Entity]] = {service: {} for service in self.SERVICES}
+        self.campaigns = self.entities["campaigns"]
+        self.ad_groups = self.entities["adgroups"]
+        self.ads = self.entities["ads"]
+        self.keywords = self.entities["keywords"]
+        
+        # Связи родитель → дети: {сервис детей: {ID родителя: {ID ребенка: None}}}
+        # (словари вместо множеств сохраняют порядок добавления)
+        self._by_campaign: Dict[str, Dict[int, Dict[int, None]]] = {
+            service: {} for service in ("adgroups", "ads", "keywords")
+        }
+        self._by_ad_group: Dict[str, Dict[int, Dict[int, None]]] = {
+            service: {} for service in ("ads", "keywords")
+        }
+        
+        # Вторичные индексы: {сервис: {поле: {значение: {ID: None}}}}
+        self._indexes: Dict[str, Dict[str, Dict[Any, Dict[int, None]]]] = {
+            service: {field: {} for field in self.INDEXED_FIELDS} for service in self.SERVICES
+        }
+        
+        self.add_many("campaigns", campaigns)
+        self.add_many("adgroups", ad_groups)
+        self.add_many("ads", ads)
+        self.add_many("keywords", keywords)
+        
+    @classmethod
+    def from_manager(cls, manager, campaign_ids: Optional[List[int]] = None) -> "AccountGraph":
+        """
+        Загружает объекты аккаунта через API
+        
+        Args:
+            manager: Экземпляр YandexDirectManager
+            campaign_ids: Кампании (по умолчанию все)
+            
+        Returns:
+            Граф аккаунта
+        """
+        graph = cls(campaigns=manager.iter_campaigns(campaign_ids=campaign_ids))
+        campaign_ids = list(graph.campaigns)
+        if campaign_ids:
+            # Дочерние объекты запрашиваются пачками кампаний, а не по одной
+            graph.add_many("adgroups", manager.iter_ad_groups(campaign_ids=campaign_ids))
+            graph.add_many("ads", manager.iter_ads(campaign_ids=campaign_ids))
+            graph.add_many("keywords", manager.iter_keywords(campaign_ids=campaign_ids))
+        return graph
+    
+    @classmethod
+    def from_mirror(cls, mirror) -> "AccountGraph":
+        """
+        Строит граф по локальному зеркалу аккаунта (без запросов к API)
+        
+        Args:
+            mirror: AccountMirror
+            
+        Returns:
+            Граф аккаунта
+        """
+        return cls(
+            campaigns=mirror.campaigns(),
+            ad_groups=mirror.ad_groups(),
+            ads=mirror.ads(),
+            keywords=mirror.keywords()
+        )
+        
+    # ==================== ИЗМЕНЕНИЕ ====================
+    
+    def add(self, service: str, item: Union[Entity, Dict[str, Any]]) -> Entity:
+        """
+        Добавляет объект или заменяет объект с тем же Id
+        
+        Args:
+            service: campaigns, adgroups, ads или keywords
+            item: Модель или словарь из ответа API
+            
+        Returns:
+            Добавленная модель
+        """
+        if not isinstance(item, Entity):
+            item = MODELS[service].from_dict(item)
+        object_id = item["Id"]
+        if object_id in self.entities[service]:
+            self._unlink(service, object_id)
+            
+        self.entities[service][object_id] = item
+        
+        if service != "campaigns":
+            campaign_id = item.get("CampaignId")
+            if campaign_id is not None:
+                self._by_campaign[service].setdefault(campaign_id, {})[object_id] = None
+        if service in self._by_ad_group:
+            ad_group_id = item.get("AdGroupId")
+            if ad_group_id is not None:
+                self._by_ad_group[service].setdefault(ad_group_id, {})[object_id] = None
+                
+        for field, index in self._indexes[service].items():
+            value = item.get(field)
+            if value is not None:
+                index.setdefault(value, {})[object_id] = None
+        return item
+    
+    def add_many(self, service: str, items: Iterable[Union[Entity, Dict[str, Any]]]) -> int:
+        """Добавляет объекты сервиса; возвращает их количество"""
+        count = 0
+        for item in items:
+            self.add(service, item)
+            count += 1
+        return count
+    
+    def remove(self, service: str, object_id: int) -> Optional[Entity]:
+        """
+        Удаляет объект вместе с дочерними объектами
+        
+        Args:
+            service: Сервис объекта
+            object_id: ID объекта
+            
+        Returns:
+            Удаленный объект или None, если его не было
+        """
+        if service == "campaigns":
+            for child_service, children in self._by_campaign.items():
+                for child_id in list(children.get(object_id, ())):
+                    self.remove(child_service, child_id)
+        elif service == "adgroups":
+            for child_service, children in self._by_ad_group.items():
+                for child_id in list(children.get(object_id, ())):
+                    self.remove(child_service, child_id)
+                    
+        if object_id not in self.entities[service]:
+            return None
+        self._unlink(service, object_id)
+        return self.entities[service].pop(object_id)
+    
+    def _unlink(self, service: str, object_id: int):
+        """Удаляет объект из связей и вторичных индексов"""
+        item = self.entities[service][object_id]
+        
+        if service != "campaigns":
+            self._discard(self._by_campaign[service], item.get("CampaignId"), object_id)
+        if service in self._by_ad_group:
+            self._discard(self._by_ad_group[service], item.get("AdGroupId"), object_id)
+        for field, index in self._indexes[service].items():
+            self._discard(index, item.get(field), object_id)
+            
+    @staticmethod
+    def _discard(index: Dict[Any, Dict[int, None]], key: Any, object_id: int):
+        ids = index.get(key)
+        if ids is None:
+            return
+        ids.pop(object_id, None)
+        if not ids:
+            del index[key]
+            
+    # ==================== ВЫБОРКИ ====================
+    
+    def get(self, service: str, object_id: int) -> Optional[Entity]:
+        """Объект сервиса по ID"""
+        return self.entities[service].get(object_id)
+    
+    def children(self,
+                 service: str,
+                 campaign_id: Optional[int] = None,
+                 ad_group_id: Optional[int] = None) -> List[Entity]:
+        """
+        Дочерние объекты кампании или группы
+        
+        Args:
+            service: adgroups, ads или keywords
+            campaign_id: ID кампании
+            ad_group_id: ID группы (вместо campaign_id)
+            
+        Returns:
+            Объекты в порядке добавления
+        """
+        if ad_group_id is not None:
+            ids = self._by_ad_group[service].get(ad_group_id, {})
+        else:
+            ids = self._by_campaign[service].get(campaign_id, {})
+        entities = self.entities[service]
+        return [entities[object_id] for object_id in ids]
+    
+    def parent(self, service: str, object_id: int) -> Optional[Entity]:
+        """Родитель объекта: кампания группы, группа объявления или ключевого слова"""
+        item = self.entities[service].get(object_id)
+        if item is None or service == "campaigns":
+            return None
+        if service == "adgroups":
+            return self.campaigns.get(item.get("CampaignId"))
+        return self.ad_groups.get(item.get("AdGroupId"))
+    
+    def select(self,
+               service: str,
+               ids: Optional[Iterable[int]] = None,
+               campaign_id: Optional[int] = None,
+               ad_group_id: Optional[int] = None,
+               **filters) -> List[Entity]:
+        """
+        Выборка объектов по индексам
+        
+        Условия объединяются через И. Перебирается самое короткое из
+        подходящих множеств Id, остальные условия проверяются поиском
+        в словарях.
+        
+        Args:
+            service: Сервис
+            ids: Список ID (результат в порядке списка, отсутствующие пропускаются)
+            campaign_id: ID кампании
+            ad_group_id: ID группы
+            **filters: Значения полей INDEXED_FIELDS, например Status="ACCEPTED"
+            
+        Returns:
+            Объекты
+        """
+        unknown = set(filters) - set(self.INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Нет индекса по полям: {', '.join(sorted(unknown))}")
+        
+        entities = self.entities[service]
+        candidates = [entities]
+        if ids is not None:
+            candidates.append(dict.fromkeys(ids))
+        if campaign_id is not None:
+            candidates.append(
+                {campaign_id: None} if service == "campaigns"
+                else self._by_campaign[service].get(campaign_id, {})
+            )
+        if ad_group_id is not None:
+            candidates.append(
+                {ad_group_id: None} if service == "adgroups"
+                else self._by_ad_group.get(service, {}).get(ad_group_id, {})
+            )
+        for field, value in filters.items():
+            candidates.append(self._indexes[service][field].get(value, {}))
+            
+        # Список ID задает порядок результата, иначе перебирается самое короткое множество
+        driver = candidates[1] if ids is not None else min(candidates, key=len)
+        others = [candidate for candidate in candidates if candidate is not driver]
+        return [
+            entities[object_id]
+            for object_id in driver
+            if all(object_id in candidate for candidate in others)
+        ]
+        
+    def values(self, service: str, field: str) -> List[Any]:
+        """Значения поля с индексом (например, все статусы кампаний)"""
+        return list(self._indexes[service][field])
+    
+    def rollup(self,
+               service: str,
+               values: Dict[int, Dict[str, float]],
+               level: str = "campaigns") -> Dict[int, Dict[str, float]]:
+        """
+        Суммирует метрики объектов на уровень кампаний или групп
+        
+        Args:
+            service: Сервис объектов в values (adgroups, ads, keywords)
+            values: {ID объекта: {метрика: значение}}
+            level: campaigns или adgroups
+            
+        Returns:
+            {ID родителя: {метрика: сумма}}; объекты, которых нет в графе,
+            пропускаются
+        """
+        parent_field = self.PARENT_FIELDS[level]
+        entities = self.entities[service]
+        totals: Dict[int, Dict[str, float]] = {}
+        for object_id, metrics in values.items():
+            item = entities.get(object_id)
+            if item is None:
+                continue
+            parent_totals = totals.setdefault(item.get(parent_field), {})
+            for metric, value in metrics.items():
+                parent_totals[metric] = parent_totals.get(metric, 0) + value
+        return totals
+    
+    def counts(self) -> Dict[str, int]:
+        """Количество объектов по сервисам"""
+        return {service: len(entities) for service, entities in self.entities.items()}
+    
+    def __iter__(self) -> Iterator[Entity]:
+        for entities in self.entities.values():
+            yield from entities.values()
+            
+    def __len__(self) -> int:
+        return sum(len(entities) for entities in self.entities.values())
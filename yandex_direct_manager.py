@@ -4,11 +4,32 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 import json
 import time
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import functools
+import itertools
+import hashlib
+import socket
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple, Union
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from yandex_direct_ratelimit import UnitsRateLimiter
+from yandex_direct_retry import RetryPolicy, RetryBudget
+from yandex_direct_reports import TSVReportReader, build_report_definition, new_column
+from yandex_direct_cache import ResponseCache
+from yandex_direct_plan import MutationPlan
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS
+from yandex_direct_metrics import MetricsRegistry, traced
+from yandex_direct_codec import JSONCodec, get_codec, decode_page
+from yandex_direct_models import Entity, Campaign, AdGroup, Ad, Keyword, MODELS
 
 # Настройка логирования
 logging.basicConfig(
@@ -18,6 +39,207 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class YandexDirectAPIError(Exception):
+    """Ошибка, возвращенная API Яндекс.Директ"""
+    
+    # Коды ошибок превышения лимитов: баллы, частота и одновременность запросов
+    THROTTLING_ERROR_CODES = {56, 152, 506}
+    UNITS_EXHAUSTED_ERROR_CODE = 152
+    
+    def __init__(self, error: Dict[str, Any], http_status: Optional[int] = None):
+        """
+        Args:
+            error: Объект error из ответа API
+            http_status: HTTP статус ответа
+        """
+        self.error = error
+        self.http_status = http_status
+        try:
+            self.error_code = int(error.get("error_code", 0))
+        except (TypeError, ValueError):
+            self.error_code = 0
+        self.error_string = error.get("error_string")
+        self.error_detail = error.get("error_detail")
+        self.request_id = error.get("request_id")
+        super().__init__(f"API Error: {error}")
+    
+    @property
+    def is_throttling(self) -> bool:
+        """Ошибка превышения лимитов API"""
+        return self.error_code in self.THROTTLING_ERROR_CODES or self.http_status == 429
+    
+    @property
+    def units_exhausted(self) -> bool:
+        """Закончились баллы"""
+        return self.error_code == self.UNITS_EXHAUSTED_ERROR_CODE
+
+
+# Состояние текущего запроса: соединение открывается в потоке, отправляющем
+# запрос, поэтому открытые им сокеты (opened) и время установки соединения
+# (timings: dns, connect, tls - если включены метрики) хранятся по потокам
+_transport_state = threading.local()
+
+# Счетчики открытых сокетов пулов общие для потоков одного адаптера
+_sockets_lock = threading.Lock()
+
+# Исходная функция разрешения имен (до установки _timed_getaddrinfo)
+_resolve = socket.getaddrinfo
+_resolver_lock = threading.Lock()
+
+
+def _timed_getaddrinfo(*args, **kwargs):
+    """socket.getaddrinfo, добавляющий время разрешения имени к метрикам запроса потока"""
+    timings = getattr(_transport_state, "timings", None)
+    if timings is None:
+        return _resolve(*args, **kwargs)
+    
+    started = time.perf_counter()
+    try:
+        return _resolve(*args, **kwargs)
+    finally:
+        timings["dns"] = timings.get("dns", 0.0) + time.perf_counter() - started
+
+
+def _install_resolver_hook():
+    """
+    Подменяет socket.getaddrinfo замеряющей оберткой (один раз на процесс)
+    
+    urllib3 разрешает имя внутри create_connection, поэтому отдельно DNS
+    можно замерить только на уровне socket. Вне запросов менеджеров с
+    метриками обертка просто вызывает исходную функцию.
+    """
+    global _resolve
+    with _resolver_lock:
+        if socket.getaddrinfo is not _timed_getaddrinfo:
+            _resolve = socket.getaddrinfo
+            socket.getaddrinfo = _timed_getaddrinfo
+
+
+def _open_socket(conn: HTTPConnection, new_conn) -> socket.socket:
+    """
+    Открывает сокет соединения, замеряя подключение
+    
+    Подключение выполняет urllib3 (с перебором адресов), метрики не
+    меняют его способ. Время разрешения имени записывает
+    _timed_getaddrinfo в фазу dns, connect - остальное время (TCP).
+    """
+    timings = getattr(_transport_state, "timings", None)
+    if timings is None:
+        sock = new_conn()
+    else:
+        started = time.perf_counter()
+        resolved = timings.get("dns", 0.0)
+        try:
+            sock = new_conn()
+        finally:
+            resolving = timings.get("dns", 0.0) - resolved
+            timings["connect"] = timings.get("connect", 0.0) + time.perf_counter() - started - resolving
+            
+    _transport_state.opened = getattr(_transport_state, "opened", 0) + 1
+    if conn.pool_ref is not None:
+        with _sockets_lock:
+            conn.pool_ref.opened_sockets += 1
+    return sock
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    """Соединение, сообщающее пулу об открытии нового сокета"""
+    
+    pool_ref = None
+    
+    def _new_conn(self):
+        return _open_socket(self, super()._new_conn)
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    """HTTPS соединение, сообщающее пулу об открытии нового сокета"""
+    
+    pool_ref = None
+    
+    def _new_conn(self):
+        return _open_socket(self, super()._new_conn)
+    
+    def connect(self):
+        timings = getattr(_transport_state, "timings", None)
+        if timings is None:
+            return super().connect()
+        
+        started = time.perf_counter()
+        opened = timings.get("dns", 0.0) + timings.get("connect", 0.0)
+        super().connect()
+        # TLS - все время подключения, кроме DNS и TCP
+        opening = timings.get("dns", 0.0) + timings.get("connect", 0.0) - opened
+        timings["tls"] = timings.get("tls", 0.0) + time.perf_counter() - started - opening
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    """Пул, считающий реально открытые сокеты (включая переподключения)"""
+    
+    ConnectionCls = _CountingHTTPConnection
+    opened_sockets = 0
+    
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.pool_ref = self
+        return conn
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS пул, считающий реально открытые сокеты"""
+    
+    ConnectionCls = _CountingHTTPSConnection
+    opened_sockets = 0
+    
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.pool_ref = self
+        return conn
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter с учетом открытых сокетов для статистики пула"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool
+        }
+    
+    def opened_sockets(self) -> int:
+        """Количество сокетов, открытых всеми пулами адаптера"""
+        pools = self.poolmanager.pools
+        total = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.opened_sockets
+        return total
+
+
+STATISTICS_METRICS = METRIC_COLUMNS
+
+
+def aggregate_statistics(stats: Iterable[Dict[str, Any]],
+                         group_by: str = "CampaignId",
+                         metrics: Iterable[str] = STATISTICS_METRICS) -> Dict[Any, Dict[str, Any]]:
+    """
+    Суммирует строки статистики по ключу
+    
+    Args:
+        stats: Строки статистики
+        group_by: Поле группировки
+        metrics: Суммируемые поля
+        
+    Returns:
+        Словарь {значение ключа: {поле: сумма}}; для полного набора
+        STATISTICS_METRICS также ctr, cpc, cpa и conversion_rate
+    """
+    metrics = tuple(metrics)
+    frame = StatsFrame.from_rows(stats, fields=[group_by, *metrics])
+    return frame.group_by(group_by, metrics).to_dict(group_by)
+
+
 class YandexDirectManager:
     """Менеджер для работы с API Яндекс.Директ"""
     
@@ -25,58 +247,515 @@ class YandexDirectManager:
     API_BASE_URL = "https://api.direct.yandex.com/json/v5"
     SANDBOX_URL = "https://api-sandbox.direct.yandex.com/json/v5"
     
-    def __init__(self, access_token: str, use_sandbox: bool = False):
+    # Максимальное количество ключевых слов в одном запросе keywords.update
+    MAX_KEYWORDS_PER_UPDATE = 10000
+    
+    # Максимальное количество кампаний в одном запросе campaigns.update
+    MAX_CAMPAIGNS_PER_UPDATE = 1000
+    
+    # Максимальное количество кампаний в фильтре keywords.get, adgroups.get и ads.get
+    MAX_CAMPAIGNS_PER_KEYWORDS_GET = 10
+    
+    # Максимальное количество ID в одном запросе changes.check
+    MAX_IDS_PER_CHANGES_CHECK = 3000
+    
+    # Ключи списков объектов в ответах get
+    ENTITY_RESULT_KEYS = {
+        "campaigns": "Campaigns",
+        "adgroups": "AdGroups",
+        "ads": "Ads",
+        "keywords": "Keywords"
+    }
+    
+    # Поля отчета по умолчанию
+    DEFAULT_STATISTICS_FIELDS = [
+        "Date", "CampaignId", "CampaignName", "Impressions",
+        "Clicks", "Cost", "Conversions", "ConversionRate"
+    ]
+    
+    # Заголовки запросов к сервису reports
+    REPORT_HEADERS = {
+        "processingMode": "auto",
+        "returnMoneyInMicros": "false",
+        "skipReportHeader": "true",
+        "skipReportSummary": "true"
+    }
+    
+    # Интервал и предельное время ожидания офлайн-отчета (в секундах)
+    REPORT_POLL_INTERVAL = 10
+    REPORT_POLL_TIMEOUT = 3600
+    
+    # Периоды отчетов, включающие текущий день (статистика еще меняется)
+    REALTIME_DATE_RANGES = {
+        "TODAY", "ALL_TIME", "AUTO", "THIS_MONTH",
+        "THIS_WEEK_MON_TODAY", "THIS_WEEK_SUN_TODAY"
+    }
+    
+    # Методы API, изменяющие данные
+    MUTATING_METHODS = {"add", "update", "delete", "suspend", "resume", "archive", "unarchive", "set"}
+    
+    def __init__(self,
+                 access_token: str,
+                 use_sandbox: bool = False,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 keep_alive: bool = True,
+                 rate_limiter: Optional[UnitsRateLimiter] = None,
+                 max_throttle_wait: float = 600,
+                 request_timeout: float = 30,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 cache: Optional[ResponseCache] = None,
+                 client_login: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 codec: Optional[JSONCodec] = None,
+                 lazy_pages: bool = False):
         """
         Инициализация менеджера
         
         Args:
             access_token: OAuth токен для доступа к API
             use_sandbox: Использовать sandbox окружение для тестирования
+            pool_connections: Количество хостов, для которых кэшируются пулы соединений
+            pool_maxsize: Максимум соединений в пуле на один хост
+            pool_block: Ждать свободное соединение вместо открытия лишнего
+            keep_alive: Переиспользовать TCP/TLS соединения между запросами
+            rate_limiter: Планировщик запросов по баллам (по умолчанию создается новый)
+            max_throttle_wait: Сколько секунд ждать в очереди после ответов
+                о превышении лимитов, прежде чем вернуть ошибку
+            request_timeout: Таймаут одного запроса в секундах
+            retry_policy: Политика повторов при временных ошибках
+            cache: Кэш ответов на запросы чтения (по умолчанию не используется)
+            client_login: Логин клиента для агентского токена (заголовок Client-Login)
+            metrics: Метрики запросов: время фаз, размеры, баллы, повторы
+                (по умолчанию не собираются)
+            codec: Кодек JSON запросов и ответов (по умолчанию orjson,
+                если установлен, иначе стандартный json)
+            lazy_pages: Разбирать объекты страниц get по одному при переборе
+                (без кэша ответов): меньше памяти на больших страницах
         """
         self.access_token = access_token
         self.base_url = self.SANDBOX_URL if use_sandbox else self.API_BASE_URL
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "Accept-Language": "ru",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Connection": "keep-alive" if keep_alive else "close"
         }
+        
+        # Запросы агентства от имени клиента
+        self.client_login = client_login
+        if client_login:
+            self.headers["Client-Login"] = client_login
         self.request_id = 0
+        self._lock = threading.Lock()
+        
+        # Пул соединений, общий для всех методов менеджера
+        self.adapter = PooledHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.pool_stats = {"requests": 0, "hits": 0, "misses": 0}
+        
+        self.rate_limiter = rate_limiter if rate_limiter is not None else UnitsRateLimiter()
+        self.max_throttle_wait = max_throttle_wait
+        
+        self.request_timeout = request_timeout
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_budget: Optional[RetryBudget] = None
+        self.retry_stats = {"retries": 0, "budget_exhausted": 0}
+        
+        # Записи кэша разделяются по адресу API, токену и клиенту
+        self.cache = cache
+        token_hash = hashlib.sha1(str(access_token).encode("utf-8")).hexdigest()[:16]
+        self.cache_namespace = f"{self.base_url}#{token_hash}#{client_login or ''}"
+    
+        self.metrics = metrics
+        if metrics is not None:
+            _install_resolver_hook()
+            
+        self.codec = codec if codec is not None else get_codec()
+        self.lazy_pages = lazy_pages
+        
+    def close(self):
+        """Закрывает все соединения пула"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает счетчики использования пула соединений
+        
+        Returns:
+            Словарь с количеством запросов, переиспользований (hits),
+            новых соединений (misses) и долей переиспользования
+        """
+        stats = dict(self.pool_stats)
+        stats["hit_rate"] = (
+            stats["hits"] / stats["requests"] if stats["requests"] > 0 else 0.0
+        )
+        return stats
+    
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает счетчики кэша ответов
+        
+        Returns:
+            Словарь с попаданиями, промахами и долей попаданий (hit_rate)
+            или None, если кэш не используется
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get_stats()
+    
+    def get_request_metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает метрики запросов
+        
+        Returns:
+            Гистограммы, счетчики и блоки трассировки (MetricsRegistry.to_dict)
+            или None, если метрики не собираются
+        """
+        if self.metrics is None:
+            return None
+        return self.metrics.to_dict()
+    
+    def _cached(self, service: str, params: Dict[str, Any], load) -> Any:
+        """
+        Возвращает ответ из кэша или загружает и сохраняет его
+        
+        Args:
+            service: Сервис API (определяет время жизни записи)
+            params: Параметры запроса
+            load: Функция без аргументов, загружающая ответ
+            
+        Returns:
+            Ответ
+        """
+        key = self.cache.make_key(self.cache_namespace, service, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"Ответ {service} взят из кэша")
+            return cached
+        
+        result = load()
+        self.cache.set(key, service, result)
+        return result
+    
+    def _count_pool_usage(self, reused: bool):
+        """Учитывает, было ли соединение переиспользовано из пула"""
+        with self._lock:
+            self.pool_stats["requests"] += 1
+            self.pool_stats["hits" if reused else "misses"] += 1
         
     def _generate_request_id(self) -> str:
         """Генерирует уникальный ID для запроса"""
-        self.request_id += 1
-        return f"{datetime.now().timestamp()}-{self.request_id}"
+        with self._lock:
+            self.request_id += 1
+            request_id = self.request_id
+        return f"{datetime.now().timestamp()}-{request_id}"
+    
+    @contextmanager
+    def retry_budget_scope(self, max_retries: int):
+        """
+        Ограничивает общее количество повторов в рамках одного задания
+        
+        Args:
+            max_retries: Максимум повторов для всех запросов задания
+        """
+        previous = self.retry_budget
+        self.retry_budget = RetryBudget(max_retries)
+        try:
+            yield self.retry_budget
+        finally:
+            self.retry_budget = previous
+    
+    def _should_retry(self, error: Exception, api_method: Optional[str], attempt: int) -> bool:
+        """Решает, повторять ли запрос после ошибки"""
+        if attempt >= self.retry_policy.max_attempts:
+            return False
+        
+        idempotent = self.retry_policy.is_idempotent(api_method)
+        if not self.retry_policy.is_retryable(error, idempotent):
+            if not idempotent and self.retry_policy.is_retryable(error, True):
+                logger.error(f"Результат неидемпотентного запроса {api_method} неизвестен, повтор не выполняется")
+            return False
+        
+        budget = self.retry_budget
+        if budget is not None and not budget.try_spend():
+            with self._lock:
+                self.retry_stats["budget_exhausted"] += 1
+            logger.error("Бюджет повторов задания исчерпан")
+            return False
+        
+        return True
+    
+    def _request_priority(self, method: str, params: Dict[str, Any]) -> int:
+        """
+        Определяет приоритет запроса в очереди планировщика
+        
+        Изменения (ставки, статусы) идут первыми, отчеты - последними.
+        """
+        if params.get("method") in self.MUTATING_METHODS:
+            return UnitsRateLimiter.PRIORITY_HIGH
+        if method == "reports":
+            return UnitsRateLimiter.PRIORITY_LOW
+        return UnitsRateLimiter.PRIORITY_NORMAL
     
-    def _make_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _make_request(self,
+                      method: str,
+                      params: Dict[str, Any],
+                      priority: Optional[int] = None,
+                      decode=None) -> Dict[str, Any]:
         """
         Выполняет запрос к API
         
+        Запрос ждет своей очереди в планировщике баллов. Если API отвечает
+        ошибкой превышения лимитов, запрос возвращается в очередь. Временные
+        ошибки (таймауты, 5xx, недоступность сервиса) повторяются по
+        retry_policy с экспоненциальной задержкой. При включенном кэше
+        ответы на get берутся из кэша, а изменяющие методы сбрасывают
+        записи своего сервиса.
+        
         Args:
             method: Название метода API
             params: Параметры запроса
+            priority: Приоритет в очереди (по умолчанию по типу операции)
+            decode: Функция разбора тела ответа (по умолчанию codec.loads)
             
         Returns:
             Ответ от API
         """
+        api_method = params.get("method")
+        operation = f"{method}.{api_method or ''}"
+        if priority is None:
+            priority = self._request_priority(method, params)
+        
+        execute = functools.partial(
+            self._execute,
+            operation,
+            priority,
+            api_method,
+            functools.partial(self._send_request, method, params, operation, decode)
+        )
+        
+        if self.cache is None:
+            return execute()
+        
+        if api_method == "get":
+            return self._cached(method, params, execute)
+        
+        if api_method in self.MUTATING_METHODS:
+            try:
+                return execute()
+            finally:
+                # Изменение могло примениться даже при ошибке ответа
+                self.cache.invalidate([method])
+        
+        return execute()
+    
+    def _execute(self, operation: str, priority: int, api_method: Optional[str], send):
+        """
+        Выполняет отправку через планировщик баллов с повторами
+        
+        Args:
+            operation: Операция вида "campaigns.get"
+            priority: Приоритет в очереди планировщика
+            api_method: Метод API (get, add, update...) для проверки идемпотентности
+            send: Функция без аргументов, отправляющая запрос
+            
+        Returns:
+            Результат send()
+        """
+        throttled_wait = 0.0
+        attempt = 0
+        
+        while True:
+            throttled_wait += self.rate_limiter.acquire(operation, priority)
+            
+            try:
+                return send()
+            except YandexDirectAPIError as e:
+                if e.is_throttling and throttled_wait <= self.max_throttle_wait:
+                    logger.warning(f"Превышен лимит API для {operation}, запрос поставлен в очередь: {e.error_string}")
+                    if self.metrics is not None:
+                        self.metrics.inc("yandex_direct_throttled_total", operation=operation)
+                    self.rate_limiter.throttle(units_exhausted=e.units_exhausted)
+                    continue
+                error = e
+            except requests.exceptions.RequestException as e:
+                error = e
+            
+            if not self._should_retry(error, api_method, attempt):
+                raise error
+            
+            delay = self.retry_policy.get_delay(attempt)
+            attempt += 1
+            with self._lock:
+                self.retry_stats["retries"] += 1
+            if self.metrics is not None:
+                self.metrics.inc("yandex_direct_retries_total", operation=operation)
+            logger.warning(
+                f"Временная ошибка {operation}: {error}. "
+                f"Повтор {attempt}/{self.retry_policy.max_attempts} через {delay:.1f} с"
+            )
+            time.sleep(delay)
+    
+    def _post(self,
+              method: str,
+              params: Dict[str, Any],
+              operation: str,
+              extra_headers: Optional[Dict[str, str]] = None,
+              stream: bool = False) -> requests.Response:
+        """
+        Отправляет POST запрос через пул соединений
+        
+        Args:
+            method: Название метода API
+            params: Тело запроса
+            operation: Операция вида "campaigns.get" для учета баллов
+            extra_headers: Дополнительные заголовки
+            stream: Не читать тело ответа сразу
+            
+        Returns:
+            HTTP ответ
+        """
         url = f"{self.base_url}/{method}"
         headers = self.headers.copy()
         headers["X-Request-Id"] = self._generate_request_id()
+        if extra_headers:
+            headers.update(extra_headers)
         
+        logger.info(f"Запрос к методу: {method}")
+        timings = {} if self.metrics is not None else None
+        _transport_state.timings = timings
+        _transport_state.opened = 0
+        started = time.perf_counter()
         try:
-            logger.info(f"Запрос к методу: {method}")
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers=headers,
-                json=params,
-                timeout=30
+                data=self.codec.dumps(params),
+                timeout=self.request_timeout,
+                stream=stream
             )
+        except requests.exceptions.RequestException:
+            if timings is not None:
+                self._record_request_metrics(operation, started, timings)
+            raise
+        finally:
+            _transport_state.timings = None
+        # Новые сокеты этого запроса; сокеты других потоков не учитываются
+        self._count_pool_usage(_transport_state.opened == 0)
+        self.rate_limiter.update_from_headers(operation, response.headers)
+        if timings is not None:
+            self._record_request_metrics(operation, started, timings, response, stream)
+        
+        if response.status_code == 429:
+            response.close()
+            raise YandexDirectAPIError(
+                {"error_string": "Too Many Requests"},
+                http_status=response.status_code
+            )
+        
+        return response
+    
+    def _record_request_metrics(self,
+                                operation: str,
+                                started: float,
+                                timings: Dict[str, float],
+                                response: Optional[requests.Response] = None,
+                                stream: bool = False):
+        """
+        Записывает время фаз, размеры и баллы отправленного запроса
+        
+        Сервер - время до получения заголовков ответа без установки
+        соединения, загрузка - чтение тела (для потоковых ответов отчетов
+        не входит: тело читается при разборе отчета).
+        
+        Args:
+            operation: Операция вида "campaigns.get"
+            started: Время начала отправки (time.perf_counter)
+            timings: Время установки соединения (dns, connect, tls)
+            response: Ответ или None, если запрос завершился исключением
+            stream: Тело ответа еще не прочитано
+        """
+        total = time.perf_counter() - started
+        phases = dict(timings)
+        phases["total"] = total
+        
+        if response is None:
+            self.metrics.record_request(operation, phases, "error")
+            return
+        
+        opening = sum(phases.get(phase, 0.0) for phase in ("dns", "connect", "tls"))
+        elapsed = response.elapsed.total_seconds()
+        phases["server"] = max(elapsed - opening, 0.0)
+        if not stream:
+            phases["download"] = max(total - elapsed, 0.0)
+            response_bytes = len(response.content)
+        else:
+            length = response.headers.get("Content-Length")
+            response_bytes = int(length) if length and length.isdigit() else None
+            
+        units = UnitsRateLimiter.parse_units_header(response.headers.get("Units"))
+        body = response.request.body
+        self.metrics.record_request(
+            operation,
+            phases,
+            str(response.status_code),
+            request_bytes=len(body) if body else 0,
+            response_bytes=response_bytes,
+            units=units[0] if units else None
+        )
+    
+    def _send_request(self,
+                      method: str,
+                      params: Dict[str, Any],
+                      operation: str,
+                      decode=None) -> Dict[str, Any]:
+        """
+        Отправляет один запрос к API
+        
+        Args:
+            method: Название метода API
+            params: Параметры запроса
+            operation: Операция вида "campaigns.get" для учета баллов
+            decode: Функция разбора тела ответа (по умолчанию codec.loads)
+            
+        Returns:
+            Ответ от API
+        """
+        try:
+            response = self._post(method, params, operation)
             response.raise_for_status()
             
-            result = response.json()
+            parse_started = time.perf_counter()
+            result = (decode or self.codec.loads)(response.content)
+            if self.metrics is not None:
+                self.metrics.observe(
+                    "yandex_direct_request_duration_seconds",
+                    time.perf_counter() - parse_started,
+                    operation=operation,
+                    phase="parse"
+                )
             
             if "error" in result:
                 logger.error(f"Ошибка API: {result['error']}")
-                raise Exception(f"API Error: {result['error']}")
+                error = YandexDirectAPIError(result["error"], http_status=response.status_code)
+                if self.metrics is not None:
+                    self.metrics.inc("yandex_direct_api_errors_total", operation=operation, code=error.error_code)
+                raise error
             
             logger.info(f"Успешный ответ от {method}")
             return result
@@ -85,40 +764,133 @@ class YandexDirectManager:
             logger.error(f"Ошибка при запросе: {e}")
             raise
     
+    def _fetch_page(self,
+                    service: str,
+                    result_key: str,
+                    selection_criteria: Dict[str, Any],
+                    fields: List[str],
+                    page_size: int,
+                    offset: int) -> Tuple[Iterable[Entity], Optional[int]]:
+        """
+        Загружает одну страницу объектов
+        
+        Returns:
+            Объекты страницы (модели сервиса из MODELS, для других сервисов -
+            словари) и смещение следующей страницы (LimitedBy) или None,
+            если страница последняя
+        """
+        params = {
+            "method": "get",
+            "params": {
+                "SelectionCriteria": selection_criteria,
+                "FieldNames": fields,
+                "Page": {"Limit": page_size, "Offset": offset}
+            }
+        }
+        
+        # Кэш хранит разобранные ответы, поэтому отложенный разбор только без него
+        decode = None
+        if self.lazy_pages and self.cache is None:
+            decode = functools.partial(decode_page, result_key=result_key, codec=self.codec, fields=fields)
+        
+        result = self._make_request(service, params, decode=decode).get("result", {})
+        items = result.get(result_key, [])
+        model = MODELS.get(service)
+        if model is not None:
+            items = map(model.from_dict, items)
+        return items, result.get("LimitedBy")
+    
+    def _iter_pages(self,
+                    service: str,
+                    result_key: str,
+                    selection_criteria: Dict[str, Any],
+                    fields: List[str],
+                    page_size: int,
+                    prefetch: bool = False) -> Iterator[Entity]:
+        """
+        Перебирает объекты всех страниц, следуя за LimitedBy
+        
+        Args:
+            service: Сервис API (campaigns, ads, keywords, adgroups)
+            result_key: Ключ списка объектов в ответе
+            selection_criteria: Критерии отбора
+            fields: Список полей для выборки
+            page_size: Количество объектов на странице
+            prefetch: Загружать следующую страницу, пока обрабатывается текущая
+            
+        Yields:
+            Объекты по мере загрузки страниц
+        """
+        fetch = functools.partial(
+            self._fetch_page, service, result_key, selection_criteria, fields, page_size
+        )
+        
+        if not prefetch:
+            offset = 0
+            while offset is not None:
+                items, offset = fetch(offset)
+                yield from items
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"prefetch-{service}")
+        try:
+            future = executor.submit(fetch, 0)
+            while future is not None:
+                items, offset = future.result()
+                future = executor.submit(fetch, offset) if offset is not None else None
+                yield from items
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     # ==================== КАМПАНИИ ====================
     
     def get_campaigns(self, 
                      fields: Optional[List[str]] = None,
-                     limit: int = 10000) -> List[Dict[str, Any]]:
+                     limit: int = 10000,
+                     campaign_ids: Optional[List[int]] = None) -> List[Campaign]:
         """
         Получает список кампаний
         
         Args:
             fields: Список полей для выборки
-            limit: Максимальное количество результатов
+            limit: Размер страницы (все страницы забираются целиком)
+            campaign_ids: Список ID кампаний (если не указан, все кампании)
             
         Returns:
             Список кампаний
         """
+        return list(self.iter_campaigns(fields=fields, page_size=limit, campaign_ids=campaign_ids))
+    
+    def iter_campaigns(self,
+                       campaign_ids: Optional[List[int]] = None,
+                       fields: Optional[List[str]] = None,
+                       page_size: int = 10000,
+                       prefetch: bool = False) -> Iterator[Campaign]:
+        """
+        Постранично перебирает кампании
+        
+        Args:
+            campaign_ids: Список ID кампаний (если не указан, все кампании)
+            fields: Список полей для выборки
+            page_size: Количество объектов на странице
+            prefetch: Загружать следующую страницу в фоне
+            
+        Yields:
+            Кампании по мере загрузки страниц
+        """
         if fields is None:
             fields = [
                 "Id", "Name", "Status", "StatusPayment", "Type",
                 "StartDate", "EndDate", "DailyBudget", "Timezone"
             ]
         
-        params = {
-            "method": "get",
-            "params": {
-                "SelectionCriteria": {},
-                "FieldNames": fields,
-                "Limit": limit
-            }
-        }
+        selection_criteria = {}
+        if campaign_ids:
+            selection_criteria["Ids"] = list(campaign_ids)
         
-        result = self._make_request("campaigns", params)
-        return result.get("result", {}).get("Campaigns", [])
+        return self._iter_pages("campaigns", "Campaigns", selection_criteria, fields, page_size, prefetch)
     
-    def get_campaign_by_id(self, campaign_id: int) -> Optional[Dict[str, Any]]:
+    def get_campaign_by_id(self, campaign_id: int) -> Optional[Campaign]:
         """
         Получает информацию о конкретной кампании
         
@@ -143,7 +915,7 @@ class YandexDirectManager:
         
         result = self._make_request("campaigns", params)
         campaigns = result.get("result", {}).get("Campaigns", [])
-        return campaigns[0] if campaigns else None
+        return Campaign.from_dict(campaigns[0]) if campaigns else None
     
     def create_campaign(self, 
                        name: str,
@@ -214,10 +986,47 @@ class YandexDirectManager:
         
         return len(update_results) > 0
     
+    def update_campaigns(self,
+                         campaigns: Iterable[Dict[str, Any]],
+                         chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Пакетно обновляет параметры кампаний
+        
+        Args:
+            campaigns: Словари {"Id": ..., параметры для обновления}
+            chunk_size: Размер пачки (по умолчанию MAX_CAMPAIGNS_PER_UPDATE)
+            
+        Returns:
+            Результаты в порядке входных данных: словари с ключами
+            Id, success, errors, warnings
+        """
+        results = self._update_in_chunks(
+            "campaigns", "Campaigns", list(campaigns),
+            chunk_size, self.MAX_CAMPAIGNS_PER_UPDATE
+        )
+        return [
+            {"Id": item["Id"], **outcome}
+            for item, outcome in results
+        ]
+    
     def pause_campaign(self, campaign_id: int) -> bool:
         """Приостанавливает кампанию"""
         return self.update_campaign(campaign_id, Status="STOPPED")
     
+    def pause_campaigns(self, campaign_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """
+        Приостанавливает несколько кампаний пачками
+        
+        Args:
+            campaign_ids: Список ID кампаний
+            
+        Returns:
+            Результаты по кампаниям (см. update_campaigns)
+        """
+        return self.update_campaigns(
+            {"Id": campaign_id, "Status": "STOPPED"} for campaign_id in campaign_ids
+        )
+    
     def resume_campaign(self, campaign_id: int) -> bool:
         """Возобновляет кампанию"""
         return self.update_campaign(campaign_id, Status="ENABLED")
@@ -227,39 +1036,54 @@ class YandexDirectManager:
     def get_ads(self, 
                campaign_id: Optional[int] = None,
                fields: Optional[List[str]] = None,
-               limit: int = 10000) -> List[Dict[str, Any]]:
+               limit: int = 10000) -> List[Ad]:
         """
         Получает список объявлений
         
         Args:
             campaign_id: ID кампании (если не указана, получает все объявления)
             fields: Список полей для выборки
-            limit: Максимальное количество результатов
+            limit: Размер страницы (все страницы забираются целиком)
             
         Returns:
             Список объявлений
         """
+        return list(self.iter_ads(campaign_id=campaign_id, fields=fields, page_size=limit))
+    
+    def iter_ads(self,
+                 campaign_id: Optional[int] = None,
+                 fields: Optional[List[str]] = None,
+                 page_size: int = 10000,
+                 prefetch: bool = False,
+                 campaign_ids: Optional[List[int]] = None) -> Iterator[Ad]:
+        """
+        Постранично перебирает объявления
+        
+        Args:
+            campaign_id: ID кампании
+            fields: Список полей для выборки
+            page_size: Количество объектов на странице
+            prefetch: Загружать следующую страницу в фоне
+            campaign_ids: Список ID кампаний (вместо campaign_id, запросы
+                пачками по MAX_CAMPAIGNS_PER_KEYWORDS_GET)
+            
+        Yields:
+            Объявления по мере загрузки страниц
+        """
         if fields is None:
             fields = [
                 "Id", "CampaignId", "AdGroupId", "HeadlinesPart1",
                 "HeadlinesPart2", "Description", "Status", "Type"
             ]
         
+        if campaign_ids is not None:
+            return self._iter_by_campaigns("ads", campaign_ids, fields, page_size, prefetch)
+        
         selection_criteria = {}
         if campaign_id:
             selection_criteria["CampaignIdsList"] = [campaign_id]
         
-        params = {
-            "method": "get",
-            "params": {
-                "SelectionCriteria": selection_criteria,
-                "FieldNames": fields,
-                "Limit": limit
-            }
-        }
-        
-        result = self._make_request("ads", params)
-        return result.get("result", {}).get("Ads", [])
+        return self._iter_pages("ads", "Ads", selection_criteria, fields, page_size, prefetch)
     
     def update_ad_status(self, ad_id: int, status: str) -> bool:
         """
@@ -289,82 +1113,382 @@ class YandexDirectManager:
     def get_statistics(self,
                       date_range_type: str = "LAST_7_DAYS",
                       fields: Optional[List[str]] = None,
-                      campaign_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+                      campaign_ids: Optional[List[int]] = None,
+                      date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Получает статистику по кампаниям
         
+        Статистика по всем переданным кампаниям запрашивается одним отчетом.
+        
         Args:
             date_range_type: Период (TODAY, YESTERDAY, LAST_7_DAYS, LAST_30_DAYS и т.д.)
             fields: Список полей для выборки
             campaign_ids: Список ID кампаний
+            date_from: Начало произвольного периода (YYYY-MM-DD)
+            date_to: Конец произвольного периода (YYYY-MM-DD)
             
         Returns:
             Статистика
         """
-        if fields is None:
-            fields = [
-                "Date", "CampaignId", "CampaignName", "Impressions",
-                "Clicks", "Cost", "Conversions", "ConversionRate"
-            ]
-        
-        selection_criteria = {
-            "DateRangeType": date_range_type
-        }
+        return list(self.iter_statistics(
+            date_range_type=date_range_type,
+            fields=fields,
+            campaign_ids=campaign_ids,
+            date_from=date_from,
+            date_to=date_to
+        ))
+    
+    def iter_statistics(self,
+                        date_range_type: str = "LAST_7_DAYS",
+                        fields: Optional[List[str]] = None,
+                        campaign_ids: Optional[List[int]] = None,
+                        date_from: Optional[str] = None,
+                        date_to: Optional[str] = None,
+                        report_type: str = "CAMPAIGN_PERFORMANCE_REPORT",
+                        as_tuples: bool = False) -> Iterator[Any]:
+        """
+        Перебирает строки отчета по мере их получения
         
-        if campaign_ids:
-            selection_criteria["CampaignIdsList"] = campaign_ids
+        TSV ответ разбирается построчно, поэтому память не растет
+        с размером отчета.
         
-        params = {
-            "method": "get",
-            "params": {
-                "SelectionCriteria": selection_criteria,
-                "FieldNames": fields,
-                "OrderBy": [{"Field": "Date"}],
-                "Limit": 10000
+        Args:
+            date_range_type: Период
+            fields: Список полей для выборки
+            campaign_ids: Список ID кампаний
+            date_from: Начало произвольного периода (YYYY-MM-DD)
+            date_to: Конец произвольного периода (YYYY-MM-DD)
+            report_type: Тип отчета
+            as_tuples: Возвращать именованные кортежи вместо словарей
+            
+        Yields:
+            Строки отчета с типизированными значениями
+        """
+        definition = build_report_definition(
+            fields or self.DEFAULT_STATISTICS_FIELDS,
+            report_type=report_type,
+            date_range_type=date_range_type,
+            campaign_ids=campaign_ids,
+            date_from=date_from,
+            date_to=date_to
+        )
+        
+        response = self._open_report(definition)
+        try:
+            reader = TSVReportReader(self._iter_report_lines(response))
+            if as_tuples:
+                yield from reader.iter_tuples()
+            else:
+                yield from reader.iter_dicts()
+        finally:
+            response.close()
+    
+    def get_statistics_columns(self,
+                               date_range_type: str = "LAST_7_DAYS",
+                               fields: Optional[List[str]] = None,
+                               campaign_ids: Optional[List[int]] = None,
+                               date_from: Optional[str] = None,
+                               date_to: Optional[str] = None,
+                               report_type: str = "CAMPAIGN_PERFORMANCE_REPORT") -> Dict[str, Any]:
+        """
+        Получает отчет в столбцовом виде (array для чисел, list для строк)
+        
+        Args:
+            date_range_type: Период
+            fields: Список полей для выборки
+            campaign_ids: Список ID кампаний
+            date_from: Начало произвольного периода (YYYY-MM-DD)
+            date_to: Конец произвольного периода (YYYY-MM-DD)
+            report_type: Тип отчета
+            
+        Returns:
+            Словарь {поле: столбец значений}
+        """
+        definition = build_report_definition(
+            fields or self.DEFAULT_STATISTICS_FIELDS,
+            report_type=report_type,
+            date_range_type=date_range_type,
+            campaign_ids=campaign_ids,
+            date_from=date_from,
+            date_to=date_to
+        )
+        
+        if self.cache is None:
+            return self._read_report_columns(definition)
+        
+        cached = self._cached(
+            self._report_cache_service(definition),
+            definition,
+            lambda: {
+                field: list(values)
+                for field, values in self._read_report_columns(definition).items()
             }
-        }
+        )
+        
+        columns = {}
+        for field, values in cached.items():
+            columns[field] = new_column(field)
+            columns[field].extend(values)
+        return columns
+    
+    def _read_report_columns(self, definition: Dict[str, Any]) -> Dict[str, Any]:
+        """Загружает отчет и читает его в столбцовом виде"""
+        response = self._open_report(definition)
+        try:
+            return TSVReportReader(self._iter_report_lines(response)).read_columns()
+        finally:
+            response.close()
+    
+    def _report_cache_service(self, definition: Dict[str, Any]) -> str:
+        """Раздел кэша отчета: статистика за текущий день живет меньше"""
+        params = definition["params"]
+        date_to = params["SelectionCriteria"].get("DateTo")
+        
+        if params["DateRangeType"] in self.REALTIME_DATE_RANGES:
+            return "reports_today"
+        if date_to and date_to >= datetime.now().strftime("%Y-%m-%d"):
+            return "reports_today"
+        return "reports"
+    
+    def get_statistics_frame(self,
+                             date_range_type: str = "LAST_7_DAYS",
+                             fields: Optional[List[str]] = None,
+                             campaign_ids: Optional[List[int]] = None,
+                             date_from: Optional[str] = None,
+                             date_to: Optional[str] = None,
+                             report_type: str = "CAMPAIGN_PERFORMANCE_REPORT") -> StatsFrame:
+        """
+        Получает отчет в виде StatsFrame для векторной агрегации
+        
+        Args:
+            date_range_type: Период
+            fields: Список полей для выборки
+            campaign_ids: Список ID кампаний
+            date_from: Начало произвольного периода (YYYY-MM-DD)
+            date_to: Конец произвольного периода (YYYY-MM-DD)
+            report_type: Тип отчета
+            
+        Returns:
+            StatsFrame со столбцами отчета
+        """
+        return StatsFrame.from_columns(self.get_statistics_columns(
+            date_range_type=date_range_type,
+            fields=fields,
+            campaign_ids=campaign_ids,
+            date_from=date_from,
+            date_to=date_to,
+            report_type=report_type
+        ))
+    
+    def get_keyword_statistics_frame(self,
+                                     campaign_ids: Optional[List[int]] = None,
+                                     date_range_type: str = "LAST_30_DAYS",
+                                     date_from: Optional[str] = None,
+                                     date_to: Optional[str] = None) -> StatsFrame:
+        """
+        Получает статистику по ключевым словам (CRITERIA_PERFORMANCE_REPORT)
+        
+        Args:
+            campaign_ids: Список ID кампаний
+            date_range_type: Период
+            date_from: Начало произвольного периода (YYYY-MM-DD)
+            date_to: Конец произвольного периода (YYYY-MM-DD)
+            
+        Returns:
+            StatsFrame с полями CampaignId, CriterionId (ID ключевого слова)
+            и METRIC_COLUMNS
+        """
+        return self.get_statistics_frame(
+            date_range_type=date_range_type,
+            fields=["CampaignId", "CriterionId", *METRIC_COLUMNS],
+            campaign_ids=campaign_ids,
+            date_from=date_from,
+            date_to=date_to,
+            report_type="CRITERIA_PERFORMANCE_REPORT"
+        )
+    
+    @staticmethod
+    def _iter_report_lines(response: requests.Response) -> Iterator[str]:
+        """Читает строки TSV отчета из потока ответа"""
+        response.encoding = "utf-8"
+        return response.iter_lines(chunk_size=65536, decode_unicode=True)
+    
+    def _send_report_request(self, definition: Dict[str, Any]) -> requests.Response:
+        """
+        Отправляет запрос отчета
         
-        result = self._make_request("reports", params)
-        return result.get("result", [])
+        Returns:
+            Ответ со статусом 200 (отчет готов), 201 или 202 (отчет формируется)
+        """
+        try:
+            response = self._post(
+                "reports",
+                definition,
+                "reports.get",
+                extra_headers=self.REPORT_HEADERS,
+                stream=True
+            )
+            
+            if response.status_code in (200, 201, 202):
+                return response
+            
+            try:
+                error = self.codec.loads(response.content).get("error")
+            except ValueError:
+                error = None
+            finally:
+                response.close()
+            
+            if error:
+                logger.error(f"Ошибка API: {error}")
+                raise YandexDirectAPIError(error, http_status=response.status_code)
+            
+            response.raise_for_status()
+            raise YandexDirectAPIError(
+                {"error_string": f"Unexpected status {response.status_code}"},
+                http_status=response.status_code
+            )
+        
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Ошибка при запросе: {e}")
+            raise
+    
+    def _open_report(self, definition: Dict[str, Any]) -> requests.Response:
+        """
+        Запрашивает отчет, дожидаясь его формирования в офлайн-режиме
+        
+        Args:
+            definition: Тело запроса (см. build_report_definition)
+            
+        Returns:
+            Потоковый ответ с готовым отчетом
+        """
+        started = time.monotonic()
+        send = functools.partial(self._send_report_request, definition)
+        
+        while True:
+            response = self._execute("reports.get", UnitsRateLimiter.PRIORITY_LOW, "get", send)
+            
+            if response.status_code == 200:
+                return response
+            
+            retry_in = int(response.headers.get("retryIn", self.REPORT_POLL_INTERVAL))
+            response.close()
+            
+            if time.monotonic() - started + retry_in > self.REPORT_POLL_TIMEOUT:
+                raise TimeoutError(
+                    f"Отчет {definition['params']['ReportName']} не сформирован "
+                    f"за {self.REPORT_POLL_TIMEOUT} с"
+                )
+            
+            logger.info(f"Отчет формируется в офлайн-режиме, повторный запрос через {retry_in} с")
+            time.sleep(retry_in)
+    
+    def get_campaign_totals(self,
+                            campaign_ids: Optional[List[int]] = None,
+                            date_range_type: str = "LAST_7_DAYS") -> Dict[int, Dict[str, Any]]:
+        """
+        Получает суммарную статистику по каждой кампании одним отчетом
+        
+        Args:
+            campaign_ids: Список ID кампаний (если не указан, все кампании)
+            date_range_type: Период
+            
+        Returns:
+            Словарь {ID кампании: суммы Impressions, Clicks, Cost, Conversions
+            и производные ctr, cpc, cpa, conversion_rate}
+        """
+        frame = self.get_statistics_frame(
+            date_range_type=date_range_type,
+            fields=["CampaignId", *STATISTICS_METRICS],
+            campaign_ids=campaign_ids
+        )
+        return frame.group_by("CampaignId").to_dict("CampaignId")
     
     # ==================== КЛЮЧЕВЫЕ СЛОВА ====================
     
     def get_keywords(self,
                     campaign_id: Optional[int] = None,
                     fields: Optional[List[str]] = None,
-                    limit: int = 10000) -> List[Dict[str, Any]]:
+                    limit: int = 10000,
+                    campaign_ids: Optional[List[int]] = None) -> List[Keyword]:
         """
         Получает список ключевых слов
         
         Args:
             campaign_id: ID кампании
             fields: Список полей для выборки
-            limit: Максимальное количество результатов
+            limit: Размер страницы (все страницы забираются целиком)
+            campaign_ids: Список ID кампаний (вместо campaign_id)
             
         Returns:
             Список ключевых слов
         """
+        return list(self.iter_keywords(
+            campaign_id=campaign_id,
+            fields=fields,
+            page_size=limit,
+            campaign_ids=campaign_ids
+        ))
+    
+    def iter_keywords(self,
+                      campaign_id: Optional[int] = None,
+                      fields: Optional[List[str]] = None,
+                      page_size: int = 10000,
+                      prefetch: bool = False,
+                      campaign_ids: Optional[List[int]] = None) -> Iterator[Keyword]:
+        """
+        Постранично перебирает ключевые слова
+        
+        Список кампаний разбивается на пачки по MAX_CAMPAIGNS_PER_KEYWORDS_GET,
+        для каждой пачки страницы загружаются отдельным перебором.
+        
+        Args:
+            campaign_id: ID кампании
+            fields: Список полей для выборки
+            page_size: Количество объектов на странице
+            prefetch: Загружать следующую страницу в фоне
+            campaign_ids: Список ID кампаний (вместо campaign_id)
+            
+        Yields:
+            Ключевые слова по мере загрузки страниц
+        """
         if fields is None:
             fields = [
                 "Id", "Keyword", "CampaignId", "AdGroupId",
                 "Status", "Bid", "ContextBid"
             ]
         
-        selection_criteria = {}
-        if campaign_id:
-            selection_criteria["CampaignIdsList"] = [campaign_id]
-        
-        params = {
-            "method": "get",
-            "params": {
-                "SelectionCriteria": selection_criteria,
-                "FieldNames": fields,
-                "Limit": limit
-            }
-        }
+        if campaign_ids is None:
+            selection_criteria = {}
+            if campaign_id:
+                selection_criteria["CampaignIdsList"] = [campaign_id]
+            
+            return self._iter_pages("keywords", "Keywords", selection_criteria, fields, page_size, prefetch)
         
-        result = self._make_request("keywords", params)
-        return result.get("result", {}).get("Keywords", [])
+        return self._iter_by_campaigns("keywords", campaign_ids, fields, page_size, prefetch)
+    
+    def _iter_by_campaigns(self,
+                           service: str,
+                           campaign_ids: List[int],
+                           fields: List[str],
+                           page_size: int,
+                           prefetch: bool) -> Iterator[Entity]:
+        """Перебирает объекты кампаний пачками по MAX_CAMPAIGNS_PER_KEYWORDS_GET"""
+        campaign_ids = list(campaign_ids)
+        step = self.MAX_CAMPAIGNS_PER_KEYWORDS_GET
+        return itertools.chain.from_iterable(
+            self._iter_pages(
+                service,
+                self.ENTITY_RESULT_KEYS[service],
+                {"CampaignIdsList": campaign_ids[start:start + step]},
+                fields,
+                page_size,
+                prefetch
+            )
+            for start in range(0, len(campaign_ids), step)
+        )
     
     def update_keyword_bid(self, keyword_id: int, bid: int) -> bool:
         """
@@ -377,69 +1501,336 @@ class YandexDirectManager:
         Returns:
             True если успешно, False иначе
         """
-        params = {
-            "method": "update",
-            "params": {
-                "Keywords": [{"Id": keyword_id, "Bid": bid}]
-            }
-        }
+        results = self.update_keyword_bids([(keyword_id, bid)])
+        return bool(results) and results[0]["success"]
+    
+    def update_keyword_bids(self,
+                            bids: Iterable[Union[Tuple[int, int], Dict[str, int]]],
+                            chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Пакетно обновляет ставки ключевых слов
         
-        result = self._make_request("keywords", params)
-        update_results = result.get("result", {}).get("UpdateResults", [])
+        Пары разбиваются на пачки не больше MAX_KEYWORDS_PER_UPDATE,
+        каждая пачка отправляется одним запросом keywords.update.
         
-        return len(update_results) > 0
+        Args:
+            bids: Пары (Id, Bid) или словари {"Id": ..., "Bid": ...}
+            chunk_size: Размер пачки (по умолчанию MAX_KEYWORDS_PER_UPDATE)
+            
+        Returns:
+            Результаты в порядке входных данных: словари с ключами
+            Id, Bid, success, errors, warnings
+        """
+        items = []
+        for item in bids:
+            if isinstance(item, Mapping):
+                items.append({"Id": item["Id"], "Bid": item["Bid"]})
+            else:
+                keyword_id, bid = item
+                items.append({"Id": keyword_id, "Bid": bid})
+        
+        results = [
+            {"Id": item["Id"], "Bid": item["Bid"], **outcome}
+            for item, outcome in self._update_in_chunks(
+                "keywords", "Keywords", items, chunk_size, self.MAX_KEYWORDS_PER_UPDATE
+            )
+        ]
+        
+        failed = sum(1 for r in results if not r["success"])
+        logger.info(f"Пакетное обновление ставок: {len(results) - failed} успешно, {failed} с ошибками")
+        return results
+    
+    def _update_in_chunks(self,
+                          service: str,
+                          collection: str,
+                          items: List[Dict[str, Any]],
+                          chunk_size: Optional[int],
+                          max_chunk_size: int) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Отправляет объекты методом update пачками
+        
+        Ошибка запроса одной пачки помечает ошибкой все ее объекты,
+        остальные пачки отправляются дальше.
+        
+        Args:
+            service: Сервис API
+            collection: Ключ списка объектов в params (Campaigns, Keywords...)
+            items: Объекты для обновления
+            chunk_size: Размер пачки (по умолчанию max_chunk_size)
+            max_chunk_size: Ограничение API на размер пачки
+            
+        Returns:
+            Пары (объект, {success, errors, warnings}) в порядке входных данных
+        """
+        if chunk_size is None:
+            chunk_size = max_chunk_size
+        chunk_size = max(1, min(chunk_size, max_chunk_size))
+        
+        results = []
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            params = {
+                "method": "update",
+                "params": {
+                    collection: chunk
+                }
+            }
+            
+            try:
+                result = self._make_request(service, params)
+                update_results = result.get("result", {}).get("UpdateResults", [])
+            except Exception as e:
+                logger.error(f"Ошибка при обновлении пачки {service} ({len(chunk)} шт.): {e}")
+                update_results = [{"Errors": [{"Message": str(e)}]}] * len(chunk)
+            
+            for index, item in enumerate(chunk):
+                item_result = update_results[index] if index < len(update_results) else {
+                    "Errors": [{"Message": "Нет результата для элемента"}]
+                }
+                errors = item_result.get("Errors", [])
+                results.append((item, {
+                    "success": not errors,
+                    "errors": errors,
+                    "warnings": item_result.get("Warnings", [])
+                }))
+        
+        return results
     
     # ==================== ГРУППЫ ОБЪЯВЛЕНИЙ ====================
     
     def get_ad_groups(self,
                      campaign_id: Optional[int] = None,
                      fields: Optional[List[str]] = None,
-                     limit: int = 10000) -> List[Dict[str, Any]]:
+                     limit: int = 10000) -> List[AdGroup]:
         """
         Получает список групп объявлений
         
         Args:
             campaign_id: ID кампании
             fields: Список полей для выборки
-            limit: Максимальное количество результатов
+            limit: Размер страницы (все страницы забираются целиком)
             
         Returns:
             Список групп объявлений
         """
+        return list(self.iter_ad_groups(campaign_id=campaign_id, fields=fields, page_size=limit))
+    
+    def iter_ad_groups(self,
+                       campaign_id: Optional[int] = None,
+                       fields: Optional[List[str]] = None,
+                       page_size: int = 10000,
+                       prefetch: bool = False,
+                       campaign_ids: Optional[List[int]] = None) -> Iterator[AdGroup]:
+        """
+        Постранично перебирает группы объявлений
+        
+        Args:
+            campaign_id: ID кампании
+            fields: Список полей для выборки
+            page_size: Количество объектов на странице
+            prefetch: Загружать следующую страницу в фоне
+            campaign_ids: Список ID кампаний (вместо campaign_id, запросы
+                пачками по MAX_CAMPAIGNS_PER_KEYWORDS_GET)
+            
+        Yields:
+            Группы объявлений по мере загрузки страниц
+        """
         if fields is None:
             fields = [
                 "Id", "CampaignId", "Name", "Status", "Type"
             ]
         
+        if campaign_ids is not None:
+            return self._iter_by_campaigns("adgroups", campaign_ids, fields, page_size, prefetch)
+        
         selection_criteria = {}
         if campaign_id:
             selection_criteria["CampaignIdsList"] = [campaign_id]
         
+        return self._iter_pages("adgroups", "AdGroups", selection_criteria, fields, page_size, prefetch)
+    
+    def iter_entities(self,
+                      service: str,
+                      selection_criteria: Dict[str, Any],
+                      fields: List[str],
+                      page_size: int = 10000) -> Iterator[Entity]:
+        """
+        Постранично перебирает объекты сервиса по произвольному фильтру
+        
+        Args:
+            service: Сервис (campaigns, adgroups, ads, keywords)
+            selection_criteria: SelectionCriteria запроса get (Ids, CampaignIds...)
+            fields: Список полей для выборки
+            page_size: Количество объектов на странице
+            
+        Yields:
+            Объекты по мере загрузки страниц
+        """
+        return self._iter_pages(
+            service, self.ENTITY_RESULT_KEYS[service], selection_criteria, fields, page_size
+        )
+    
+    # ==================== ИЗМЕНЕНИЯ ====================
+    
+    def get_server_timestamp(self) -> str:
+        """
+        Получает текущее время сервера для последующих проверок изменений
+        
+        Returns:
+            Метка времени в формате API (YYYY-MM-DDThh:mm:ssZ)
+        """
         params = {
-            "method": "get",
+            "method": "checkDictionaries",
+            "params": {}
+        }
+        
+        result = self._make_request("changes", params)
+        return result.get("result", {}).get("Timestamp")
+    
+    def check_campaigns_changes(self, timestamp: str) -> Dict[str, Any]:
+        """
+        Получает кампании, изменившиеся после указанного времени
+        
+        Args:
+            timestamp: Метка времени предыдущей проверки
+            
+        Returns:
+            Результат changes.checkCampaigns: Campaigns (CampaignId и
+            ChangesIn: SELF, CHILDREN, STAT) и новый Timestamp
+        """
+        params = {
+            "method": "checkCampaigns",
             "params": {
-                "SelectionCriteria": selection_criteria,
-                "FieldNames": fields,
-                "Limit": limit
+                "Timestamp": timestamp
             }
         }
         
-        result = self._make_request("adgroups", params)
-        return result.get("result", {}).get("AdGroups", [])
+        result = self._make_request("changes", params)
+        return result.get("result", {})
+    
+    def check_changes(self,
+                      timestamp: str,
+                      campaign_ids: Optional[List[int]] = None,
+                      ad_group_ids: Optional[List[int]] = None,
+                      ad_ids: Optional[List[int]] = None,
+                      field_names: Iterable[str] = ("CampaignIds", "AdGroupIds", "AdIds")) -> Dict[str, Any]:
+        """
+        Получает ID объектов, изменившихся после указанного времени
+        
+        Нужно указать ровно один из списков campaign_ids, ad_group_ids, ad_ids.
+        
+        Args:
+            timestamp: Метка времени предыдущей проверки
+            campaign_ids: ID кампаний (не больше MAX_IDS_PER_CHANGES_CHECK)
+            ad_group_ids: ID групп объявлений
+            ad_ids: ID объявлений
+            field_names: Какие изменения вернуть
+            
+        Returns:
+            Результат changes.check: Modified, NotFound, Unprocessed
+            (словари с CampaignIds, AdGroupIds, AdIds) и новый Timestamp
+        """
+        request = {
+            "FieldNames": list(field_names),
+            "Timestamp": timestamp
+        }
+        
+        if campaign_ids is not None:
+            request["CampaignIds"] = list(campaign_ids)
+        elif ad_group_ids is not None:
+            request["AdGroupIds"] = list(ad_group_ids)
+        elif ad_ids is not None:
+            request["AdIds"] = list(ad_ids)
+        else:
+            raise ValueError("Нужно указать campaign_ids, ad_group_ids или ad_ids")
+        
+        params = {
+            "method": "check",
+            "params": request
+        }
+        
+        result = self._make_request("changes", params)
+        return result.get("result", {})
 
 
 class CampaignAutomation:
     """Класс для автоматизации управления кампаниями"""
     
-    def __init__(self, manager: YandexDirectManager):
+    def __init__(self, manager: YandexDirectManager, stats_sync=None):
         """
         Инициализация автоматизации
         
         Args:
             manager: Экземпляр YandexDirectManager
+            stats_sync: Синхронизация статистики (StatsSync); если указана,
+                30-дневная статистика читается из локального хранилища
         """
         self.manager = manager
+        self.stats_sync = stats_sync
+        
+    def _today(self) -> date:
+        return date.today()
+    
+    def _period(self, days: int) -> Tuple[str, str]:
+        """
+        Последние days дней по вчерашний включительно (как LAST_<N>_DAYS)
+        
+        Returns:
+            (date_from, date_to) в формате YYYY-MM-DD
+        """
+        date_to = self._today() - timedelta(days=1)
+        date_from = date_to - timedelta(days=max(days, 1) - 1)
+        return date_from.isoformat(), date_to.isoformat()
+    
+    @traced()
+    def plan_pause_low_performing_campaigns(self,
+                                            min_ctr: float = 0.5,
+                                            days: int = 7) -> MutationPlan:
+        """
+        Составляет план приостановки кампаний с низким CTR (без изменений в API)
+        
+        Args:
+            min_ctr: Минимальный CTR в процентах
+            days: Период анализа в днях
+            
+        Returns:
+            План изменений статусов
+        """
+        plan = MutationPlan()
+        
+        campaigns = self.manager.get_campaigns(fields=["Id", "Status"])
+        statuses = {c.Id: c.Status for c in campaigns}
+        
+        if not statuses:
+            logger.warning("Кампании не найдены")
+            return plan
+        
+        # Статистика за последние days дней (произвольный период CUSTOM_DATE)
+        date_from, date_to = self._period(days)
+        frame = self.manager.get_statistics_frame(
+            campaign_ids=list(statuses),
+            date_from=date_from,
+            date_to=date_to
+        )
+        
+        # Средний дневной CTR по кампаниям (дни без показов не учитываются)
+        daily = frame.filter(frame.column("Impressions") > 0).with_derived_metrics()
+        campaign_stats = daily.group_by(metrics=("ctr",), how="mean").to_dict()
+        
+        for campaign_id, stats_data in campaign_stats.items():
+            avg_ctr = stats_data["ctr"]
+            
+            if avg_ctr < min_ctr:
+                plan.add_status(
+                    campaign_id,
+                    "STOPPED",
+                    current_status=statuses.get(campaign_id),
+                    reason=f"CTR: {avg_ctr:.2f}%"
+                )
+        
+        return plan
     
+    @traced()
     def pause_low_performing_campaigns(self, 
                                       min_ctr: float = 0.5,
                                       days: int = 7) -> List[int]:
@@ -456,48 +1847,65 @@ class CampaignAutomation:
         paused_campaigns = []
         
         try:
-            campaigns = self.manager.get_campaigns()
-            campaign_ids = [c["Id"] for c in campaigns]
-            
-            if not campaign_ids:
-                logger.warning("Кампании не найдены")
-                return paused_campaigns
-            
-            # Получаем статистику
-            stats = self.manager.get_statistics(
-                date_range_type="LAST_7_DAYS",
-                campaign_ids=campaign_ids
-            )
-            
-            # Анализируем CTR по кампаниям
-            campaign_stats = {}
-            for stat in stats:
-                campaign_id = stat.get("CampaignId")
-                impressions = stat.get("Impressions", 0)
-                clicks = stat.get("Clicks", 0)
-                
-                if impressions > 0:
-                    ctr = (clicks / impressions) * 100
-                    if campaign_id not in campaign_stats:
-                        campaign_stats[campaign_id] = {"ctr": 0, "count": 0}
-                    
-                    campaign_stats[campaign_id]["ctr"] += ctr
-                    campaign_stats[campaign_id]["count"] += 1
+            plan = self.plan_pause_low_performing_campaigns(min_ctr, days)
             
             # Приостанавливаем кампании с низким CTR
-            for campaign_id, stats_data in campaign_stats.items():
-                avg_ctr = stats_data["ctr"] / stats_data["count"]
-                
-                if avg_ctr < min_ctr:
-                    if self.manager.pause_campaign(campaign_id):
-                        paused_campaigns.append(campaign_id)
-                        logger.info(f"Кампания {campaign_id} приостановлена (CTR: {avg_ctr:.2f}%)")
+            for result in plan.apply(self.manager)["campaigns"]:
+                if result["success"]:
+                    paused_campaigns.append(result["Id"])
+                    reason = plan.status_changes[result["Id"]]["reason"]
+                    logger.info(f"Кампания {result['Id']} приостановлена ({reason})")
         
         except Exception as e:
             logger.error(f"Ошибка при приостановке кампаний: {e}")
         
         return paused_campaigns
     
+    @traced()
+    def plan_bid_increase_for_top_keywords(self,
+                                           campaign_id: int,
+                                           increase_percent: float = 10,
+                                           min_conversions: int = 5) -> MutationPlan:
+        """
+        Составляет план увеличения ставок (без изменений в API)
+        
+        Лучшие ключевые слова - слова, набравшие за последние 30 дней не
+        меньше min_conversions конверсий.
+        
+        Args:
+            campaign_id: ID кампании
+            increase_percent: Процент увеличения ставки
+            min_conversions: Минимальное количество конверсий
+            
+        Returns:
+            План изменений ставок
+        """
+        plan = MutationPlan()
+        
+        conversions = self.manager.get_keyword_statistics_frame([campaign_id]).group_by(
+            "CriterionId", metrics=("Conversions",)
+        ).to_dict("CriterionId")
+        top_keywords = {
+            keyword_id for keyword_id, stats_data in conversions.items()
+            if stats_data["Conversions"] >= min_conversions
+        }
+        if not top_keywords:
+            return plan
+        
+        for keyword in self.manager.iter_keywords(campaign_id=campaign_id):
+            current_bid = keyword.Bid or 0
+            
+            if keyword.Id in top_keywords and current_bid > 0:
+                plan.add_bid(
+                    keyword.Id,
+                    int(current_bid * (1 + increase_percent / 100)),
+                    current_bid=current_bid,
+                    reason=f"+{increase_percent}%"
+                )
+        
+        return plan
+    
+    @traced()
     def increase_bids_for_top_keywords(self,
                                       campaign_id: int,
                                       increase_percent: float = 10,
@@ -516,24 +1924,22 @@ class CampaignAutomation:
         updated_count = 0
         
         try:
-            keywords = self.manager.get_keywords(campaign_id=campaign_id)
-            
-            for keyword in keywords:
-                keyword_id = keyword.get("Id")
-                current_bid = keyword.get("Bid", 0)
-                
-                if current_bid > 0:
-                    new_bid = int(current_bid * (1 + increase_percent / 100))
-                    
-                    if self.manager.update_keyword_bid(keyword_id, new_bid):
-                        updated_count += 1
-                        logger.info(f"Ставка для ключевого слова {keyword_id} увеличена: {current_bid} -> {new_bid}")
+            plan = self.plan_bid_increase_for_top_keywords(
+                campaign_id, increase_percent, min_conversions
+            )
+            
+            for result in plan.apply(self.manager)["bids"]:
+                if result["success"]:
+                    updated_count += 1
+                    change = plan.bid_changes[result["Id"]]
+                    logger.info(f"Ставка для ключевого слова {result['Id']} увеличена: {change['old']} -> {change['new']}")
         
         except Exception as e:
             logger.error(f"Ошибка при увеличении ставок: {e}")
         
         return updated_count
     
+    @traced()
     def generate_report(self, campaign_ids: Optional[List[int]] = None) -> Dict[str, Any]:
         """
         Генерирует отчет по кампаниям
@@ -544,7 +1950,36 @@ class CampaignAutomation:
         Returns:
             Отчет
         """
-        report = {
+        report = self.create_report()
+        
+        try:
+            campaigns = self.manager.get_campaigns(campaign_ids=campaign_ids or None)
+            campaign_ids = [c.Id for c in campaigns]
+            
+            if not campaigns:
+                totals = {}
+            elif self.stats_sync is not None:
+                # Статистика из локального хранилища (догружаются только новые дни)
+                totals = self.stats_sync.get_frame(30, campaign_ids).group_by().to_dict()
+            else:
+                # Статистика по всем кампаниям одним отчетом
+                totals = self.manager.get_campaign_totals(
+                    campaign_ids=campaign_ids,
+                    date_range_type="LAST_30_DAYS"
+                )
+            
+            for campaign in campaigns:
+                self.add_campaign_to_report(report, campaign, totals.get(campaign.Id, {}))
+        
+        except Exception as e:
+            logger.error(f"Ошибка при генерации отчета: {e}")
+        
+        return report
+    
+    @staticmethod
+    def create_report() -> Dict[str, Any]:
+        """Создает пустой отчет"""
+        return {
             "generated_at": datetime.now().isoformat(),
             "campaigns": [],
             "total_stats": {
@@ -554,57 +1989,43 @@ class CampaignAutomation:
                 "conversions": 0
             }
         }
+    
+    @staticmethod
+    def add_campaign_to_report(report: Dict[str, Any],
+                               campaign: Campaign,
+                               totals: Dict[str, Any]):
+        """
+        Добавляет кампанию и ее статистику в отчет
         
-        try:
-            campaigns = self.manager.get_campaigns()
-            
-            if campaign_ids:
-                campaigns = [c for c in campaigns if c["Id"] in campaign_ids]
-            
-            for campaign in campaigns:
-                campaign_id = campaign["Id"]
-                
-                # Получаем статистику
-                stats = self.manager.get_statistics(
-                    date_range_type="LAST_30_DAYS",
-                    campaign_ids=[campaign_id]
-                )
-                
-                campaign_data = {
-                    "id": campaign_id,
-                    "name": campaign.get("Name"),
-                    "status": campaign.get("Status"),
-                    "stats": {
-                        "impressions": sum(s.get("Impressions", 0) for s in stats),
-                        "clicks": sum(s.get("Clicks", 0) for s in stats),
-                        "cost": sum(s.get("Cost", 0) for s in stats),
-                        "conversions": sum(s.get("Conversions", 0) for s in stats)
-                    }
-                }
-                
-                # Вычисляем метрики
-                if campaign_data["stats"]["impressions"] > 0:
-                    campaign_data["stats"]["ctr"] = (
-                        campaign_data["stats"]["clicks"] / 
-                        campaign_data["stats"]["impressions"] * 100
-                    )
-                
-                if campaign_data["stats"]["clicks"] > 0:
-                    campaign_data["stats"]["cpc"] = (
-                        campaign_data["stats"]["cost"] / 
-                        campaign_data["stats"]["clicks"]
-                    )
-                
-                report["campaigns"].append(campaign_data)
-                
-                # Обновляем общую статистику
-                for key in report["total_stats"]:
-                    report["total_stats"][key] += campaign_data["stats"].get(key, 0)
+        Args:
+            report: Отчет, созданный create_report()
+            campaign: Данные кампании
+            totals: Суммарная статистика кампании (см. aggregate_statistics)
+        """
+        campaign_data = {
+            "id": campaign.Id,
+            "name": campaign.Name,
+            "status": campaign.Status,
+            "stats": {
+                "impressions": totals.get("Impressions", 0),
+                "clicks": totals.get("Clicks", 0),
+                "cost": totals.get("Cost", 0),
+                "conversions": totals.get("Conversions", 0)
+            }
+        }
         
-        except Exception as e:
-            logger.error(f"Ошибка при генерации отчета: {e}")
+        # Производные метрики уже рассчитаны при группировке
+        if campaign_data["stats"]["impressions"] > 0:
+            campaign_data["stats"]["ctr"] = totals.get("ctr", 0)
         
-        return report
+        if campaign_data["stats"]["clicks"] > 0:
+            campaign_data["stats"]["cpc"] = totals.get("cpc", 0)
+        
+        report["campaigns"].append(campaign_data)
+        
+        # Обновляем общую статистику
+        for key in report["total_stats"]:
+            report["total_stats"][key] += campaign_data["stats"].get(key, 0)
 
 
 # ==================== ПРИМЕРЫ ИСПОЛЬЗОВАНИЯ ====================
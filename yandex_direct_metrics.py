@@ -0,0 +1,315 @@
+"""
+Метрики запросов к API Яндекс.Директ
+Гистограммы времени по фазам запроса, размеры, баллы, повторы и трассировка сценариев
+"""
+
+import bisect
+import functools
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Iterator, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Границы корзин гистограмм
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Фазы запроса: разрешение имени, подключение TCP, TLS, ответ сервера (до
+# заголовков), загрузка тела, разбор JSON и полное время отправки
+REQUEST_PHASES = ("dns", "connect", "tls", "server", "download", "parse", "total")
+
+# Описания метрик для экспорта в Prometheus
+METRIC_HELP = {
+    "yandex_direct_request_duration_seconds": "Время фаз запроса к API",
+    "yandex_direct_request_size_bytes": "Размер тела запроса и ответа",
+    "yandex_direct_span_duration_seconds": "Время сценариев",
+    "yandex_direct_requests_total": "Запросы к API по HTTP статусу",
+    "yandex_direct_api_errors_total": "Ошибки в ответах API по коду",
+    "yandex_direct_units_spent_total": "Списанные баллы",
+    "yandex_direct_retries_total": "Повторы после временных ошибок",
+    "yandex_direct_throttled_total": "Ответы о превышении лимитов"
+}
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами (как histogram в Prometheus)"""
+    
+    def __init__(self, buckets: Sequence[float] = DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Накопленные количества [(граница, количество <= границы)], последняя граница +Inf"""
+        return list(zip((*self.buckets, float("inf")), itertools.accumulate(self.counts)))
+    
+    def quantile(self, q: float) -> float:
+        """
+        Оценка квантиля линейной интерполяцией внутри корзины
+        
+        Для значений выше последней границы возвращается эта граница.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for bound, count in zip(self.buckets, self.counts):
+            if seen + count >= rank and count:
+                return lower + (bound - lower) * (rank - seen) / count
+            lower, seen = bound, seen + count
+        return self.buckets[-1]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {("+Inf" if bound == float("inf") else repr(bound)): count for bound, count in self.cumulative()}
+        }
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [*labels, extra] if extra else list(labels)
+    if not pairs:
+        return ""
+    escaped = (
+        key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    Метрики запросов менеджера в памяти процесса
+    
+    Гистограммы и счетчики хранятся по имени и набору меток; экспорт -
+    текстовый формат Prometheus (to_prometheus) или JSON (to_json).
+    Трассировка: span() замеряет блок кода, вложенные блоки и запросы
+    того же потока привязываются к текущему блоку.
+    """
+    
+    def __init__(self, max_spans: int = 1000):
+        """
+        Args:
+            max_spans: Сколько последних завершенных блоков трассировки хранить
+        """
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self.spans: deque = deque(maxlen=max_spans)
+        self._local = threading.local()
+        self._span_ids = itertools.count(1)
+        
+    # ==================== ЗАПИСЬ ====================
+    
+    def observe(self, name: str, value: float, buckets: Sequence[float] = DURATION_BUCKETS, **labels):
+        """Добавляет значение в гистограмму"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+            
+    def inc(self, name: str, value: float = 1, **labels):
+        """Увеличивает счетчик"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            
+    def record_request(self,
+                       operation: str,
+                       phases: Dict[str, float],
+                       status: str,
+                       request_bytes: Optional[int] = None,
+                       response_bytes: Optional[int] = None,
+                       units: Optional[int] = None):
+        """
+        Записывает метрики одного HTTP запроса
+        
+        Args:
+            operation: Операция вида "campaigns.get"
+            phases: Время фаз REQUEST_PHASES в секундах (отсутствующие пропускаются)
+            status: HTTP статус или "error" для запросов без ответа
+            request_bytes: Размер тела запроса
+            response_bytes: Размер тела ответа (если известен)
+            units: Списанные баллы из заголовка Units
+        """
+        for phase in REQUEST_PHASES:
+            if phase in phases:
+                self.observe("yandex_direct_request_duration_seconds", phases[phase], operation=operation, phase=phase)
+        if request_bytes is not None:
+            self.observe("yandex_direct_request_size_bytes", request_bytes, SIZE_BUCKETS, operation=operation, direction="request")
+        if response_bytes is not None:
+            self.observe("yandex_direct_request_size_bytes", response_bytes, SIZE_BUCKETS, operation=operation, direction="response")
+        self.inc("yandex_direct_requests_total", operation=operation, status=status)
+        if units:
+            self.inc("yandex_direct_units_spent_total", units, operation=operation)
+            
+        span = self.current_span()
+        if span is not None:
+            span["requests"] += 1
+            span["request_time"] += phases.get("total", 0.0)
+            
+    # ==================== ТРАССИРОВКА ====================
+    
+    def current_span(self) -> Optional[Dict[str, Any]]:
+        """Текущий блок трассировки потока"""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+    
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Dict[str, Any]]:
+        """
+        Замеряет блок кода
+        
+        Args:
+            name: Название блока (например, сценария)
+            **attributes: Дополнительные поля записи
+            
+        Yields:
+            Запись блока (в нее можно добавить поля до завершения)
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            
+        parent = stack[-1] if stack else None
+        record = {
+            "name": name,
+            "span_id": next(self._span_ids),
+            "parent_id": parent["span_id"] if parent else None,
+            "start": time.time(),
+            "duration": 0.0,
+            "requests": 0,
+            "request_time": 0.0,
+            "status": "ok",
+            "attributes": attributes
+        }
+        stack.append(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["status"] = f"error: {type(e).__name__}"
+            raise
+        finally:
+            record["duration"] = time.perf_counter() - started
+            stack.pop()
+            if parent is not None:
+                parent["requests"] += record["requests"]
+                parent["request_time"] += record["request_time"]
+            self.observe("yandex_direct_span_duration_seconds", record["duration"], span=name)
+            with self._lock:
+                self.spans.append(record)
+            logger.debug(
+                f"Сценарий {name}: {record['duration']:.3f} с, "
+                f"запросов {record['requests']} ({record['request_time']:.3f} с)"
+            )
+            
+    # ==================== ЭКСПОРТ ====================
+    
+    def reset(self):
+        """Очищает все метрики и блоки трассировки"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.spans.clear()
+            
+    def to_dict(self) -> Dict[str, Any]:
+        """Метрики в виде словаря (для JSON)"""
+        with self._lock:
+            return {
+                "histograms": {
+                    name: [{"labels": dict(labels), **histogram.to_dict()} for labels, histogram in series.items()]
+                    for name, series in self._histograms.items()
+                },
+                "counters": {
+                    name: [{"labels": dict(labels), "value": value} for labels, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "spans": [dict(span) for span in self.spans]
+            }
+            
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Метрики в формате JSON"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+    
+    def to_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+                    
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+    
+    def export(self, path: str):
+        """Сохраняет метрики в файл: JSON для *.json, иначе формат Prometheus"""
+        content = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        logger.info(f"Метрики сохранены в {path}")
+
+
+def traced(name: Optional[str] = None):
+    """
+    Декоратор метода: блок трассировки вокруг вызова
+    
+    Метрики берутся из self.manager.metrics (или self.metrics); если они не
+    включены, метод вызывается без замеров.
+    
+    Args:
+        name: Название блока (по умолчанию имя класса и метода)
+    """
+    def decorator(method):
+        span_name = name or method.__qualname__
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            manager = getattr(self, "manager", self)
+            metrics = getattr(manager, "metrics", None)
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            with metrics.span(span_name):
+                return method(self, *args, **kwargs)
+            
+        return wrapper
+    return decorator
@@ -0,0 +1,337 @@
+"""
+Локальное зеркало объектов аккаунта Яндекс.Директ
+Кампании, группы, объявления и ключевые слова обновляются через сервис changes
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Any, Iterable, Iterator
+import logging
+
+from yandex_direct_models import Entity, Campaign, AdGroup, Ad, Keyword, MODELS
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """Делит список на части не больше size элементов"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class AccountMirror:
+    """
+    Зеркало дерева объектов аккаунта
+    
+    Первый запуск загружает все объекты целиком. Дальше refresh()
+    спрашивает у changes.checkCampaigns, какие кампании изменились после
+    прошлой проверки, уточняет измененные группы и объявления через
+    changes.check и загружает только их. Изменение ключевых фраз
+    отмечается Директом как изменение группы, поэтому ключевые слова
+    перезагружаются по измененным группам.
+    """
+    
+    # Поля объектов, которые хранит зеркало
+    ENTITY_FIELDS = {
+        "campaigns": [
+            "Id", "Name", "Status", "StatusPayment", "Type",
+            "StartDate", "EndDate", "DailyBudget", "Timezone"
+        ],
+        "adgroups": [
+            "Id", "CampaignId", "Name", "Status", "Type"
+        ],
+        "ads": [
+            "Id", "CampaignId", "AdGroupId", "HeadlinesPart1",
+            "HeadlinesPart2", "Description", "Status", "Type"
+        ],
+        "keywords": [
+            "Id", "Keyword", "CampaignId", "AdGroupId",
+            "Status", "Bid", "ContextBid"
+        ]
+    }
+    
+    # Ограничения API на размер фильтров get
+    MAX_IDS_PER_GET = 1000
+    MAX_CAMPAIGNS_PER_GET = 10
+    
+    # Ограничение SQLite на количество параметров запроса (с запасом)
+    _SQL_CHUNK = 500
+    
+    def __init__(self, manager, path: str = ":memory:"):
+        """
+        Args:
+            manager: Экземпляр YandexDirectManager
+            path: Файл базы SQLite (":memory:" - зеркало только на время работы)
+        """
+        self.manager = manager
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            "service TEXT NOT NULL, id INTEGER NOT NULL, "
+            "campaign_id INTEGER, ad_group_id INTEGER, data TEXT NOT NULL, "
+            "PRIMARY KEY (service, id));"
+            "CREATE INDEX IF NOT EXISTS entities_campaign ON entities (service, campaign_id);"
+            "CREATE INDEX IF NOT EXISTS entities_ad_group ON entities (service, ad_group_id);"
+            "CREATE TABLE IF NOT EXISTS mirror_state (key TEXT PRIMARY KEY, value TEXT);"
+        )
+        self._db.commit()
+        
+    def close(self):
+        """Закрывает базу зеркала"""
+        with self._lock:
+            self._db.close()
+            
+    # ==================== СОСТОЯНИЕ ====================
+    
+    @property
+    def timestamp(self) -> Optional[str]:
+        """Метка времени сервера, на которую зеркало актуально"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM mirror_state WHERE key = 'timestamp'"
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _set_timestamp(self, timestamp: Optional[str]):
+        if not timestamp:
+            return
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO mirror_state (key, value) VALUES ('timestamp', ?)",
+                (timestamp,)
+            )
+            
+    def _upsert(self, service: str, items: Iterable[Entity]) -> int:
+        """Сохраняет объекты сервиса"""
+        rows = [
+            (
+                service,
+                item["Id"],
+                item["Id"] if service == "campaigns" else item.get("CampaignId"),
+                item.get("AdGroupId"),
+                json.dumps(dict(item), ensure_ascii=False)
+            )
+            for item in items
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entities (service, id, campaign_id, ad_group_id, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+    
+    def _delete(self, column: str, ids: Iterable[int], services: Iterable[str]):
+        """Удаляет объекты сервисов, у которых column входит в ids"""
+        ids = list(ids)
+        services = list(services)
+        with self._lock, self._db:
+            for chunk in _chunks(ids, self._SQL_CHUNK):
+                placeholders = ", ".join("?" * len(chunk))
+                for service in services:
+                    self._db.execute(
+                        f"DELETE FROM entities WHERE service = ? AND {column} IN ({placeholders})",
+                        [service, *chunk]
+                    )
+                    
+    def _delete_campaigns(self, campaign_ids: Iterable[int]):
+        """Удаляет кампании вместе с дочерними объектами"""
+        self._delete("campaign_id", campaign_ids, self.ENTITY_FIELDS)
+        
+    def _delete_ad_groups(self, ad_group_ids: Iterable[int]):
+        """Удаляет группы вместе с объявлениями и ключевыми словами"""
+        ad_group_ids = list(ad_group_ids)
+        self._delete("id", ad_group_ids, ["adgroups"])
+        self._delete("ad_group_id", ad_group_ids, ["ads", "keywords"])
+        
+    # ==================== ЗАГРУЗКА ====================
+    
+    def _fetch(self, service: str, selection_key: str, ids: List[int], chunk_size: int) -> List[Entity]:
+        """Загружает объекты сервиса по списку ID пачками"""
+        fields = self.ENTITY_FIELDS[service]
+        items = []
+        for chunk in _chunks(ids, chunk_size):
+            items.extend(self.manager.iter_entities(service, {selection_key: chunk}, fields))
+        return items
+    
+    def _reload_children(self, campaign_ids: List[int]) -> Dict[str, int]:
+        """Полностью перезагружает группы, объявления и ключевые слова кампаний"""
+        self._delete("campaign_id", campaign_ids, ["adgroups", "ads", "keywords"])
+        loaded = {}
+        for service in ("adgroups", "ads", "keywords"):
+            items = self._fetch(service, "CampaignIds", campaign_ids, self.MAX_CAMPAIGNS_PER_GET)
+            loaded[service] = self._upsert(service, items)
+        return loaded
+    
+    def full_load(self) -> Dict[str, int]:
+        """
+        Загружает все объекты аккаунта заново
+        
+        Returns:
+            Количество загруженных объектов по сервисам
+        """
+        # Метка берется до загрузки: изменения во время загрузки попадут в следующий refresh
+        timestamp = self.manager.get_server_timestamp()
+        
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entities")
+            
+        campaigns = list(self.manager.iter_entities("campaigns", {}, self.ENTITY_FIELDS["campaigns"]))
+        loaded = {"campaigns": self._upsert("campaigns", campaigns)}
+        loaded.update(self._reload_children([c["Id"] for c in campaigns]))
+        
+        self._set_timestamp(timestamp)
+        logger.info(f"Зеркало аккаунта загружено полностью: {loaded}")
+        return loaded
+    
+    def refresh(self) -> Dict[str, int]:
+        """
+        Догружает объекты, изменившиеся после прошлой проверки
+        
+        Returns:
+            Количество обновленных и удаленных объектов по сервисам
+        """
+        timestamp = self.timestamp
+        if timestamp is None:
+            return self.full_load()
+        
+        changes = self.manager.check_campaigns_changes(timestamp)
+        summary = {
+            "campaigns": 0, "adgroups": 0, "ads": 0, "keywords": 0,
+            "deleted": 0, "stats_changed": 0
+        }
+        
+        self_changed = []
+        children_changed = []
+        for item in changes.get("Campaigns", []):
+            changes_in = item.get("ChangesIn", [])
+            if "SELF" in changes_in:
+                self_changed.append(item["CampaignId"])
+            if "CHILDREN" in changes_in:
+                children_changed.append(item["CampaignId"])
+            if "STAT" in changes_in:
+                summary["stats_changed"] += 1
+                
+        # Кампании: пропавшие из ответа удалены
+        if self_changed:
+            campaigns = self._fetch("campaigns", "Ids", self_changed, self.MAX_IDS_PER_GET)
+            summary["campaigns"] = self._upsert("campaigns", campaigns)
+            deleted = set(self_changed) - {c["Id"] for c in campaigns}
+            self._delete_campaigns(deleted)
+            summary["deleted"] += len(deleted)
+            
+        # Измененные группы и объявления внутри кампаний
+        ad_group_ids = set()
+        ad_ids = set()
+        for chunk in _chunks(children_changed, self.manager.MAX_IDS_PER_CHANGES_CHECK):
+            result = self.manager.check_changes(
+                timestamp,
+                campaign_ids=chunk,
+                field_names=("AdGroupIds", "AdIds")
+            )
+            modified = result.get("Modified", {})
+            ad_group_ids.update(modified.get("AdGroupIds", []))
+            ad_ids.update(modified.get("AdIds", []))
+            
+            not_found = result.get("NotFound", {}).get("CampaignIds", [])
+            self._delete_campaigns(not_found)
+            summary["deleted"] += len(not_found)
+            
+            # Для необработанных кампаний изменения неизвестны - загружаем их целиком
+            unprocessed = result.get("Unprocessed", {}).get("CampaignIds", [])
+            if unprocessed:
+                for service, count in self._reload_children(list(unprocessed)).items():
+                    summary[service] += count
+                    
+        if ad_group_ids:
+            ad_group_ids = sorted(ad_group_ids)
+            groups = self._fetch("adgroups", "Ids", ad_group_ids, self.MAX_IDS_PER_GET)
+            deleted = set(ad_group_ids) - {g["Id"] for g in groups}
+            self._delete_ad_groups(deleted)
+            summary["adgroups"] += self._upsert("adgroups", groups)
+            summary["deleted"] += len(deleted)
+            
+            # Ключевые слова измененных групп заменяются целиком
+            live_groups = [g["Id"] for g in groups]
+            self._delete("ad_group_id", live_groups, ["keywords"])
+            keywords = self._fetch("keywords", "AdGroupIds", live_groups, self.MAX_IDS_PER_GET)
+            summary["keywords"] += self._upsert("keywords", keywords)
+            
+        if ad_ids:
+            ad_ids = sorted(ad_ids)
+            ads = self._fetch("ads", "Ids", ad_ids, self.MAX_IDS_PER_GET)
+            deleted = set(ad_ids) - {a["Id"] for a in ads}
+            self._delete("id", deleted, ["ads"])
+            summary["ads"] += self._upsert("ads", ads)
+            summary["deleted"] += len(deleted)
+            
+        # Ответы get в кэше менеджера устарели для измененных сервисов
+        cache = getattr(self.manager, "cache", None)
+        if cache is not None:
+            changed = [service for service in self.ENTITY_FIELDS if summary[service]]
+            if summary["deleted"]:
+                changed = list(self.ENTITY_FIELDS)
+            if changed:
+                cache.invalidate(changed)
+                
+        self._set_timestamp(changes.get("Timestamp"))
+        logger.info(f"Зеркало аккаунта обновлено: {summary}")
+        return summary
+    
+    # ==================== ЧТЕНИЕ ====================
+    
+    def _select(self, service: str, **filters) -> List[Entity]:
+        """Читает объекты сервиса с фильтром по campaign_id / ad_group_id"""
+        query = "SELECT data FROM entities WHERE service = ?"
+        params = [service]
+        for column, value in filters.items():
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+                
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY id", params).fetchall()
+        model = MODELS[service]
+        return [model.from_dict(json.loads(row[0])) for row in rows]
+    
+    def get(self, service: str, object_id: int) -> Optional[Entity]:
+        """Возвращает объект сервиса по ID"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM entities WHERE service = ? AND id = ?",
+                (service, object_id)
+            ).fetchone()
+        return MODELS[service].from_dict(json.loads(row[0])) if row else None
+    
+    def campaigns(self) -> List[Campaign]:
+        """Кампании аккаунта"""
+        return self._select("campaigns")
+    
+    def ad_groups(self, campaign_id: Optional[int] = None) -> List[AdGroup]:
+        """Группы объявлений (все или одной кампании)"""
+        return self._select("adgroups", campaign_id=campaign_id)
+    
+    def ads(self,
+            campaign_id: Optional[int] = None,
+            ad_group_id: Optional[int] = None) -> List[Ad]:
+        """Объявления (все, кампании или группы)"""
+        return self._select("ads", campaign_id=campaign_id, ad_group_id=ad_group_id)
+    
+    def keywords(self,
+                 campaign_id: Optional[int] = None,
+                 ad_group_id: Optional[int] = None) -> List[Keyword]:
+        """Ключевые слова (все, кампании или группы)"""
+        return self._select("keywords", campaign_id=campaign_id, ad_group_id=ad_group_id)
+    
+    def counts(self) -> Dict[str, int]:
+        """Количество объектов по сервисам"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT service, COUNT(*) FROM entities GROUP BY service"
+            ).fetchall()
+        counts = dict.fromkeys(self.ENTITY_FIELDS, 0)
+        counts.update(rows)
+        return counts
@@ -0,0 +1,167 @@
+"""
+Модели объектов API Яндекс.Директ
+Кампании, группы, объявления и ключевые слова с полями в __slots__
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Entity(Mapping):
+    """
+    Объект API с полями в __slots__
+    
+    Поля называются так же, как в API: keyword.Bid и keyword["Bid"] -
+    одно и то же значение. Объект ведет себя как словарь только для
+    чтения (get, keys, items, in, dict(obj)), поэтому код, написанный
+    для словарей из ответов API, работает и с моделями. Поля, которых
+    не было в ответе (не запрошены в FieldNames), отсутствуют: обращение
+    к атрибуту вызывает AttributeError, get возвращает значение по
+    умолчанию. Поля ответа, для которых нет слота, хранятся в _extra.
+    
+    Модель занимает примерно вдвое меньше памяти, чем словарь с теми же
+    полями, а значения не копируются: модель ссылается на объекты из
+    разобранного ответа.
+    """
+    
+    __slots__ = ("_extra",)
+    
+    # Поля API, для которых есть слоты (задаются в подклассах)
+    FIELDS: Tuple[str, ...] = ()
+    _field_set = frozenset()
+    
+    def __init__(self, **fields):
+        self._extra: Optional[Dict[str, Any]] = None
+        for name, value in fields.items():
+            self[name] = value
+            
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "Entity":
+        """
+        Создает модель из объекта ответа API
+        
+        Args:
+            item: Словарь из ответа (значения не копируются)
+            
+        Returns:
+            Модель
+        """
+        entity = cls.__new__(cls)
+        entity._extra = None
+        field_set = cls._field_set
+        for name, value in item.items():
+            if name in field_set:
+                setattr(entity, name, value)
+            else:
+                if entity._extra is None:
+                    entity._extra = {}
+                entity._extra[name] = value
+        return entity
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Поля модели в виде словаря (например, для JSON)"""
+        return dict(self.items())
+    
+    # ==================== ДОСТУП КАК К СЛОВАРЮ ====================
+    
+    def __getitem__(self, name: str) -> Any:
+        if name in self._field_set:
+            try:
+                return getattr(self, name)
+            except AttributeError:
+                raise KeyError(name) from None
+        if self._extra is not None and name in self._extra:
+            return self._extra[name]
+        raise KeyError(name)
+    
+    def __setitem__(self, name: str, value: Any):
+        if name in self._field_set:
+            setattr(self, name, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[name] = value
+            
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in self._field_set:
+            return getattr(self, name, default)
+        if self._extra is not None:
+            return self._extra.get(name, default)
+        return default
+    
+    def __contains__(self, name: object) -> bool:
+        if name in self._field_set:
+            return hasattr(self, name)
+        return self._extra is not None and name in self._extra
+    
+    def __iter__(self) -> Iterator[str]:
+        for name in self.FIELDS:
+            if hasattr(self, name):
+                yield name
+        if self._extra is not None:
+            yield from self._extra
+            
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+class Campaign(Entity):
+    """Кампания"""
+    
+    FIELDS = (
+        "Id", "Name", "Type", "Status", "State", "StatusPayment",
+        "StartDate", "EndDate", "DailyBudget", "Timezone",
+        "Currency", "Funds", "Statistics"
+    )
+    __slots__ = FIELDS
+
+
+class AdGroup(Entity):
+    """Группа объявлений"""
+    
+    FIELDS = (
+        "Id", "CampaignId", "Name", "Type", "Status", "ServingStatus",
+        "RegionIds", "NegativeKeywords", "TrackingParams"
+    )
+    __slots__ = FIELDS
+
+
+class Ad(Entity):
+    """Объявление"""
+    
+    FIELDS = (
+        "Id", "CampaignId", "AdGroupId", "Type", "Subtype", "Status",
+        "State", "StatusClarification", "AgeLabel", "TextAd",
+        "HeadlinesPart1", "HeadlinesPart2", "Description"
+    )
+    __slots__ = FIELDS
+
+
+class Keyword(Entity):
+    """Ключевое слово"""
+    
+    FIELDS = (
+        "Id", "Keyword", "CampaignId", "AdGroupId", "Bid", "ContextBid",
+        "StrategyPriority", "Status", "ServingStatus", "State"
+    )
+    __slots__ = FIELDS
+
+
+# Модели по сервисам API
+MODELS = {
+    "campaigns": Campaign,
+    "adgroups": AdGroup,
+    "ads": Ad,
+    "keywords": Keyword
+}
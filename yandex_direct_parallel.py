@@ -0,0 +1,302 @@
+"""
+Параллельный анализ кампаний Яндекс.Директ
+Распределение кампаний по пулу процессов со статистикой в разделяемой памяти
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+import logging
+
+import numpy as np
+
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS
+from yandex_direct_trends import detect_trends, empty_trends
+
+logger = logging.getLogger(__name__)
+
+
+def build_analysis(campaign_id: int,
+                   frame: StatsFrame,
+                   trends: Optional[Dict[str, Any]] = None,
+                   **trend_options) -> Dict[str, Any]:
+    """
+    Анализирует дневную статистику одной кампании
+    
+    Общая часть последовательного и параллельного анализа: одинаковые
+    данные дают одинаковый результат независимо от способа запуска.
+    
+    Args:
+        campaign_id: ID кампании
+        frame: Дневная статистика кампании, отсортированная по дате
+        trends: Готовые тренды кампании (из detect_trends по многим кампаниям)
+        **trend_options: Параметры detect_trends, если trends не переданы
+        
+    Returns:
+        Словарь с метриками, дневным разбором и трендами
+    """
+    totals = frame.totals()
+    if trends is None:
+        trends = detect_trends(frame, **trend_options).get(campaign_id) or empty_trends()
+    
+    return {
+        "campaign_id": campaign_id,
+        "period": "LAST_30_DAYS",
+        "metrics": {
+            "total_impressions": totals["Impressions"],
+            "total_clicks": totals["Clicks"],
+            "total_cost": totals["Cost"],
+            "total_conversions": totals["Conversions"],
+            "avg_ctr": totals["ctr"],
+            "avg_cpc": totals["cpc"],
+            "avg_cpa": totals["cpa"],
+            "conversion_rate": totals["conversion_rate"]
+        },
+        "daily_breakdown": [
+            {
+                "date": date,
+                "impressions": impressions,
+                "clicks": clicks,
+                "cost": cost,
+                "conversions": conversions
+            }
+            for date, impressions, clicks, cost, conversions in zip(
+                frame.column("Date").tolist(),
+                frame.column("Impressions").tolist(),
+                frame.column("Clicks").tolist(),
+                frame.column("Cost").tolist(),
+                frame.column("Conversions").tolist()
+            )
+        ],
+        "trends": trends
+    }
+
+
+def _encode_columns(frame: StatsFrame) -> Dict[str, np.ndarray]:
+    """
+    Приводит статистику к числовым столбцам, отсортированным по кампании и дате
+    
+    Даты-строки заменяются номерами дней, чтобы все столбцы можно было
+    разместить в разделяемой памяти.
+    """
+    dates = frame.column("Date").astype("datetime64[D]").astype(np.int64)
+    campaigns = frame.column("CampaignId").astype(np.int64)
+    order = np.lexsort((dates, campaigns))
+    
+    columns = {"Date": dates[order], "CampaignId": campaigns[order]}
+    for metric in METRIC_COLUMNS:
+        values = frame.column(metric)
+        dtype = np.float64 if np.issubdtype(values.dtype, np.floating) else np.int64
+        columns[metric] = values.astype(dtype)[order]
+    return columns
+
+
+def _decode_frame(columns: Dict[str, np.ndarray], start: int, stop: int) -> StatsFrame:
+    """Строки [start, stop) одной кампании в виде StatsFrame с датами-строками"""
+    frame = {
+        field: values[start:stop]
+        for field, values in columns.items()
+        if field != "Date"
+    }
+    frame["Date"] = np.datetime_as_string(columns["Date"][start:stop].astype("datetime64[D]"))
+    return StatsFrame(frame)
+
+
+def _analyze_groups(columns: Dict[str, np.ndarray],
+                    groups: List[Tuple[int, int, int]],
+                    trend_options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Анализирует кампании, заданные тройками (ID, первая строка, конец)
+    
+    Кампании идут в столбцах подряд, поэтому тренды считаются одним
+    вызовом detect_trends по всему диапазону строк.
+    """
+    if not groups:
+        return []
+    
+    first, last = groups[0][1], groups[-1][2]
+    rows = StatsFrame({
+        field: values[first:last].astype("datetime64[D]") if field == "Date" else values[first:last]
+        for field, values in columns.items()
+    })
+    trends = detect_trends(rows, **trend_options)
+    
+    return [
+        build_analysis(
+            campaign_id,
+            _decode_frame(columns, start, stop),
+            trends.get(campaign_id) or empty_trends()
+        )
+        for campaign_id, start, stop in groups
+    ]
+
+
+class SharedColumns:
+    """
+    Столбцы статистики в одном блоке разделяемой памяти
+    
+    Процесс-владелец копирует столбцы в блок один раз; рабочие процессы
+    подключаются к блоку по имени и читают массивы без копирования и
+    сериализации.
+    """
+    
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: Столбцы одинаковой длины с элементами по 8 байт
+        """
+        self.length = len(next(iter(columns.values()))) if columns else 0
+        self.layout = [(field, values.dtype.str) for field, values in columns.items()]
+        size = max(8 * self.length * len(self.layout), 1)
+        
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        for (field, dtype), view in zip(self.layout, self._views(self.shm.buf)):
+            view[:] = columns[field]
+            
+    def _views(self, buffer) -> List[np.ndarray]:
+        return [
+            np.ndarray(self.length, dtype=dtype, buffer=buffer, offset=8 * self.length * index)
+            for index, (field, dtype) in enumerate(self.layout)
+        ]
+        
+    def descriptor(self) -> Tuple[str, int, List[Tuple[str, str]]]:
+        """Описание блока для подключения из другого процесса"""
+        return self.shm.name, self.length, self.layout
+    
+    def close(self):
+        """Освобождает блок разделяемой памяти"""
+        self.shm.close()
+        self.shm.unlink()
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _analyze_shared(descriptor: Tuple[str, int, List[Tuple[str, str]]],
+                    groups: List[Tuple[int, int, int]],
+                    trend_options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Задача рабочего процесса: анализ части кампаний из разделяемой памяти"""
+    name, length, layout = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        columns = {
+            field: np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=8 * length * index)
+            for index, (field, dtype) in enumerate(layout)
+        }
+        return _analyze_groups(columns, groups, trend_options)
+    finally:
+        # Представления NumPy должны быть освобождены до закрытия блока
+        columns = None
+        shm.close()
+
+
+class ParallelAnalyzer:
+    """
+    Анализ производительности многих кампаний
+    
+    Статистика сортируется по кампании и дате и помещается в разделяемую
+    память; процессы получают только границы своих кампаний. Результаты
+    совпадают с последовательным анализом: обе ветки используют
+    build_analysis над одними и теми же столбцами.
+    """
+    
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 shards_per_worker: int = 4,
+                 min_parallel_campaigns: int = 500,
+                 trend_options: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            max_workers: Количество процессов (по умолчанию по числу ядер)
+            shards_per_worker: Частей на процесс (для выравнивания нагрузки)
+            min_parallel_campaigns: Меньше кампаний - анализ в текущем процессе
+            trend_options: Параметры detect_trends (window, z_threshold,
+                trend_threshold)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shards_per_worker = max(1, shards_per_worker)
+        self.min_parallel_campaigns = min_parallel_campaigns
+        self.trend_options = dict(trend_options or {})
+        
+    @staticmethod
+    def _groups(columns: Dict[str, np.ndarray]) -> List[Tuple[int, int, int]]:
+        """Границы строк каждой кампании в отсортированных столбцах"""
+        campaigns = columns["CampaignId"]
+        if len(campaigns) == 0:
+            return []
+        ids, starts = np.unique(campaigns, return_index=True)
+        stops = np.append(starts[1:], len(campaigns))
+        return list(zip(ids.tolist(), starts.tolist(), stops.tolist()))
+    
+    def _shards(self, groups: List[Tuple[int, int, int]]) -> List[List[Tuple[int, int, int]]]:
+        count = min(len(groups), self.max_workers * self.shards_per_worker)
+        size = -(-len(groups) // count)
+        return [groups[offset:offset + size] for offset in range(0, len(groups), size)]
+    
+    def analyze(self,
+                frame: StatsFrame,
+                campaign_ids: Optional[Iterable[int]] = None,
+                parallel: bool = True,
+                date_from: Optional[str] = None,
+                date_to: Optional[str] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Анализирует все кампании статистики
+        
+        Args:
+            frame: Дневная статистика (Date, CampaignId и METRIC_COLUMNS)
+            campaign_ids: Кампании для анализа; кампании без статистики
+                получают нулевой анализ
+            parallel: Разрешить пул процессов
+            date_from: Первый день периода трендов (по умолчанию из статистики)
+            date_to: Последний день периода трендов (по умолчанию из статистики)
+            
+        Returns:
+            Словарь {ID кампании: анализ} в порядке возрастания ID
+        """
+        if campaign_ids is not None:
+            campaign_ids = list(campaign_ids)
+            frame = frame.select("CampaignId", campaign_ids)
+            
+        columns = _encode_columns(frame)
+        groups = self._groups(columns)
+        
+        # Период общий для всех частей, иначе тренды зависели бы от разбиения
+        if len(frame):
+            date_from = date_from or str(np.datetime64(columns["Date"].min().item(), "D"))
+            date_to = date_to or str(np.datetime64(columns["Date"].max().item(), "D"))
+        trend_options = {**self.trend_options, "date_from": date_from, "date_to": date_to}
+        
+        if not parallel or self.max_workers <= 1 or len(groups) < self.min_parallel_campaigns:
+            analyses = _analyze_groups(columns, groups, trend_options)
+        else:
+            analyses = self._analyze_parallel(columns, groups, trend_options)
+            
+        result = {analysis["campaign_id"]: analysis for analysis in analyses}
+        
+        for campaign_id in sorted(set(campaign_ids or ()) - result.keys()):
+            result[campaign_id] = build_analysis(
+                campaign_id,
+                StatsFrame.empty(["Date", "CampaignId", *METRIC_COLUMNS]),
+                empty_trends()
+            )
+        return dict(sorted(result.items()))
+    
+    def _analyze_parallel(self,
+                          columns: Dict[str, np.ndarray],
+                          groups: List[Tuple[int, int, int]],
+                          trend_options: Dict[str, Any]) -> List[Dict[str, Any]]:
+        shards = self._shards(groups)
+        logger.info(
+            f"Параллельный анализ: {len(groups)} кампаний, {len(shards)} частей, "
+            f"{self.max_workers} процессов"
+        )
+        
+        with SharedColumns(columns) as shared:
+            descriptor = shared.descriptor()
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(_analyze_shared, descriptor, shard, trend_options) for shard in shards]
+                return [analysis for future in futures for analysis in future.result()]
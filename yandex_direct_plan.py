@@ -0,0 +1,201 @@
+"""
+План изменений для автоматизации Яндекс.Директ
+Сбор изменений без обращения к API (dry-run) и их пакетное применение
+"""
+
+from typing import Dict, List, Optional, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MutationPlan:
+    """
+    План изменений ставок, статусов и бюджетов
+    
+    Изменения собираются по ID объекта: повторное изменение того же
+    объекта заменяет предыдущее, а изменение, совпадающее с текущим
+    значением, в план не попадает. apply() отправляет план минимальным
+    набором пакетных запросов: статус и бюджет одной кампании уходят
+    одним элементом campaigns.update.
+    """
+    
+    def __init__(self):
+        # {ID: {"old": текущее значение, "new": новое значение, "reason": причина}}
+        self.bid_changes: Dict[int, Dict[str, Any]] = {}
+        self.status_changes: Dict[int, Dict[str, Any]] = {}
+        self.budget_changes: Dict[int, Dict[str, Any]] = {}
+        
+        self.skipped = 0
+        
+    @staticmethod
+    def _add(changes: Dict[int, Dict[str, Any]],
+             object_id: int,
+             new_value: Any,
+             current_value: Any,
+             reason: str) -> bool:
+        """Добавляет изменение, отбрасывая изменения без эффекта"""
+        previous = changes.get(object_id)
+        if previous is not None:
+            # Текущее значение - то, что было до первого изменения в плане
+            current_value = previous["old"]
+            
+        if current_value is not None and new_value == current_value:
+            changes.pop(object_id, None)
+            return False
+        
+        changes[object_id] = {"old": current_value, "new": new_value, "reason": reason}
+        return True
+    
+    def add_bid(self,
+                keyword_id: int,
+                bid: int,
+                current_bid: Optional[int] = None,
+                reason: str = "") -> bool:
+        """
+        Добавляет изменение ставки ключевого слова
+        
+        Args:
+            keyword_id: ID ключевого слова
+            bid: Новая ставка в копейках
+            current_bid: Текущая ставка (если известна)
+            reason: Причина изменения
+            
+        Returns:
+            True если изменение попало в план
+        """
+        added = self._add(self.bid_changes, keyword_id, bid, current_bid, reason)
+        if not added:
+            self.skipped += 1
+        return added
+    
+    def add_status(self,
+                   campaign_id: int,
+                   status: str,
+                   current_status: Optional[str] = None,
+                   reason: str = "") -> bool:
+        """
+        Добавляет изменение статуса кампании
+        
+        Args:
+            campaign_id: ID кампании
+            status: Новый статус (например, STOPPED)
+            current_status: Текущий статус (если известен)
+            reason: Причина изменения
+            
+        Returns:
+            True если изменение попало в план
+        """
+        added = self._add(self.status_changes, campaign_id, status, current_status, reason)
+        if not added:
+            self.skipped += 1
+        return added
+    
+    def add_budget(self,
+                   campaign_id: int,
+                   daily_budget: int,
+                   current_budget: Optional[int] = None,
+                   reason: str = "") -> bool:
+        """
+        Добавляет изменение дневного бюджета кампании
+        
+        Args:
+            campaign_id: ID кампании
+            daily_budget: Новый дневной бюджет в копейках
+            current_budget: Текущий бюджет (если известен)
+            reason: Причина изменения
+            
+        Returns:
+            True если изменение попало в план
+        """
+        added = self._add(self.budget_changes, campaign_id, daily_budget, current_budget, reason)
+        if not added:
+            self.skipped += 1
+        return added
+    
+    def merge(self, other: "MutationPlan") -> "MutationPlan":
+        """
+        Добавляет изменения другого плана (более поздние изменения важнее)
+        
+        Returns:
+            Этот план
+        """
+        for source, add in (
+            (other.bid_changes, self.add_bid),
+            (other.status_changes, self.add_status),
+            (other.budget_changes, self.add_budget)
+        ):
+            for object_id, change in source.items():
+                add(object_id, change["new"], change["old"], change["reason"])
+        self.skipped += other.skipped
+        return self
+    
+    def __len__(self) -> int:
+        return len(self.bid_changes) + len(self.status_changes) + len(self.budget_changes)
+    
+    def is_empty(self) -> bool:
+        """План не содержит изменений"""
+        return len(self) == 0
+    
+    def campaign_updates(self) -> List[Dict[str, Any]]:
+        """Элементы campaigns.update: статус и бюджет одной кампании вместе"""
+        updates = {}
+        for campaign_id, change in self.status_changes.items():
+            updates.setdefault(campaign_id, {"Id": campaign_id})["Status"] = change["new"]
+        for campaign_id, change in self.budget_changes.items():
+            updates.setdefault(campaign_id, {"Id": campaign_id})["DailyBudget"] = change["new"]
+        return list(updates.values())
+    
+    def summary(self) -> Dict[str, int]:
+        """Количество изменений по типам"""
+        return {
+            "bids": len(self.bid_changes),
+            "statuses": len(self.status_changes),
+            "budgets": len(self.budget_changes),
+            "skipped": self.skipped
+        }
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """План в виде словаря (для вывода и сохранения в JSON)"""
+        return {
+            "bids": [{"id": object_id, **change} for object_id, change in self.bid_changes.items()],
+            "statuses": [{"id": object_id, **change} for object_id, change in self.status_changes.items()],
+            "budgets": [{"id": object_id, **change} for object_id, change in self.budget_changes.items()],
+            "summary": self.summary()
+        }
+        
+    def apply(self, manager) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Отправляет план пакетными запросами
+        
+        Args:
+            manager: Экземпляр YandexDirectManager
+            
+        Returns:
+            Словарь {"bids": результаты update_keyword_bids,
+            "campaigns": результаты update_campaigns}
+        """
+        results = {"bids": [], "campaigns": []}
+        
+        if self.is_empty():
+            logger.info("План изменений пуст, запросы не отправляются")
+            return results
+        
+        campaign_updates = self.campaign_updates()
+        if campaign_updates:
+            results["campaigns"] = manager.update_campaigns(campaign_updates)
+            
+        if self.bid_changes:
+            results["bids"] = manager.update_keyword_bids(
+                (keyword_id, change["new"]) for keyword_id, change in self.bid_changes.items()
+            )
+            
+        failed = sum(
+            1 for outcome in results["campaigns"] + results["bids"]
+            if not outcome["success"]
+        )
+        logger.info(
+            f"План применен: {len(results['campaigns'])} кампаний, "
+            f"{len(results['bids'])} ставок, ошибок: {failed}"
+        )
+        return results
@@ -0,0 +1,150 @@
+"""
+Ранжирование ключевых слов Яндекс.Директ по эффективности
+Векторный расчет оценки по статистике CRITERIA_PERFORMANCE_REPORT и частичный отбор
+"""
+
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+
+import numpy as np
+
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS
+
+
+def join_keyword_stats(keyword_ids: Sequence[int], stats: StatsFrame) -> Dict[str, np.ndarray]:
+    """
+    Сопоставляет статистику отчета ключевым словам
+    
+    Args:
+        keyword_ids: ID ключевых слов
+        stats: Статистика с полями CriterionId и METRIC_COLUMNS (строки
+            одного ключевого слова суммируются)
+            
+    Returns:
+        Словарь {метрика: массив в порядке keyword_ids}; у слов без
+        статистики нули
+    """
+    ids = np.asarray(keyword_ids, dtype=np.int64)
+    joined = {metric: np.zeros(len(ids), dtype=np.float64) for metric in METRIC_COLUMNS}
+    if len(ids) == 0 or len(stats) == 0:
+        return joined
+    
+    grouped = stats.group_by("CriterionId", METRIC_COLUMNS)
+    keys = grouped["CriterionId"].astype(np.int64)
+    positions = np.searchsorted(keys, ids)
+    positions[positions == len(keys)] = 0
+    found = keys[positions] == ids
+    
+    for metric in METRIC_COLUMNS:
+        joined[metric][found] = grouped[metric][positions[found]]
+    return joined
+
+
+def keyword_scores(metrics: Dict[str, np.ndarray],
+                   prior_clicks: float = 10,
+                   prior_impressions: float = 100) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Оценка эффективности ключевых слов
+    
+    Оценка - ожидаемые конверсии на рубль затрат. Конверсия и цена клика
+    сглаживаются к средним по всем словам с весом prior_clicks кликов,
+    чтобы слово с одним удачным кликом не оказалось лучшим. Если
+    конверсий нет ни у одного слова, оценка - сглаженный CTR.
+    
+    Args:
+        metrics: Результат join_keyword_stats
+        prior_clicks: Вес средних значений (в кликах)
+        prior_impressions: Вес среднего CTR (в показах)
+        
+    Returns:
+        (оценки, маска ранжируемых слов - с кликами за период)
+    """
+    impressions = metrics["Impressions"]
+    clicks = metrics["Clicks"]
+    cost = metrics["Cost"]
+    conversions = metrics["Conversions"]
+    ranked = clicks > 0
+    
+    total_clicks = clicks.sum()
+    if total_clicks == 0:
+        return np.zeros(len(clicks)), ranked
+    
+    if conversions.sum() > 0:
+        average_rate = conversions.sum() / total_clicks
+        average_cpc = cost.sum() / total_clicks
+        conversion_rate = (conversions + prior_clicks * average_rate) / (clicks + prior_clicks)
+        cpc = (cost + prior_clicks * average_cpc) / (clicks + prior_clicks)
+        scores = np.zeros(len(clicks))
+        np.divide(conversion_rate, cpc, out=scores, where=cpc > 0)
+    else:
+        ctr = total_clicks / max(impressions.sum(), 1.0)
+        scores = (clicks + prior_impressions * ctr) / (impressions + prior_impressions)
+        
+    return scores, ranked
+
+
+def select_top_bottom(scores: np.ndarray,
+                      top_count: int,
+                      bottom_count: int,
+                      mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Отбирает лучшие и худшие элементы частичной сортировкой (O(n))
+    
+    Args:
+        scores: Оценки
+        top_count: Количество лучших
+        bottom_count: Количество худших (не пересекаются с лучшими)
+        mask: Участвующие элементы (по умолчанию все)
+        
+    Returns:
+        (индексы лучших по убыванию оценки, индексы худших по возрастанию)
+    """
+    candidates = np.arange(len(scores)) if mask is None else np.flatnonzero(mask)
+    top_count = min(top_count, len(candidates))
+    bottom_count = min(bottom_count, len(candidates) - top_count)
+    values = scores[candidates]
+    
+    top = np.empty(0, dtype=np.int64)
+    if top_count:
+        part = np.argpartition(-values, top_count - 1)[:top_count]
+        top = part[np.argsort(-values[part], kind="stable")]
+        
+    rest = np.setdiff1d(np.arange(len(candidates)), top, assume_unique=True)
+    bottom = np.empty(0, dtype=np.int64)
+    if bottom_count:
+        part = rest[np.argpartition(values[rest], bottom_count - 1)[:bottom_count]]
+        bottom = part[np.argsort(values[part], kind="stable")]
+        
+    return candidates[top], candidates[bottom]
+
+
+def rank_keywords(keywords: List[Dict[str, Any]],
+                  stats: StatsFrame,
+                  top_percent: float = 20,
+                  bottom_percent: float = 20) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Отбирает лучшие и худшие ключевые слова по статистике
+    
+    Доли считаются от слов с кликами за период: слова без данных не
+    повышаются и не понижаются.
+    
+    Args:
+        keywords: Ключевые слова (поле Id)
+        stats: Статистика CRITERIA_PERFORMANCE_REPORT
+        top_percent: Доля лучших
+        bottom_percent: Доля худших
+        
+    Returns:
+        (лучшие ключевые слова, худшие ключевые слова)
+    """
+    metrics = join_keyword_stats([keyword.get("Id", 0) for keyword in keywords], stats)
+    scores, ranked = keyword_scores(metrics)
+    
+    total = int(ranked.sum())
+    if total == 0:
+        return [], []
+    
+    top_count = max(1, int(total * top_percent / 100))
+    bottom_count = max(1, int(total * bottom_percent / 100))
+    top, bottom = select_top_bottom(scores, top_count, bottom_count, ranked)
+    
+    return [keywords[index] for index in top.tolist()], [keywords[index] for index in bottom.tolist()]
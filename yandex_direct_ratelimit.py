@@ -0,0 +1,227 @@
+"""
+Планировщик запросов к Яндекс.Директ API с учетом баллов
+Token bucket по заголовку Units и очередь с приоритетами
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Optional, Any, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UnitsRateLimiter:
+    """
+    Ограничитель скорости запросов по баллам API
+    
+    Баллы восстанавливаются равномерно в течение суток, поэтому остаток
+    ведется как token bucket: емкость и скорость пополнения берутся из
+    заголовка Units (spent/rest/limit), стоимость операции оценивается по
+    фактически списанным баллам. Запросы ждут своей очереди по приоритету
+    вместо того, чтобы получать ошибку от API.
+    """
+    
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_LOW = 2
+    
+    # Оценка стоимости операции до первого ответа с заголовком Units
+    DEFAULT_COST = 10
+    
+    def __init__(self,
+                 max_requests_per_second: float = 5.0,
+                 reserve_units: int = 0,
+                 period_seconds: int = 86400,
+                 throttle_delay: float = 1.0):
+        """
+        Инициализация ограничителя
+        
+        Args:
+            max_requests_per_second: Максимальная частота запросов
+            reserve_units: Баллы, которые не расходуются (запас для ручной работы)
+            period_seconds: Период полного восстановления баллов
+            throttle_delay: Пауза после ответа API о превышении лимита
+        """
+        self.max_requests_per_second = max_requests_per_second
+        self.reserve_units = reserve_units
+        self.period_seconds = period_seconds
+        self.throttle_delay = throttle_delay
+        
+        # Остаток баллов неизвестен до первого ответа API
+        self.tokens: Optional[float] = None
+        self.capacity: Optional[float] = None
+        self.refill_rate = 0.0
+        
+        self._last_refill = time.monotonic()
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._costs: Dict[str, float] = {}
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        
+        self.stats = {
+            "requests": 0,
+            "delayed": 0,
+            "wait_time": 0.0,
+            "throttled": 0,
+            "units_spent": 0
+        }
+        
+    @staticmethod
+    def parse_units_header(value: Optional[str]) -> Optional[Tuple[int, int, int]]:
+        """
+        Разбирает заголовок Units
+        
+        Args:
+            value: Значение вида "10/20828/64000"
+            
+        Returns:
+            Кортеж (списано, остаток, суточный лимит) или None
+        """
+        if not value:
+            return None
+        
+        try:
+            spent, rest, limit = (int(part) for part in value.split("/"))
+        except ValueError:
+            logger.warning(f"Не удалось разобрать заголовок Units: {value}")
+            return None
+        
+        return spent, rest, limit
+    
+    def estimate_cost(self, operation: str) -> float:
+        """Оценивает стоимость операции в баллах"""
+        cost = self._costs.get(operation, self.DEFAULT_COST)
+        
+        if self.capacity is not None:
+            cost = min(cost, max(self.capacity - self.reserve_units, 0))
+            
+        return cost
+    
+    def _refill(self, now: float):
+        """Пополняет запас баллов за прошедшее время"""
+        if self.tokens is not None and self.capacity is not None:
+            elapsed = now - self._last_refill
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self._last_refill = now
+        
+    def _wait_time(self, cost: float, now: float) -> float:
+        """Сколько нужно ждать, чтобы запрос стоимостью cost можно было отправить"""
+        wait = max(self._paused_until - now, self._next_slot - now, 0.0)
+        
+        if self.tokens is not None:
+            deficit = cost - (self.tokens - self.reserve_units)
+            if deficit > 0:
+                units_wait = deficit / self.refill_rate if self.refill_rate > 0 else self.throttle_delay
+                wait = max(wait, units_wait)
+                
+        return wait
+    
+    def acquire(self, operation: str, priority: int = PRIORITY_NORMAL) -> float:
+        """
+        Ждет разрешения на отправку запроса
+        
+        Args:
+            operation: Операция вида "campaigns.get"
+            priority: Приоритет (меньше - раньше)
+            
+        Returns:
+            Время ожидания в секундах
+        """
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    cost = self.estimate_cost(operation)
+                    
+                    if self._waiters[0] == ticket:
+                        wait = self._wait_time(cost, now)
+                        if wait <= 0:
+                            break
+                        self._condition.wait(timeout=wait)
+                    else:
+                        self._condition.wait()
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+                
+            if self.tokens is not None:
+                self.tokens -= cost
+                
+            if self.max_requests_per_second:
+                interval = 1.0 / self.max_requests_per_second
+                self._next_slot = max(now, self._next_slot) + interval
+                
+            waited = time.monotonic() - started
+            self.stats["requests"] += 1
+            if waited > 0.001:
+                self.stats["delayed"] += 1
+                self.stats["wait_time"] += waited
+                
+        return waited
+    
+    def update_from_headers(self, operation: str, headers: Any):
+        """
+        Обновляет остаток баллов и стоимость операции по заголовкам ответа
+        
+        Args:
+            operation: Операция вида "campaigns.get"
+            headers: Заголовки ответа API
+        """
+        units = self.parse_units_header(headers.get("Units"))
+        if units is None:
+            return
+        
+        spent, rest, limit = units
+        
+        with self._condition:
+            previous = self._costs.get(operation)
+            self._costs[operation] = spent if previous is None else previous * 0.7 + spent * 0.3
+            
+            self.tokens = float(rest)
+            self.capacity = float(limit)
+            self.refill_rate = limit / self.period_seconds
+            self._last_refill = time.monotonic()
+            self.stats["units_spent"] += spent
+            self._condition.notify_all()
+            
+        logger.debug(f"Баллы: списано {spent}, осталось {rest} из {limit}")
+        
+    def throttle(self, units_exhausted: bool = False, delay: Optional[float] = None):
+        """
+        Приостанавливает очередь после ответа API о превышении лимита
+        
+        Args:
+            units_exhausted: Закончились баллы (ждать пополнения)
+            delay: Пауза в секундах (по умолчанию throttle_delay)
+        """
+        with self._condition:
+            self.stats["throttled"] += 1
+            
+            if units_exhausted:
+                self.tokens = 0.0
+                self._last_refill = time.monotonic()
+                
+            pause = self.throttle_delay if delay is None else delay
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            self._condition.notify_all()
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику ограничителя"""
+        with self._condition:
+            stats = dict(self.stats)
+            stats["units_rest"] = self.tokens
+            stats["units_limit"] = self.capacity
+            stats["operation_costs"] = dict(self._costs)
+        return stats
@@ -0,0 +1,219 @@
+"""
+Потоковый разбор отчетов Яндекс.Директ (Reports API, формат TSV)
+Строки отчета разбираются по мере получения, без буферизации всего ответа
+"""
+
+from array import array
+from collections import namedtuple
+from datetime import date
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Типы полей отчета; остальные поля остаются строками
+INTEGER_FIELDS = {
+    "CampaignId", "AdGroupId", "AdId", "CriterionId", "Impressions",
+    "Clicks", "Conversions", "Sessions", "Bounces"
+}
+
+FLOAT_FIELDS = {
+    "Cost", "Ctr", "AvgCpc", "AvgCpm", "ConversionRate", "CostPerConversion",
+    "AvgImpressionPosition", "AvgClickPosition", "BounceRate", "Revenue", "GoalsRoi"
+}
+
+# Так Директ обозначает отсутствующее значение
+EMPTY_VALUE = "--"
+
+
+def _to_int(raw: str) -> int:
+    return int(raw) if raw and raw != EMPTY_VALUE else 0
+
+
+def _to_float(raw: str) -> float:
+    return float(raw) if raw and raw != EMPTY_VALUE else 0.0
+
+
+def _to_str(raw: str) -> str:
+    return raw
+
+
+def get_converter(field: str):
+    """Возвращает функцию приведения значения поля к его типу"""
+    if field in INTEGER_FIELDS:
+        return _to_int
+    if field in FLOAT_FIELDS:
+        return _to_float
+    return _to_str
+
+
+def new_column(field: str):
+    """Создает пустой столбец для поля: array('q'), array('d') или список"""
+    if field in INTEGER_FIELDS:
+        return array("q")
+    if field in FLOAT_FIELDS:
+        return array("d")
+    return []
+
+
+def parse_value(field: str, raw: str) -> Any:
+    """
+    Приводит значение TSV ячейки к типу поля
+    
+    Args:
+        field: Название поля отчета
+        raw: Строковое значение
+        
+    Returns:
+        int, float или str
+    """
+    return get_converter(field)(raw)
+
+
+def build_report_definition(field_names: List[str],
+                            report_type: str = "CAMPAIGN_PERFORMANCE_REPORT",
+                            date_range_type: str = "LAST_7_DAYS",
+                            campaign_ids: Optional[List[int]] = None,
+                            date_from: Optional[str] = None,
+                            date_to: Optional[str] = None,
+                            order_by: Optional[str] = "Date") -> Dict[str, Any]:
+    """
+    Формирует тело запроса к сервису reports
+    
+    Имя отчета строится из хэша параметров: повторный запрос тех же
+    параметров (в том числе тех же кампаний в другом порядке) получает тот
+    же офлайн-отчет, а не ставит новый в очередь. Для относительных
+    периодов (LAST_7_DAYS, TODAY и т.п.) в хэш входит текущая дата: иначе
+    запрос на следующий день получил бы вчерашний отчет с тем же именем.
+    
+    Args:
+        field_names: Поля отчета
+        report_type: Тип отчета
+        date_range_type: Период (игнорируется, если заданы date_from и date_to)
+        campaign_ids: Фильтр по ID кампаний
+        date_from: Начало периода (YYYY-MM-DD)
+        date_to: Конец периода (YYYY-MM-DD)
+        order_by: Поле сортировки
+        
+    Returns:
+        Тело запроса
+    """
+    selection_criteria = {}
+    
+    if date_from and date_to:
+        date_range_type = "CUSTOM_DATE"
+        selection_criteria["DateFrom"] = date_from
+        selection_criteria["DateTo"] = date_to
+        
+    if campaign_ids:
+        selection_criteria["Filter"] = [{
+            "Field": "CampaignId",
+            "Operator": "IN",
+            "Values": [str(campaign_id) for campaign_id in sorted(set(campaign_ids))]
+        }]
+        
+    params = {
+        "SelectionCriteria": selection_criteria,
+        "FieldNames": list(field_names),
+        "ReportType": report_type,
+        "DateRangeType": date_range_type,
+        "Format": "TSV",
+        "IncludeVAT": "NO",
+        "IncludeDiscount": "NO"
+    }
+    
+    if order_by and order_by in field_names:
+        params["OrderBy"] = [{"Field": order_by}]
+        
+    key = dict(params)
+    if date_range_type != "CUSTOM_DATE":
+        key["ResolvedDate"] = date.today().isoformat()
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+    params["ReportName"] = f"{report_type}-{digest[:16]}"
+    
+    return {"params": params}
+
+
+class TSVReportReader:
+    """
+    Потоковый разборщик TSV отчета
+    
+    Ожидает отчет без строки заголовка и итогов (skipReportHeader,
+    skipReportSummary): первая строка - названия столбцов, далее данные.
+    """
+    
+    def __init__(self, lines: Iterable[str]):
+        """
+        Args:
+            lines: Строки отчета (например, response.iter_lines())
+        """
+        self._lines = iter(lines)
+        self.columns: Optional[List[str]] = None
+        self._row_type = None
+        
+    def _read_columns(self) -> List[str]:
+        """Читает строку с названиями столбцов"""
+        if self.columns is None:
+            for line in self._lines:
+                if line:
+                    self.columns = line.rstrip("\r\n").split("\t")
+                    break
+            else:
+                self.columns = []
+            self._row_type = namedtuple("ReportRow", self.columns, rename=True)
+        return self.columns
+    
+    def _iter_values(self) -> Iterator[Tuple[Any, ...]]:
+        """Перебирает строки как кортежи типизированных значений"""
+        parsers = [get_converter(field) for field in self._read_columns()]
+        
+        for line in self._lines:
+            if not line:
+                continue
+            cells = line.rstrip("\r\n").split("\t")
+            yield tuple(parse(cell) for parse, cell in zip(parsers, cells))
+            
+    def iter_tuples(self) -> Iterator[Tuple[Any, ...]]:
+        """
+        Перебирает строки отчета как именованные кортежи
+        
+        Yields:
+            ReportRow с полями в порядке столбцов отчета
+        """
+        self._read_columns()
+        row_type = self._row_type
+        for row in self._iter_values():
+            yield row_type._make(row)
+            
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Перебирает строки отчета как словари
+        
+        Yields:
+            Словарь {поле: значение}
+        """
+        columns = self._read_columns()
+        for row in self._iter_values():
+            yield dict(zip(columns, row))
+            
+    def read_columns(self) -> Dict[str, Any]:
+        """
+        Читает отчет в столбцовом виде
+        
+        Целые поля хранятся в array('q'), дробные - в array('d'),
+        строковые - в списках.
+        
+        Returns:
+            Словарь {поле: столбец значений}
+        """
+        columns = self._read_columns()
+        data = {field: new_column(field) for field in columns}
+        appenders = [data[field].append for field in columns]
+        for row in self._iter_values():
+            for append, value in zip(appenders, row):
+                append(value)
+                
+        return data
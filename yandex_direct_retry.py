@@ -0,0 +1,137 @@
+"""
+Повторные попытки запросов к Яндекс.Директ API
+Классификация ошибок, экспоненциальная задержка с jitter и бюджет повторов
+"""
+
+import random
+import threading
+from typing import Optional
+
+import requests
+from urllib3.exceptions import NewConnectionError, MaxRetryError
+
+
+class RetryBudget:
+    """Бюджет повторов на одно задание (например, ежедневную оптимизацию)"""
+    
+    def __init__(self, max_retries: int):
+        """
+        Args:
+            max_retries: Максимальное количество повторов за все задание
+        """
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+        
+    def try_spend(self) -> bool:
+        """Списывает один повтор, если бюджет не исчерпан"""
+        with self._lock:
+            if self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+        
+    @property
+    def remaining(self) -> int:
+        """Оставшееся количество повторов"""
+        return max(self.max_retries - self.used, 0)
+
+
+class RetryPolicy:
+    """
+    Политика повторов запросов
+    
+    Повторяются только временные ошибки. Если неизвестно, дошел ли запрос
+    до API (таймаут чтения, 5xx, внутренняя ошибка API), повторяются только
+    идемпотентные методы, чтобы не создать дубликаты при add.
+    """
+    
+    # Ошибки API, при которых запрос не был выполнен
+    SAFE_API_ERROR_CODES = {52, 1000}
+    
+    # Ошибки API, при которых результат запроса неизвестен
+    AMBIGUOUS_API_ERROR_CODES = {1001, 1002}
+    
+    RETRYABLE_HTTP_STATUSES = {500, 502, 503, 504}
+    
+    # Методы, повтор которых может изменить данные повторно
+    NON_IDEMPOTENT_METHODS = {"add"}
+    
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 5.0,
+                 max_delay: float = 60.0,
+                 jitter: bool = True):
+        """
+        Args:
+            max_attempts: Максимальное количество повторов одного запроса
+            base_delay: Базовая задержка в секундах
+            max_delay: Максимальная задержка в секундах
+            jitter: Случайная задержка от половины экспоненты до полной
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        
+    def is_idempotent(self, api_method: Optional[str]) -> bool:
+        """Можно ли безопасно повторить метод API (все, кроме add)"""
+        return api_method not in self.NON_IDEMPOTENT_METHODS
+    
+    @staticmethod
+    def _request_not_sent(error: Exception) -> bool:
+        """Ошибка произошла до отправки запроса (соединение не установлено)"""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            reason = error.args[0]
+            if isinstance(reason, MaxRetryError):
+                reason = reason.reason
+            return isinstance(reason, NewConnectionError)
+        
+        return False
+    
+    def is_retryable(self, error: Exception, idempotent: bool = True) -> bool:
+        """
+        Классифицирует ошибку
+        
+        Args:
+            error: Исключение, возникшее при запросе
+            idempotent: Метод можно выполнить повторно без побочных эффектов
+            
+        Returns:
+            True если запрос стоит повторить
+        """
+        if self._request_not_sent(error):
+            return True
+        
+        if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return idempotent
+        
+        if isinstance(error, requests.exceptions.HTTPError):
+            status = error.response.status_code if error.response is not None else None
+            return idempotent and status in self.RETRYABLE_HTTP_STATUSES
+        
+        error_code = getattr(error, "error_code", None)
+        if error_code in self.SAFE_API_ERROR_CODES:
+            return True
+        if error_code in self.AMBIGUOUS_API_ERROR_CODES:
+            return idempotent
+        
+        return False
+    
+    def get_delay(self, attempt: int) -> float:
+        """
+        Задержка перед повтором
+        
+        Args:
+            attempt: Номер повтора, начиная с 0
+            
+        Returns:
+            Задержка в секундах
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        if self.jitter:
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        return delay
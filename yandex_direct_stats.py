@@ -0,0 +1,275 @@
+"""
+Столбцовое хранилище статистики Яндекс.Директ
+Векторная группировка и расчет производных метрик (CTR, CPC, CPA) на NumPy
+"""
+
+from typing import Dict, List, Optional, Any, Iterable, Sequence
+from array import array
+import itertools
+
+import numpy as np
+
+
+# Суммируемые метрики отчета
+METRIC_COLUMNS = ("Impressions", "Clicks", "Cost", "Conversions")
+
+# Производные метрики, которые рассчитывает StatsFrame
+DERIVED_METRICS = ("ctr", "cpc", "cpa", "conversion_rate")
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """Поэлементное деление с нулем там, где знаменатель равен нулю"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    result = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    if scale != 1.0:
+        result *= scale
+    return result
+
+
+def derived_metrics(impressions: np.ndarray,
+                    clicks: np.ndarray,
+                    cost: np.ndarray,
+                    conversions: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Рассчитывает CTR, CPC, CPA и конверсию для массивов метрик
+    
+    Args:
+        impressions: Показы
+        clicks: Клики
+        cost: Затраты
+        conversions: Конверсии
+        
+    Returns:
+        Словарь {ctr, cpc, cpa, conversion_rate: массив}; при нулевом
+        знаменателе значение равно 0
+    """
+    return {
+        "ctr": _safe_divide(clicks, impressions, 100.0),
+        "cpc": _safe_divide(cost, clicks),
+        "cpa": _safe_divide(cost, conversions),
+        "conversion_rate": _safe_divide(conversions, clicks, 100.0)
+    }
+
+
+class StatsFrame:
+    """
+    Столбцовое хранилище строк статистики
+    
+    Каждое поле отчета хранится одним массивом NumPy: числовые поля -
+    int64/float64, строковые - массивами строк. Группировка по ключу
+    выполняется через np.unique и np.bincount без цикла по строкам.
+    """
+    
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: Словарь {поле: массив}; все массивы одной длины
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Столбцы разной длины: {sorted(lengths)}")
+        
+        self.columns = columns
+        self._length = lengths.pop() if lengths else 0
+        
+    @staticmethod
+    def _to_array(values: Any) -> np.ndarray:
+        """Преобразует столбец в массив NumPy (array.array - без копирования)"""
+        if isinstance(values, np.ndarray):
+            return values
+        if isinstance(values, array):
+            return np.frombuffer(values, dtype=np.int64 if values.typecode == "q" else np.float64)
+        return np.asarray(values)
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence[Any]]) -> "StatsFrame":
+        """
+        Создает хранилище из столбцов (например, get_statistics_columns)
+        
+        Args:
+            columns: Словарь {поле: столбец значений}
+            
+        Returns:
+            StatsFrame
+        """
+        return cls({field: cls._to_array(values) for field, values in columns.items()})
+    
+    @classmethod
+    def from_rows(cls,
+                  rows: Iterable[Dict[str, Any]],
+                  fields: Optional[Sequence[str]] = None) -> "StatsFrame":
+        """
+        Создает хранилище из строк-словарей за один проход
+        
+        Args:
+            rows: Строки статистики
+            fields: Поля для загрузки (по умолчанию поля первой строки
+                и METRIC_COLUMNS)
+                
+        Returns:
+            StatsFrame
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return cls.empty(fields)
+        
+        if fields is None:
+            fields = list(first) + [m for m in METRIC_COLUMNS if m not in first]
+            
+        data = {field: [] for field in fields}
+        appenders = [(field, data[field].append) for field in fields]
+        numeric = set(METRIC_COLUMNS)
+        
+        for row in itertools.chain((first,), rows):
+            for field, append in appenders:
+                value = row.get(field)
+                append(0 if value is None and field in numeric else value)
+                
+        return cls({field: np.asarray(values) for field, values in data.items()})
+    
+    @classmethod
+    def empty(cls, fields: Optional[Sequence[str]] = None) -> "StatsFrame":
+        """Создает пустое хранилище с метриками METRIC_COLUMNS"""
+        fields = fields or METRIC_COLUMNS
+        return cls({field: np.zeros(0, dtype=np.int64) for field in fields})
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __contains__(self, field: str) -> bool:
+        return field in self.columns
+    
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+    
+    def column(self, field: str) -> np.ndarray:
+        """Возвращает столбец; отсутствующая метрика - массив нулей"""
+        values = self.columns.get(field)
+        if values is None:
+            return np.zeros(self._length, dtype=np.int64)
+        return values
+    
+    def filter(self, mask: np.ndarray) -> "StatsFrame":
+        """
+        Отбирает строки по булевой маске
+        
+        Args:
+            mask: Булев массив длины len(self)
+            
+        Returns:
+            Новый StatsFrame
+        """
+        return StatsFrame({field: values[mask] for field, values in self.columns.items()})
+    
+    def select(self, field: str, values: Iterable[Any]) -> "StatsFrame":
+        """Отбирает строки, у которых field входит в values"""
+        return self.filter(np.isin(self.column(field), np.asarray(list(values))))
+    
+    def split(self, key: str = "CampaignId") -> Dict[Any, "StatsFrame"]:
+        """
+        Разбивает строки по значениям ключа за одну сортировку
+        
+        Returns:
+            Словарь {значение ключа: StatsFrame его строк}
+        """
+        if self._length == 0:
+            return {}
+        
+        order = np.argsort(self.column(key), kind="stable")
+        columns = {field: values[order] for field, values in self.columns.items()}
+        keys, starts = np.unique(columns[key], return_index=True)
+        stops = np.append(starts[1:], self._length)
+        
+        return {
+            group: StatsFrame({field: values[start:stop] for field, values in columns.items()})
+            for group, start, stop in zip(keys.tolist(), starts.tolist(), stops.tolist())
+        }
+    
+    def totals(self, metrics: Sequence[str] = METRIC_COLUMNS) -> Dict[str, Any]:
+        """
+        Суммирует метрики по всем строкам и добавляет производные метрики
+        
+        Returns:
+            Словарь {метрика: сумма, ctr, cpc, cpa, conversion_rate}
+        """
+        sums = {metric: self.column(metric).sum() for metric in metrics}
+        result = {metric: value.item() for metric, value in sums.items()}
+        
+        if all(metric in sums for metric in METRIC_COLUMNS):
+            derived = derived_metrics(*(sums[metric] for metric in METRIC_COLUMNS))
+            result.update({name: value.item() for name, value in derived.items()})
+            
+        return result
+    
+    def group_by(self,
+                 key: str = "CampaignId",
+                 metrics: Sequence[str] = METRIC_COLUMNS,
+                 how: str = "sum") -> "StatsFrame":
+        """
+        Группирует строки по ключу
+        
+        Args:
+            key: Поле группировки
+            metrics: Агрегируемые метрики
+            how: "sum" или "mean"
+            
+        Returns:
+            StatsFrame со столбцом ключа, агрегатами и (для полного набора
+            METRIC_COLUMNS при how="sum") производными метриками
+        """
+        if self._length == 0:
+            return StatsFrame.empty([key, *metrics])
+        
+        keys, inverse = np.unique(self.column(key), return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        grouped = {key: keys}
+        
+        for metric in metrics:
+            values = self.column(metric)
+            sums = np.bincount(inverse, weights=values, minlength=len(keys))
+            if how == "mean":
+                grouped[metric] = sums / counts
+            elif np.issubdtype(values.dtype, np.integer):
+                grouped[metric] = np.rint(sums).astype(np.int64)
+            else:
+                grouped[metric] = sums
+                
+        if how == "sum" and all(metric in grouped for metric in METRIC_COLUMNS):
+            grouped.update(derived_metrics(*(grouped[metric] for metric in METRIC_COLUMNS)))
+            
+        return StatsFrame(grouped)
+    
+    def with_derived_metrics(self) -> "StatsFrame":
+        """Добавляет построчные CTR, CPC, CPA и конверсию"""
+        columns = dict(self.columns)
+        columns.update(derived_metrics(*(self.column(metric) for metric in METRIC_COLUMNS)))
+        return StatsFrame(columns)
+    
+    def to_dict(self, key: str = "CampaignId") -> Dict[Any, Dict[str, Any]]:
+        """
+        Преобразует сгруппированное хранилище в словарь
+        
+        Args:
+            key: Поле, значения которого становятся ключами
+            
+        Returns:
+            Словарь {ключ: {поле: значение}} с числами Python
+        """
+        fields = [field for field in self.columns if field != key]
+        keys = self.columns[key].tolist()
+        values = [self.columns[field].tolist() for field in fields]
+        if not fields:
+            return {group: {} for group in keys}
+        return {
+            group: dict(zip(fields, row))
+            for group, row in zip(keys, zip(*values))
+        }
+        
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Преобразует хранилище обратно в список словарей"""
+        fields = list(self.columns)
+        values = [self.columns[field].tolist() for field in fields]
+        return [dict(zip(fields, row)) for row in zip(*values)]
@@ -0,0 +1,292 @@
+"""
+Инкрементальная синхронизация статистики Яндекс.Директ
+Локальное хранилище дневной статистики кампаний (SQLite)
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+import logging
+
+import numpy as np
+
+from yandex_direct_stats import StatsFrame, METRIC_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+class StatsStore:
+    """
+    Хранилище дневной статистики по кампаниям
+    
+    Одна строка - один день одной кампании. Отдельно хранится список
+    загруженных дней: день без строк (нет показов) тоже считается
+    загруженным и повторно не запрашивается.
+    """
+    
+    # Ограничение SQLite на количество параметров запроса (с запасом)
+    _SQL_CHUNK = 500
+    
+    def __init__(self, path: str = ":memory:"):
+        """
+        Args:
+            path: Файл базы SQLite (":memory:" - хранилище только на время работы)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS daily_stats ("
+            "date TEXT NOT NULL, campaign_id INTEGER NOT NULL, "
+            "impressions INTEGER NOT NULL, clicks INTEGER NOT NULL, "
+            "cost REAL NOT NULL, conversions INTEGER NOT NULL, "
+            "PRIMARY KEY (date, campaign_id));"
+            "CREATE TABLE IF NOT EXISTS synced_dates ("
+            "date TEXT PRIMARY KEY, synced_at REAL NOT NULL);"
+        )
+        self._db.commit()
+        
+    def close(self):
+        """Закрывает базу хранилища"""
+        with self._lock:
+            self._db.close()
+            
+    def synced_dates(self, date_from: str, date_to: str) -> Dict[str, float]:
+        """
+        Возвращает загруженные дни периода
+        
+        Returns:
+            Словарь {дата: время загрузки (unix time)}
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT date, synced_at FROM synced_dates WHERE date BETWEEN ? AND ?",
+                (date_from, date_to)
+            ).fetchall()
+        return dict(rows)
+    
+    def replace_period(self,
+                       date_from: str,
+                       date_to: str,
+                       columns: Dict[str, Any]):
+        """
+        Заменяет статистику периода данными отчета
+        
+        Args:
+            date_from: Начало периода (YYYY-MM-DD)
+            date_to: Конец периода (YYYY-MM-DD)
+            columns: Столбцы отчета Date, CampaignId и METRIC_COLUMNS
+        """
+        rows = zip(
+            columns["Date"],
+            columns["CampaignId"],
+            *(columns[metric] for metric in METRIC_COLUMNS)
+        )
+        synced_at = time.time()
+        days = [
+            (day, synced_at)
+            for day in _date_range(date_from, date_to)
+        ]
+        
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM daily_stats WHERE date BETWEEN ? AND ?",
+                (date_from, date_to)
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO daily_stats "
+                "(date, campaign_id, impressions, clicks, cost, conversions) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO synced_dates (date, synced_at) VALUES (?, ?)",
+                days
+            )
+            
+    def frame(self,
+              date_from: str,
+              date_to: str,
+              campaign_ids: Optional[Iterable[int]] = None) -> StatsFrame:
+        """
+        Читает статистику периода
+        
+        Args:
+            date_from: Начало периода (YYYY-MM-DD)
+            date_to: Конец периода (YYYY-MM-DD)
+            campaign_ids: Фильтр по ID кампаний
+            
+        Returns:
+            StatsFrame со столбцами Date, CampaignId и METRIC_COLUMNS,
+            отсортированный по дате
+        """
+        query = (
+            "SELECT date, campaign_id, impressions, clicks, cost, conversions "
+            "FROM daily_stats WHERE date BETWEEN ? AND ?"
+        )
+        params: List[Any] = [date_from, date_to]
+        
+        if campaign_ids is None:
+            with self._lock:
+                rows = self._db.execute(query + " ORDER BY date, campaign_id", params).fetchall()
+        else:
+            # Фильтр по кампаниям - частями по _SQL_CHUNK параметров
+            campaign_ids = list(campaign_ids)
+            rows = []
+            with self._lock:
+                for start in range(0, len(campaign_ids), self._SQL_CHUNK):
+                    chunk = campaign_ids[start:start + self._SQL_CHUNK]
+                    rows.extend(self._db.execute(
+                        query + f" AND campaign_id IN ({', '.join('?' * len(chunk))})",
+                        [*params, *chunk]
+                    ).fetchall())
+            if len(campaign_ids) > self._SQL_CHUNK:
+                rows.sort(key=lambda row: (row[0], row[1]))
+                
+        if not rows:
+            return StatsFrame.empty(["Date", "CampaignId", *METRIC_COLUMNS])
+        
+        dates, campaigns, impressions, clicks, cost, conversions = zip(*rows)
+        return StatsFrame({
+            "Date": np.asarray(dates),
+            "CampaignId": np.asarray(campaigns, dtype=np.int64),
+            "Impressions": np.asarray(impressions, dtype=np.int64),
+            "Clicks": np.asarray(clicks, dtype=np.int64),
+            "Cost": np.asarray(cost, dtype=np.float64),
+            "Conversions": np.asarray(conversions, dtype=np.int64)
+        })
+
+
+def _date_range(date_from: str, date_to: str) -> List[str]:
+    """Дни периода включительно в формате YYYY-MM-DD"""
+    start = datetime.strptime(date_from, "%Y-%m-%d").date()
+    end = datetime.strptime(date_to, "%Y-%m-%d").date()
+    return [
+        (start + timedelta(days=offset)).isoformat()
+        for offset in range((end - start).days + 1)
+    ]
+
+
+class StatsSync:
+    """
+    Инкрементальная синхронизация статистики аккаунта
+    
+    Запрашивается только период от самого раннего незагруженного дня до
+    сегодня. Последние restatement_days дней загружаются повторно: Директ
+    уточняет статистику (списания, конверсии) задним числом.
+    """
+    
+    def __init__(self,
+                 manager,
+                 store: StatsStore,
+                 restatement_days: int = 3,
+                 min_sync_interval: float = 900):
+        """
+        Args:
+            manager: Экземпляр YandexDirectManager
+            store: Хранилище статистики
+            restatement_days: Сколько последних дней загружать повторно
+            min_sync_interval: Не перезагружать последние дни чаще, чем
+                раз в столько секунд
+        """
+        self.manager = manager
+        self.store = store
+        self.restatement_days = restatement_days
+        self.min_sync_interval = min_sync_interval
+        
+        self.stats = {"syncs": 0, "skipped": 0, "days_fetched": 0}
+        
+    def _today(self) -> date:
+        return date.today()
+    
+    def plan_period(self, days: int) -> Optional[Tuple[str, str]]:
+        """
+        Определяет период, который нужно загрузить
+        
+        Args:
+            days: Глубина истории в днях (включая сегодня)
+            
+        Returns:
+            (date_from, date_to) или None, если загружать нечего
+        """
+        today = self._today()
+        window = [
+            (today - timedelta(days=offset)).isoformat()
+            for offset in range(days - 1, -1, -1)
+        ]
+        synced = self.store.synced_dates(window[0], window[-1])
+        
+        restatement_start = (today - timedelta(days=self.restatement_days - 1)).isoformat()
+        now = time.time()
+        
+        for day in window:
+            synced_at = synced.get(day)
+            if synced_at is None:
+                return day, window[-1]
+            if day >= restatement_start and now - synced_at >= self.min_sync_interval:
+                return day, window[-1]
+            
+        return None
+    
+    def sync(self, days: int = 31) -> int:
+        """
+        Загружает недостающие и уточняемые дни
+        
+        Args:
+            days: Глубина истории в днях (включая сегодня)
+            
+        Returns:
+            Количество загруженных дней (0, если данные актуальны)
+        """
+        period = self.plan_period(days)
+        if period is None:
+            self.stats["skipped"] += 1
+            return 0
+        
+        date_from, date_to = period
+        columns = self.manager.get_statistics_columns(
+            fields=["Date", "CampaignId", *METRIC_COLUMNS],
+            date_from=date_from,
+            date_to=date_to
+        )
+        self.store.replace_period(date_from, date_to, columns)
+        
+        fetched = len(_date_range(date_from, date_to))
+        self.stats["syncs"] += 1
+        self.stats["days_fetched"] += fetched
+        logger.info(f"Статистика синхронизирована за {date_from} - {date_to} ({fetched} дн.)")
+        return fetched
+    
+    def period(self, days: int = 30, include_today: bool = False) -> Tuple[str, str]:
+        """
+        Период последних дней, который возвращает get_frame
+        
+        Returns:
+            (date_from, date_to) в формате YYYY-MM-DD
+        """
+        today = self._today()
+        date_to = today if include_today else today - timedelta(days=1)
+        date_from = date_to - timedelta(days=days - 1)
+        return date_from.isoformat(), date_to.isoformat()
+    
+    def get_frame(self,
+                  days: int = 30,
+                  campaign_ids: Optional[Iterable[int]] = None,
+                  include_today: bool = False) -> StatsFrame:
+        """
+        Возвращает статистику за последние дни, предварительно синхронизируя ее
+        
+        Args:
+            days: Количество дней
+            campaign_ids: Фильтр по ID кампаний
+            include_today: Включать текущий день (как LAST_30_DAYS - нет)
+            
+        Returns:
+            StatsFrame со столбцами Date, CampaignId и METRIC_COLUMNS
+        """
+        date_from, date_to = self.period(days, include_today)
+        
+        self.sync((self._today() - date.fromisoformat(date_from)).days + 1)
+        return self.store.frame(date_from, date_to, campaign_ids)
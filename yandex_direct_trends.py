@@ -0,0 +1,221 @@
+"""
+Тренды и аномалии дневной статистики Яндекс.Директ
+Скользящие окна, наклон и всплески z-score для всех кампаний сразу (NumPy)
+"""
+
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+
+import numpy as np
+
+from yandex_direct_stats import StatsFrame
+
+
+# Метрики, по которым определяются тренды
+TREND_METRICS = ("Impressions", "Clicks", "Cost")
+
+
+def pivot_daily(frame: StatsFrame,
+                metric: str,
+                date_from: Optional[str] = None,
+                date_to: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Разворачивает дневную статистику в матрицу кампании x дни
+    
+    Дни без строк (нет показов) заполняются нулями.
+    
+    Args:
+        frame: Статистика со столбцами Date, CampaignId и metric
+        metric: Метрика
+        date_from: Первый день (по умолчанию самый ранний в статистике)
+        date_to: Последний день (по умолчанию самый поздний в статистике)
+        
+    Returns:
+        (ID кампаний, дни datetime64[D], матрица значений float64)
+    """
+    days = frame.column("Date").astype("datetime64[D]")
+    start = np.datetime64(date_from, "D") if date_from else days.min()
+    end = np.datetime64(date_to, "D") if date_to else days.max()
+    dates = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    
+    campaign_ids, rows = np.unique(frame.column("CampaignId"), return_inverse=True)
+    columns = (days - start).astype(np.int64)
+    inside = (columns >= 0) & (columns < len(dates))
+    
+    flat = rows[inside] * len(dates) + columns[inside]
+    matrix = np.bincount(
+        flat,
+        weights=frame.column(metric)[inside].astype(np.float64),
+        minlength=len(campaign_ids) * len(dates)
+    ).reshape(len(campaign_ids), len(dates))
+    
+    return campaign_ids, dates, matrix
+
+
+def rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """
+    Скользящее среднее по строкам матрицы
+    
+    Для первых window - 1 дней среднее считается по доступным дням.
+    """
+    totals = np.cumsum(matrix, axis=1)
+    shifted = np.zeros_like(totals)
+    shifted[:, window:] = totals[:, :-window]
+    counts = np.minimum(np.arange(1, matrix.shape[1] + 1), window)
+    return (totals - shifted) / counts
+
+
+def trend_slopes(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Наклон линейного тренда по строкам (метод наименьших квадратов)
+    
+    Returns:
+        (наклон в единицах метрики за день, изменение за период в процентах
+        от среднего; 0 для строк с нулевым средним)
+    """
+    days = matrix.shape[1]
+    if days < 2:
+        zeros = np.zeros(matrix.shape[0])
+        return zeros, zeros
+    
+    x = np.arange(days, dtype=np.float64)
+    x -= x.mean()
+    means = matrix.mean(axis=1)
+    
+    slopes = ((matrix - means[:, None]) * x).sum(axis=1) / (x * x).sum()
+    change = np.zeros_like(slopes)
+    np.divide(slopes * (days - 1) * 100.0, means, out=change, where=means > 0)
+    return slopes, change
+
+
+def zscores(matrix: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Отклонение каждого дня от предыдущих window дней
+    
+    Нижняя граница стандартного отклонения - sqrt(среднего), как у
+    пуассоновского шума счетчиков: иначе ряд из одинаковых значений
+    давал бы бесконечный z-score при любом изменении.
+    
+    Returns:
+        (z-score, ожидаемое значение); для первых window дней z-score равен 0
+    """
+    totals = np.cumsum(matrix, axis=1)
+    squares = np.cumsum(matrix * matrix, axis=1)
+    
+    expected = np.zeros_like(matrix)
+    scores = np.zeros_like(matrix)
+    if matrix.shape[1] <= window:
+        return scores, expected
+    
+    # Сумма окна [j - window, j) = totals[j - 1] - totals[j - window - 1]
+    window_sum = totals[:, window - 1:-1].copy()
+    window_sum[:, 1:] -= totals[:, :-window - 1]
+    window_squares = squares[:, window - 1:-1].copy()
+    window_squares[:, 1:] -= squares[:, :-window - 1]
+    
+    mean = window_sum / window
+    std = np.sqrt(np.maximum(window_squares / window - mean * mean, 0.0))
+    std = np.maximum(std, np.sqrt(np.maximum(mean, 1.0)))
+    
+    expected[:, window:] = mean
+    scores[:, window:] = (matrix[:, window:] - mean) / std
+    return scores, expected
+
+
+def empty_trends() -> Dict[str, Any]:
+    """Тренды кампании без статистики"""
+    result = {f"{metric.lower()}_trend": "stable" for metric in TREND_METRICS}
+    result.update({
+        "change_percent": {metric.lower(): 0.0 for metric in TREND_METRICS},
+        "moving_average": {metric.lower(): 0.0 for metric in TREND_METRICS},
+        "anomalies": []
+    })
+    return result
+
+
+def detect_trends(frame: StatsFrame,
+                  metrics: Sequence[str] = TREND_METRICS,
+                  window: int = 7,
+                  z_threshold: float = 3.0,
+                  trend_threshold: float = 10.0,
+                  date_from: Optional[str] = None,
+                  date_to: Optional[str] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Определяет тренды и аномалии для всех кампаний статистики
+    
+    Все кампании обрабатываются одной матрицей на метрику; цикл только
+    по найденным аномалиям.
+    
+    Args:
+        frame: Дневная статистика (Date, CampaignId и метрики)
+        metrics: Метрики для анализа
+        window: Окно скользящего среднего и базы для z-score (в днях)
+        z_threshold: Порог |z-score| для аномалии
+        trend_threshold: Изменение за период (в процентах), начиная с
+            которого тренд считается ростом или падением
+        date_from: Первый день периода (по умолчанию из статистики)
+        date_to: Последний день периода (по умолчанию из статистики)
+        
+    Returns:
+        Словарь {ID кампании: {<метрика>_trend: growing/declining/stable,
+        change_percent, moving_average, anomalies}}
+    """
+    if len(frame) == 0:
+        return {}
+    
+    result: Dict[int, Dict[str, Any]] = {}
+    for metric in metrics:
+        name = metric.lower()
+        campaign_ids, dates, matrix = pivot_daily(frame, metric, date_from, date_to)
+        if not result:
+            result = {campaign_id: empty_trends() for campaign_id in campaign_ids.tolist()}
+        entries = [result[campaign_id] for campaign_id in campaign_ids.tolist()]
+        
+        _, change = trend_slopes(matrix)
+        labels = np.full(len(campaign_ids), "stable", dtype=object)
+        if matrix.shape[1] >= window:
+            labels[change >= trend_threshold] = "growing"
+            labels[change <= -trend_threshold] = "declining"
+        averages = rolling_mean(matrix, window)[:, -1]
+        
+        for entry, label, percent, average in zip(
+            entries, labels.tolist(), change.tolist(), averages.tolist()
+        ):
+            entry[f"{name}_trend"] = label
+            entry["change_percent"][name] = percent
+            entry["moving_average"][name] = average
+            
+        scores, expected = zscores(matrix, window)
+        day_strings = np.datetime_as_string(dates)
+        for row, column in zip(*np.nonzero(np.abs(scores) >= z_threshold)):
+            entries[row]["anomalies"].append({
+                "date": str(day_strings[column]),
+                "metric": name,
+                "value": matrix[row, column].item(),
+                "expected": expected[row, column].item(),
+                "zscore": scores[row, column].item()
+            })
+            
+    for entry in result.values():
+        entry["anomalies"].sort(key=lambda anomaly: (anomaly["date"], anomaly["metric"]))
+    return result
+
+
+def latest_anomalies(trends: Dict[int, Dict[str, Any]], since: str) -> List[Dict[str, Any]]:
+    """
+    Аномалии начиная с указанного дня по всем кампаниям
+    
+    Args:
+        trends: Результат detect_trends
+        since: Первый день (YYYY-MM-DD)
+        
+    Returns:
+        Список аномалий с полем campaign_id, по убыванию |z-score|
+    """
+    found = [
+        {"campaign_id": campaign_id, **anomaly}
+        for campaign_id, entry in trends.items()
+        for anomaly in entry["anomalies"]
+        if anomaly["date"] >= since
+    ]
+    found.sort(key=lambda anomaly: -abs(anomaly["zscore"]))
+    return found